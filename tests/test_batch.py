@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pytest
+
+from toy_robot.batch import BatchSummary, expand_paths, run_batch, run_file
+
+
+@pytest.fixture
+def command_files(tmp_path: Path) -> list[Path]:
+    paths = []
+    for index in range(5):
+        path = tmp_path / f"commands_{index}.txt"
+        path.write_text(f"PLACE {index},0,NORTH\nMOVE\nREPORT\n")
+        paths.append(path)
+    return paths
+
+
+class TestExpandPaths:
+    def test_directory_expands_to_sorted_files(
+        self, tmp_path: Path, command_files: list[Path]
+    ) -> None:
+        (tmp_path / "nested").mkdir()
+        assert expand_paths([tmp_path]) == command_files
+
+    def test_glob_pattern_expands(
+        self, tmp_path: Path, command_files: list[Path]
+    ) -> None:
+        assert expand_paths([tmp_path / "commands_[13].txt"]) == [
+            command_files[1],
+            command_files[3],
+        ]
+
+    def test_missing_path_is_kept(self, tmp_path: Path) -> None:
+        missing = tmp_path / "missing.txt"
+        assert expand_paths([missing]) == [missing]
+
+
+class TestRunBatch:
+    def test_run_file_reports_output_and_size(self, command_files: list[Path]) -> None:
+        result = run_file(command_files[2])
+        assert result.output == "2,1,NORTH"
+        assert result.size == command_files[2].stat().st_size
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    @pytest.mark.parametrize("use_mmap", [False, True])
+    def test_results_are_in_input_order(
+        self, command_files: list[Path], jobs: int, use_mmap: bool
+    ) -> None:
+        results = list(run_batch(command_files, jobs=jobs, use_mmap=use_mmap))
+        assert [result.path for result in results] == command_files
+        assert [result.output for result in results] == [
+            f"{index},1,NORTH" for index in range(5)
+        ]
+
+    def test_summary_accumulates_files_and_size(
+        self, command_files: list[Path]
+    ) -> None:
+        summary = BatchSummary()
+        for result in run_batch(command_files):
+            summary.add(result)
+        summary.seconds = 1.0
+        assert summary.files == 5
+        assert summary.size == sum(path.stat().st_size for path in command_files)
+        assert str(summary).startswith("Processed 5 files")
@@ -0,0 +1,153 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from toy_robot.bench import (
+    STARTUP_BUDGET_US,
+    WORKLOADS,
+    allocations_per_move,
+    bytes_per_simulator,
+    compare,
+    generate_workload,
+    main,
+    measure_startup,
+    run_benchmarks,
+)
+
+
+class TestWorkloads:
+    @pytest.mark.parametrize("name", list(WORKLOADS))
+    def test_workloads_are_reproducible(self, name: str) -> None:
+        first = generate_workload(name, 200, seed=1)
+        second = generate_workload(name, 200, seed=1)
+        assert first == second
+        assert len(first.lines) == 200
+
+    def test_seed_changes_workload(self) -> None:
+        assert generate_workload("move", 200, seed=1) != generate_workload(
+            "move", 200, seed=2
+        )
+
+    def test_place_workload_is_mostly_off_table(self) -> None:
+        workload = generate_workload("place", 1000)
+        on_table = [
+            line
+            for line in workload.lines
+            if all(int(value) < 5 for value in line[6:].split(",")[:2])
+        ]
+        assert len(on_table) < len(workload.lines) / 2
+
+
+class TestRunBenchmarks:
+    def test_results_cover_workloads_and_phases(self) -> None:
+        report = run_benchmarks(
+            ["move", "large_table"], ["parse", "process_commands"], size=100, repeat=1
+        )
+        assert set(report["results"]) == {"move", "large_table"}
+        for entry in report["results"].values():
+            assert entry["peak_memory_bytes"] > 0
+            assert entry["parse"]["commands_per_sec"] > 0
+            assert entry["process_commands"]["seconds"] > 0
+
+    def test_cli_phase_skips_non_default_tables(self) -> None:
+        report = run_benchmarks(["large_table"], ["cli"], size=10, repeat=1)
+        assert "cli" not in report["results"]["large_table"]
+
+
+class TestMemory:
+    def test_simulator_size_is_reported(self) -> None:
+        assert 0 < bytes_per_simulator(100) < 4096
+
+    def test_moves_do_not_allocate(self) -> None:
+        # Positions are interned, so MOVE should not allocate a Point each time.
+        assert allocations_per_move(1000) < 0.1
+
+    def test_report_includes_memory(self) -> None:
+        report = run_benchmarks(["move"], ["parse"], size=10, repeat=1)
+        assert set(report["memory"]) == {"bytes_per_simulator", "allocations_per_move"}
+
+
+class TestStartup:
+    def test_file_mode_defers_heavy_imports(self, tmp_path: Path) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text("PLACE 0,0,NORTH\nREPORT\n")
+
+        profile = measure_startup(["-f", str(command_file)])
+
+        assert "toy_robot.simulator" in profile.modules
+        assert profile.deferred_modules_loaded == set()
+
+    def test_piped_stdin_defers_heavy_imports(self) -> None:
+        profile = measure_startup([], stdin="PLACE 0,0,NORTH\nREPORT\n")
+
+        assert "toy_robot.simulator" in profile.modules
+        assert profile.deferred_modules_loaded == set()
+
+    def test_file_mode_import_time_within_budget(self, tmp_path: Path) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text("PLACE 0,0,NORTH\nREPORT\n")
+
+        # Best of three, as import time is noisy on a shared machine.
+        best = min(
+            measure_startup(["-f", str(command_file)]).toy_robot_us for _ in range(3)
+        )
+
+        assert 0 < best <= STARTUP_BUDGET_US
+
+
+class TestCompare:
+    @staticmethod
+    def _report(commands_per_sec: float) -> dict[str, Any]:
+        return {
+            "results": {
+                "move": {
+                    "peak_memory_bytes": 1,
+                    "parse": {"seconds": 1.0, "commands_per_sec": commands_per_sec},
+                }
+            }
+        }
+
+    def test_drop_beyond_threshold_is_a_regression(self) -> None:
+        regressions = compare(self._report(70), self._report(100), threshold=0.2)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("move/parse")
+
+    def test_drop_within_threshold_is_not_a_regression(self) -> None:
+        assert compare(self._report(90), self._report(100), threshold=0.2) == []
+
+    def test_memory_growth_is_a_regression(self) -> None:
+        baseline = {"memory": {"allocations_per_move": 0.0}, "results": {}}
+        current = {"memory": {"allocations_per_move": 1.0}, "results": {}}
+        regressions = compare(current, baseline, threshold=0.2)
+        assert regressions == ["memory/allocations_per_move: 1.00 vs baseline 0.00"]
+        assert compare(baseline, baseline, threshold=0.2) == []
+
+
+class TestMain:
+    def test_save_then_compare(self, tmp_path: Path, capsys: Any) -> None:
+        baseline = tmp_path / "baseline.json"
+        argv = [
+            "--size",
+            "50",
+            "--repeat",
+            "1",
+            "--workloads",
+            "turn",
+            "--phases",
+            "parse",
+        ]
+        assert main([*argv, "--save", str(baseline)]) == 0
+        assert json.loads(baseline.read_text())["results"]["turn"]["parse"]
+
+        assert main([*argv, "--compare", str(baseline), "--threshold", "1.0"]) == 0
+        assert "No regressions" in capsys.readouterr().out
+
+    def test_memory_only(self, tmp_path: Path, capsys: Any) -> None:
+        baseline = tmp_path / "baseline.json"
+        assert main(["--memory", "--save", str(baseline)]) == 0
+        assert "allocations per MOVE" in capsys.readouterr().out
+        assert json.loads(baseline.read_text())["results"] == {}
+
+        assert main(["--memory", "--compare", str(baseline)]) == 0
@@ -0,0 +1,118 @@
+import io
+import random
+from pathlib import Path
+
+import pytest
+
+from toy_robot import cli
+from toy_robot.binary_format import (
+    HEADER,
+    MAGIC,
+    BinaryFormatError,
+    convert_script,
+    is_binary_file,
+    iter_binary_reports,
+    load_program,
+)
+from toy_robot.compiler import compile_script
+from toy_robot.data_classes import Direction, Point
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+SCRIPT = "PLACE 1,2,EAST\nMOVE\nFOO\n\nMOVE\nLEFT\nPLACE 9,9,NORTH\nMOVE\nREPORT\n"
+
+
+def _convert(tmp_path: Path, script: str) -> Path:
+    path = tmp_path / "commands.trb"
+    with open(path, "wb") as binary_file:
+        convert_script(io.StringIO(script), binary_file)
+    return path
+
+
+class TestConvertScript:
+    def test_header_records_version_and_command_count(self) -> None:
+        destination = io.BytesIO()
+        result = convert_script(io.StringIO(SCRIPT), destination)
+
+        assert result.commands == 7
+        assert HEADER.unpack_from(destination.getvalue()) == (MAGIC, 1, 0, 7)
+
+    def test_invalid_lines_are_reported_with_line_numbers(self) -> None:
+        result = convert_script(io.StringIO(SCRIPT), io.BytesIO())
+        assert result.invalid_lines == [(3, "FOO")]
+
+    def test_body_is_the_compiled_program(self, tmp_path: Path) -> None:
+        path = _convert(tmp_path, SCRIPT)
+        assert load_program(path) == compile_script(io.StringIO(SCRIPT))
+
+
+class TestIterBinaryReports:
+    @pytest.mark.parametrize("seed", range(3))
+    def test_matches_text_simulator(self, tmp_path: Path, seed: int) -> None:
+        rng = random.Random(seed)
+        lines = ["PLACE 0,0,NORTH", "PLACE 4,1,WEST", "MOVE", "LEFT", "RIGHT"]
+        script = "\n".join(rng.choice(lines + ["REPORT"]) for _ in range(1000))
+        simulator = RobotSimulator(robot=Robot(), table=Table())
+        expected = list(simulator.iter_reports(io.StringIO(script)))
+
+        robot = Robot()
+        with open(_convert(tmp_path, script), "rb") as binary_file:
+            reports = list(iter_binary_reports(binary_file, robot, Table()))
+
+        assert reports == expected
+        assert str(robot) == str(simulator.robot)
+
+    def test_writes_back_robot_state_when_closed(self, tmp_path: Path) -> None:
+        robot = Robot()
+        path = _convert(tmp_path, "PLACE 0,0,NORTH\nREPORT\nMOVE\n")
+        with open(path, "rb") as binary_file:
+            reports = iter_binary_reports(binary_file, robot, Table())
+            assert next(reports) == "0,0,NORTH"
+            reports.close()
+
+        assert robot.position == Point(0, 0)
+        assert robot.direction == Direction.NORTH
+
+    def test_empty_program(self, tmp_path: Path) -> None:
+        with open(_convert(tmp_path, ""), "rb") as binary_file:
+            assert list(iter_binary_reports(binary_file, Robot(), Table())) == []
+
+    @pytest.mark.parametrize(
+        "contents",
+        [
+            MAGIC,
+            HEADER.pack(MAGIC, 2, 0, 0),
+            HEADER.pack(MAGIC, 1, 0, 1) + b"\x03\x00",
+            b"TRX\x00" + HEADER.pack(MAGIC, 1, 0, 1)[4:] + b"\x03\x00\x00\x00",
+            # Truncated: the header counts more commands than the words hold.
+            HEADER.pack(MAGIC, 1, 0, 4) + b"\x03\x00\x00\x00",
+            # A PLACE facing 9, and a PLACE missing its operands.
+            HEADER.pack(MAGIC, 1, 0, 1) + (9 << 3 | 4).to_bytes(4, "little") * 3,
+            HEADER.pack(MAGIC, 1, 0, 2) + b"\x03\x00\x00\x00\x04\x00\x00\x00",
+            # Opcode 7, a negative word, and a count that does not match.
+            HEADER.pack(MAGIC, 1, 0, 1) + b"\x07\x00\x00\x00",
+            HEADER.pack(MAGIC, 1, 0, 1) + b"\xff\xff\xff\xff",
+            HEADER.pack(MAGIC, 1, 0, 2) + b"\x03\x00\x00\x00" * 3,
+        ],
+    )
+    def test_malformed_files_are_rejected(
+        self, tmp_path: Path, contents: bytes
+    ) -> None:
+        path = tmp_path / "bad.trb"
+        path.write_bytes(contents)
+        with open(path, "rb") as binary_file, pytest.raises(BinaryFormatError):
+            list(iter_binary_reports(binary_file, Robot(), Table()))
+        with pytest.raises(BinaryFormatError):
+            load_program(path)
+
+
+class TestIsBinaryFile:
+    def test_detects_magic(self, tmp_path: Path) -> None:
+        text_file = tmp_path / "commands.txt"
+        text_file.write_text(SCRIPT)
+        assert is_binary_file(_convert(tmp_path, SCRIPT))
+        assert not is_binary_file(text_file)
+
+    def test_cli_magic_matches(self) -> None:
+        assert cli._BINARY_MAGIC == MAGIC
@@ -0,0 +1,104 @@
+import io
+import random
+from pathlib import Path
+
+import pytest
+
+from toy_robot.checkpoint import (
+    CheckpointIndex,
+    index_path,
+    state_at_line,
+    update_index,
+)
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+LINES = ["PLACE 0,0,NORTH", "PLACE 3,1,WEST", "MOVE", "MOVE", "LEFT", "RIGHT", "FOO"]
+
+
+def _script(seed: int, length: int) -> str:
+    rng = random.Random(seed)
+    return "".join(rng.choice(LINES) + "\n" for _ in range(length))
+
+
+def _expected_state(script: str, line: int, table: Table) -> str:
+    head = "".join(script.splitlines(keepends=True)[:line])
+    simulator = RobotSimulator(robot=Robot(), table=table)
+    simulator.process_commands(io.StringIO(head))
+    return str(simulator.robot)
+
+
+class TestUpdateIndex:
+    def test_checkpoints_every_interval_lines(self, tmp_path: Path) -> None:
+        path = tmp_path / "commands.txt"
+        script = _script(0, 250)
+        path.write_text(script)
+
+        index = update_index(path, interval=100)
+
+        lines = script.splitlines(keepends=True)
+        assert index.indexed_lines == 200
+        assert list(index.offsets) == [
+            0,
+            len("".join(lines[:100])),
+            len("".join(lines[:200])),
+        ]
+        assert index_path(path).exists()
+        assert CheckpointIndex.from_bytes(index_path(path).read_bytes()) == index
+
+    def test_appended_file_extends_existing_index(self, tmp_path: Path) -> None:
+        path = tmp_path / "commands.txt"
+        script = _script(1, 150)
+        path.write_text(script)
+        first = update_index(path, interval=100)
+
+        with open(path, "a") as command_file:
+            command_file.write(_script(2, 100))
+        second = update_index(path, interval=100)
+
+        assert second.offsets[:2] == first.offsets
+        assert second.indexed_lines == 200
+
+    def test_rewritten_file_rebuilds_index(self, tmp_path: Path) -> None:
+        path = tmp_path / "commands.txt"
+        path.write_text("PLACE 0,0,NORTH\n" * 100)
+        update_index(path, interval=10)
+
+        path.write_text("PLACE 1,1,EAST\n" * 100)
+        index = update_index(path, interval=10)
+
+        assert str(state_at_line(path, 50, interval=10)) == "1,1,EAST"
+        assert index.indexed_lines == 100
+
+    def test_incomplete_last_line_is_not_checkpointed(self, tmp_path: Path) -> None:
+        path = tmp_path / "commands.txt"
+        path.write_text("MOVE\n" * 9 + "MOV")
+
+        assert update_index(path, interval=10).indexed_lines == 0
+
+    def test_corrupt_index_is_rebuilt(self, tmp_path: Path) -> None:
+        path = tmp_path / "commands.txt"
+        path.write_text(_script(3, 50))
+        index_path(path).write_bytes(b"garbage")
+
+        assert update_index(path, interval=10).indexed_lines == 50
+
+
+class TestStateAtLine:
+    @pytest.mark.parametrize("line", [0, 1, 99, 100, 101, 777, 1000])
+    def test_matches_replay_from_start(self, tmp_path: Path, line: int) -> None:
+        path = tmp_path / "commands.txt"
+        script = _script(4, 1000)
+        path.write_text(script)
+
+        robot = state_at_line(path, line, interval=100, table=Table(4, 6))
+
+        assert str(robot) == _expected_state(script, line, Table(4, 6))
+
+    def test_line_past_end_of_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "commands.txt"
+        path.write_text(_script(5, 30))
+
+        with pytest.raises(ValueError, match="only 30 lines"):
+            state_at_line(path, 31, interval=10)
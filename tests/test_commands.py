@@ -1,10 +1,15 @@
+import dataclasses
+import random
+
 import pytest
 
 from toy_robot.commands import (
     Command,
     CommandParser,
+    CommandParserException,
     InvalidCommandException,
     InvalidPlaceException,
+    PlaceCacheInfo,
     PlaceCommandArgs,
 )
 from toy_robot.data_classes import Direction
@@ -74,3 +79,63 @@ class TestCommandParser:
     ) -> None:
         with pytest.raises(expected_exception):
             CommandParser.parse_command(text_command)
+
+
+class TestParseRobotCommand:
+    def test_splits_robot_id(self) -> None:
+        assert CommandParser.parse_robot_command("r2 PLACE 1,1,NORTH \n") == (
+            "r2",
+            Command.PLACE,
+            PlaceCommandArgs(x=1, y=1, facing=Direction.NORTH),
+        )
+        assert CommandParser.parse_robot_command("r2 MOVE") == (
+            "r2",
+            Command.MOVE,
+            None,
+        )
+
+    @pytest.mark.parametrize("line", ["", " MOVE", "MOVE", "r2 JUMP", "r2 PLACE 1,1"])
+    def test_invalid_lines_raise(self, line: str) -> None:
+        with pytest.raises(CommandParserException):
+            CommandParser.parse_robot_command(line)
+
+
+class TestPlaceScanner:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_scanner_matches_regex_grammar(self, seed: int) -> None:
+        rng = random.Random(seed)
+        spaces = ["", " ", "  ", "\t", "\n", "\u00a0", "x"]
+        numbers = ["0", "12", "", "x", "\u00b2", "-1", "1_0"]
+        directions = ["NORTH", "WEST", "EAST", "SOUTH", "north", "UP", "NORTH,"]
+        for _ in range(2000):
+            command = (
+                f"PLACE{rng.choice(spaces)}{rng.choice(numbers)},{rng.choice(spaces)}"
+                f"{rng.choice(numbers)},{rng.choice(spaces)}{rng.choice(directions)}"
+                f"{rng.choice(spaces)}"
+            )
+            match = CommandParser.place_command_regex.match(command)
+            try:
+                _, args = CommandParser.parse_command(command)
+            except InvalidPlaceException:
+                assert match is None, command
+                continue
+            assert match is not None, command
+            assert args == PlaceCommandArgs(
+                int(match.group(1)), int(match.group(2)), Direction[match.group(3)]
+            )
+
+    def test_repeated_place_lines_hit_the_cache(self) -> None:
+        command = "PLACE 3,1,WEST"
+        CommandParser.parse_command(command)
+        before = CommandParser.place_cache_info()
+        for _ in range(10):
+            CommandParser.parse_command(command)
+        after = CommandParser.place_cache_info()
+        assert isinstance(after, PlaceCacheInfo)
+        assert after.hits - before.hits == 10
+        assert after.misses == before.misses
+
+    def test_cached_args_are_immutable(self) -> None:
+        _, args = CommandParser.parse_command("PLACE 0,0,NORTH")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            args.x = 4  # type: ignore[misc, union-attr]
@@ -0,0 +1,169 @@
+import io
+import random
+from pathlib import Path
+
+import pytest
+
+from toy_robot.compiler import (
+    OP_LEFT,
+    OP_MOVE,
+    OP_PLACE,
+    OP_REPORT,
+    OP_RIGHT,
+    OPCODE_BITS,
+    compile_buffer,
+    compile_file,
+    compile_script,
+    execute_program,
+    iter_program_reports,
+)
+from toy_robot.data_classes import Direction, Point
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+SCRIPT_LINES = [
+    "PLACE 1,2,EAST",
+    "PLACE 9,9,NORTH",
+    "PLACE 4,4,WEST",
+    "PLACE 0, 3, SOUTH",
+    "MOVE",
+    "MOVE ",
+    "LEFT",
+    "RIGHT",
+    "REPORT",
+    "REPORT\r",
+    "FOO",
+    "PLACE",
+    " MOVE",
+    "",
+]
+
+
+def _random_script(seed: int, length: int) -> str:
+    rng = random.Random(seed)
+    return "\n".join(rng.choice(SCRIPT_LINES) for _ in range(length))
+
+
+class TestCompileScript:
+    def test_compile_emits_expected_opcodes(self) -> None:
+        program = compile_script(
+            io.StringIO("PLACE 1,2,SOUTH\nMOVE\nLEFT\nRIGHT\nREPORT\nFOO\n")
+        )
+        assert list(program) == [
+            OP_PLACE | 2 << OPCODE_BITS,
+            1,
+            2,
+            OP_MOVE,
+            OP_LEFT,
+            OP_RIGHT,
+            OP_REPORT,
+        ]
+
+    def test_compile_oversized_place_operand_is_never_valid(self) -> None:
+        program = compile_script(io.StringIO(f"PLACE {2**40},0,NORTH\nREPORT\n"))
+        assert execute_program(program, Robot(), Table(width=5)) is None
+
+
+class TestExecuteProgram:
+    def test_execute_example_c(self) -> None:
+        program = compile_script(
+            io.StringIO("PLACE 1,2,EAST\nMOVE\nMOVE\nLEFT\nMOVE\nREPORT\n")
+        )
+        assert execute_program(program, Robot(), Table()) == "3,3,NORTH"
+
+    def test_execute_writes_back_robot_state(self) -> None:
+        robot = Robot()
+        program = compile_script(io.StringIO("PLACE 0,0,NORTH\nMOVE\nRIGHT\n"))
+        execute_program(program, robot, Table())
+        assert robot.position == Point(0, 1)
+        assert robot.direction == Direction.EAST
+
+    def test_execute_continues_from_placed_robot(
+        self, placed_robot_north_facing: Robot
+    ) -> None:
+        program = compile_script(io.StringIO("MOVE\nREPORT\n"))
+        assert execute_program(program, placed_robot_north_facing, Table()) == (
+            "2,3,NORTH"
+        )
+
+    def test_iter_program_reports_writes_back_state_when_closed(self) -> None:
+        robot = Robot()
+        program = compile_script(io.StringIO("PLACE 0,0,NORTH\nREPORT\nMOVE\n"))
+        reports = iter_program_reports(program, robot, Table())
+        assert next(reports) == "0,0,NORTH"
+        reports.close()
+        assert robot.position == Point(0, 0)
+
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize(["width", "height"], [(5, 5), (1, 1), (3, 7)])
+    def test_execute_matches_process_commands(
+        self, seed: int, width: int, height: int
+    ) -> None:
+        script = _random_script(seed, 2000)
+        simulator = RobotSimulator(robot=Robot(), table=Table(width, height))
+        expected = simulator.process_commands(io.StringIO(script))
+
+        robot = Robot()
+        program = compile_script(io.StringIO(script))
+        assert execute_program(program, robot, Table(width, height)) == expected
+        assert str(robot) == str(simulator.robot)
+
+
+class TestCompileBuffer:
+    @pytest.mark.parametrize(
+        "line",
+        [
+            "MOVE",
+            "MOVE ",
+            "MOVE X",
+            "MOVER",
+            "MOVE\tX",
+            "REPORT\x1f",
+            "RIGHT\r",
+            "PLACE 1, 2, NORTH",
+            "PLACE 1,2,NORTH \x0c",
+            "PLACE\t1,2,WEST",
+            "PLACE 1,2,NORTH,",
+            "PLACE  1,2,NORTH",
+            "PLACEX 1,2,NORTH",
+            " PLACE 1,2,NORTH",
+            "LEFTY",
+            "",
+        ],
+    )
+    def test_compile_buffer_matches_compile_script(self, line: str) -> None:
+        assert compile_buffer(line.encode()) == compile_script(io.StringIO(line))
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_compile_buffer_matches_random_script(self, seed: int) -> None:
+        script = _random_script(seed, 2000)
+        assert compile_buffer(script.encode()) == compile_script(io.StringIO(script))
+
+    @pytest.mark.parametrize("block_size", [1, 7, 64])
+    def test_lines_split_across_blocks(
+        self, monkeypatch: pytest.MonkeyPatch, block_size: int
+    ) -> None:
+        monkeypatch.setattr("toy_robot.compiler._SCAN_BLOCK_SIZE", block_size)
+        script = _random_script(0, 500).replace("\n", "\r\n", 100)
+        assert compile_buffer(script.encode()) == compile_script(io.StringIO(script))
+
+
+class TestCompileFile:
+    @pytest.mark.parametrize(
+        "contents",
+        [
+            b"",
+            b"PLACE 0,0,NORTH\r\nMOVE\r\nREPORT\r\n",
+            b"PLACE 0,0,NORTH\rMOVE\rREPORT",  # bare CR is a line break in text mode
+            "PLACE 0,0,NORTH\nMOVE\u00a0\nREPORT\n".encode(),  # unicode whitespace
+        ],
+    )
+    def test_compile_file_matches_text_mode(
+        self, tmp_path: Path, contents: bytes
+    ) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_bytes(contents)
+        with open(command_file, "r") as text_file:
+            expected = compile_script(text_file)
+        assert compile_file(command_file) == expected
@@ -0,0 +1,116 @@
+import bz2
+import gc
+import gzip
+import io
+import lzma
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from toy_robot.compression import (
+    detect_compression,
+    open_decompressed,
+    open_output,
+)
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+SCRIPT = b"PLACE 0,0,NORTH\r\nMOVE\nREPORT\nRIGHT\nMOVE\nREPORT\n"
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {
+    "gzip": gzip.compress,
+    "bz2": bz2.compress,
+    "xz": lzma.compress,
+}
+
+
+class TestDetectCompression:
+    @pytest.mark.parametrize("name", list(COMPRESSORS))
+    def test_detects_magic_numbers(self, name: str) -> None:
+        assert detect_compression(COMPRESSORS[name](SCRIPT)) == name
+
+    def test_plain_text_is_not_compressed(self) -> None:
+        assert detect_compression(SCRIPT) is None
+        assert detect_compression(b"") is None
+
+
+class TestOpenDecompressed:
+    @pytest.mark.parametrize("name", list(COMPRESSORS))
+    def test_round_trip(self, name: str) -> None:
+        stream = open_decompressed(io.BytesIO(COMPRESSORS[name](SCRIPT)))
+        assert stream.read() == SCRIPT
+
+    def test_plain_stream_is_unchanged(self) -> None:
+        assert open_decompressed(io.BytesIO(SCRIPT)).read() == SCRIPT
+
+
+class TestProcessCommands:
+    @pytest.mark.parametrize("name", [None, *COMPRESSORS])
+    def test_binary_streams_match_text(self, name: str | None) -> None:
+        data = SCRIPT if name is None else COMPRESSORS[name](SCRIPT)
+        simulator = RobotSimulator(robot=Robot(), table=Table())
+
+        output = simulator.process_commands(io.BytesIO(data))
+
+        text_simulator = RobotSimulator(robot=Robot(), table=Table())
+        expected = text_simulator.process_commands(
+            io.StringIO(SCRIPT.decode(), newline=None)
+        )
+        assert output == expected == "0,1,NORTH\n1,1,EAST"
+
+    def test_compressed_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "commands.txt.xz"
+        path.write_bytes(lzma.compress(SCRIPT))
+        simulator = RobotSimulator(robot=Robot(), table=Table())
+
+        with open(path, "rb") as command_file:
+            assert simulator.process_commands(command_file) == "0,1,NORTH\n1,1,EAST"
+
+    @pytest.mark.parametrize("name", [None, *COMPRESSORS])
+    def test_caller_stream_is_left_open(self, name: str | None) -> None:
+        stream = io.BytesIO(SCRIPT if name is None else COMPRESSORS[name](SCRIPT))
+        simulator = RobotSimulator(robot=Robot(), table=Table())
+
+        simulator.process_commands(stream)
+        gc.collect()
+
+        assert not stream.closed
+
+    def test_abandoned_iteration_leaves_file_open(self, tmp_path: Path) -> None:
+        path = tmp_path / "commands.txt"
+        path.write_bytes(SCRIPT)
+        simulator = RobotSimulator(robot=Robot(), table=Table())
+
+        with open(path, "rb") as command_file:
+            reports = simulator.iter_reports(command_file)
+            assert next(reports) == "0,1,NORTH"
+            del reports
+            gc.collect()
+            assert not command_file.closed
+
+    def test_plain_text_starting_like_bz2(self) -> None:
+        simulator = RobotSimulator(robot=Robot(), table=Table())
+        script = b"BZh MOVE\nPLACE 0,0,NORTH\nREPORT\n"
+
+        assert simulator.process_commands(io.BytesIO(script)) == "0,0,NORTH"
+
+
+class TestOpenOutput:
+    @pytest.mark.parametrize(
+        ["suffix", "decompress"],
+        [
+            [".txt", lambda data: data],
+            [".gz", gzip.decompress],
+            [".bz2", bz2.decompress],
+            [".xz", lzma.decompress],
+        ],
+    )
+    def test_compressed_by_suffix(
+        self, tmp_path: Path, suffix: str, decompress: Callable[[bytes], bytes]
+    ) -> None:
+        path = tmp_path / f"reports{suffix}"
+        with open_output(path) as output:
+            output.write("0,1,NORTH\n")
+
+        assert decompress(path.read_bytes()) == b"0,1,NORTH\n"
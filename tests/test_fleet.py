@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from toy_robot.compiler import OP_MOVE, OP_PLACE, OPCODE_BITS
+from toy_robot.fleet import OP_NOOP, Fleet, TickProgram
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+COMMANDS = [
+    "PLACE 0,0,NORTH",
+    "PLACE 2,3,WEST",
+    "PLACE 4,4,EAST",
+    "PLACE 5,1,SOUTH",
+    "MOVE",
+    "MOVE",
+    "MOVE",
+    "LEFT",
+    "RIGHT",
+    "REPORT",
+    "REPORT",
+    "FOO",
+]
+
+
+class TestFleet:
+    def test_tick_places_moves_and_reports(self) -> None:
+        fleet = Fleet(3, Table())
+        fleet.tick(["PLACE 0,0,NORTH", "PLACE 4,4,EAST", "MOVE"])
+        fleet.tick(["MOVE", "MOVE", "PLACE 1,1,SOUTH"])
+        assert fleet.tick(["REPORT", "REPORT", "LEFT"]) == [
+            "0,1,NORTH",
+            "4,4,EAST",
+            None,
+        ]
+
+    def test_unplaced_robot_does_not_report(self) -> None:
+        fleet = Fleet(1, Table())
+        assert fleet.tick(["REPORT"]) == [None]
+        assert fleet.report(0) is None
+
+    def test_tick_with_wrong_command_count_raises(self) -> None:
+        fleet = Fleet(2, Table())
+        with pytest.raises(ValueError):
+            fleet.step(TickProgram.from_commands(["MOVE"]))
+
+    def test_repeated_commands_share_one_encoding(self) -> None:
+        program = TickProgram.from_commands(
+            [
+                "PLACE 1,2,EAST",
+                "MOVE",
+                "FOO",
+                "PLACE 1,2,EAST",
+                "MOVE",
+                "PLACE 3,0,NORTH",
+            ]
+        )
+        assert program.instructions.tolist() == [
+            OP_PLACE | 1 << OPCODE_BITS,
+            OP_MOVE,
+            OP_NOOP,
+            OP_PLACE | 1 << OPCODE_BITS,
+            OP_MOVE,
+            OP_PLACE,
+        ]
+        assert program.place_x.tolist() == [1, 0, 0, 1, 0, 3]
+        assert program.place_y.tolist() == [2, 0, 0, 2, 0, 0]
+
+    def test_empty_tick(self) -> None:
+        assert len(TickProgram.from_commands([]).instructions) == 0
+
+    @pytest.mark.parametrize("seed", range(3))
+    @pytest.mark.parametrize(["width", "height"], [(5, 5), (1, 3)])
+    def test_fleet_matches_scalar_simulators(
+        self, seed: int, width: int, height: int
+    ) -> None:
+        rng = random.Random(seed)
+        size = 50
+        fleet = Fleet(size, Table(width, height))
+        simulators = [
+            RobotSimulator(robot=Robot(), table=Table(width, height))
+            for _ in range(size)
+        ]
+        for _ in range(100):
+            commands = [rng.choice(COMMANDS) for _ in range(size)]
+            expected = [
+                simulator.process_command(command)
+                for simulator, command in zip(simulators, commands, strict=True)
+            ]
+            assert fleet.tick(commands) == expected
+
+        assert [fleet.report(index) for index in range(size)] == [
+            str(simulator.robot) if simulator.robot.is_placed else None
+            for simulator in simulators
+        ]
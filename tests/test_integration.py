@@ -1,5 +1,9 @@
+import bz2
+import gzip
+import io
 import subprocess
 import sys
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
 from unittest.mock import MagicMock, patch
@@ -10,6 +14,11 @@ from toy_robot.cli import main
 
 
 class TestInteractiveMode:
+    @pytest.fixture(autouse=True)
+    def terminal_stdin(self) -> Iterator[None]:
+        with patch("toy_robot.cli._stdin_is_interactive", return_value=True):
+            yield
+
     @patch(
         "builtins.input",
         side_effect=["PLACE 1,2,NORTH", "MOVE", "REPORT", KeyboardInterrupt],
@@ -42,6 +51,45 @@ class TestInteractiveMode:
         assert "Welcome to the Robot Simulator" in captured.out
 
 
+class TestPipedInput:
+    @patch("sys.argv", ["toy-robot"])
+    def test_piped_stdin_is_read_in_bulk(
+        self, monkeypatch: pytest.MonkeyPatch, capsys: Any
+    ) -> None:
+        monkeypatch.setattr("sys.stdin", io.StringIO("PLACE 0,0,NORTH\nMOVE\nREPORT\n"))
+
+        main()
+
+        assert capsys.readouterr().out == "0,1,NORTH\n"
+
+    @patch("sys.argv", ["toy-robot"])
+    def test_piped_stdin_may_be_compressed(
+        self, monkeypatch: pytest.MonkeyPatch, capsys: Any
+    ) -> None:
+        data = gzip.compress(b"PLACE 0,0,NORTH\nMOVE\nREPORT\n")
+        monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(data)))
+
+        main()
+
+        assert capsys.readouterr().out == "0,1,NORTH\n"
+
+    @patch("sys.argv", ["toy-robot", "--line-buffered"])
+    def test_line_buffered_flushes_each_report(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(
+            "sys.stdin", io.StringIO("PLACE 0,0,NORTH\nREPORT\nREPORT\n")
+        )
+        stdout = MagicMock()
+        monkeypatch.setattr("sys.stdout", stdout)
+
+        main()
+
+        assert stdout.flush.call_count >= 2
+        written = "".join(call.args[0] for call in stdout.write.call_args_list)
+        assert written == "0,0,NORTH\n0,0,NORTH\n"
+
+
 class TestHelp:
     @patch("sys.argv", ["toy-robot", "--help"])
     def test_help_flag(self, capsys: Any) -> None:
@@ -95,6 +143,243 @@ class TestFileMode:
         captured = capsys.readouterr()
         assert captured.out.strip() == "0,0,NORTH"
 
+    def test_mmap_mode_matches_text_mode(self, tmp_path: Path, capsys: Any) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text(
+            "MOVE\nPLACE 1,2,EAST\nMOVE\nREPORT\nPLACE 7,7,NORTH\nLEFT\nREPORT\n"
+        )
+
+        with patch("sys.argv", ["toy-robot", "-f", str(command_file)]):
+            main()
+        text_output = capsys.readouterr().out
+
+        with patch("sys.argv", ["toy-robot", "-f", str(command_file), "--mmap"]):
+            main()
+        mmap_output = capsys.readouterr().out
+
+        assert mmap_output == text_output == "2,2,EAST\n2,2,NORTH\n"
+
+    def test_split_mode_matches_text_mode(self, tmp_path: Path, capsys: Any) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text("PLACE 1,2,EAST\nMOVE\nREPORT\nLEFT\nMOVE\nREPORT\n")
+
+        argv = ["toy-robot", "-f", str(command_file), "--split", "--jobs", "2"]
+        with patch("sys.argv", argv):
+            main()
+
+        assert capsys.readouterr().out == "2,2,EAST\n2,3,NORTH\n"
+
+    @pytest.mark.parametrize("kind", ["several", "directory", "glob"])
+    def test_split_rejects_more_than_one_file(
+        self, tmp_path: Path, kind: str, capsys: Any
+    ) -> None:
+        for name in ("a.txt", "b.txt"):
+            (tmp_path / name).write_text("PLACE 0,0,NORTH\nREPORT\n")
+        files = {
+            "several": [str(tmp_path / "a.txt"), str(tmp_path / "b.txt")],
+            "directory": [str(tmp_path)],
+            "glob": [str(tmp_path / "*.txt")],
+        }[kind]
+
+        argv = ["toy-robot", "-f", *files, "--split", "--jobs", "2"]
+        with patch("sys.argv", argv), pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 2
+        assert "--split requires a single --file" in capsys.readouterr().err
+
+    @pytest.mark.parametrize("jobs", ["0", "-1"])
+    def test_jobs_must_be_positive(self, tmp_path: Path, jobs: str) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text("PLACE 0,0,NORTH\n")
+
+        argv = ["toy-robot", "-f", str(command_file), "--jobs", jobs]
+        with patch("sys.argv", argv), pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 2
+
+    def test_stats_are_printed_to_stderr(self, tmp_path: Path, capsys: Any) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text("MOVE\nPLACE 0,0,NORTH\nFOO\nREPORT\n")
+
+        with patch("sys.argv", ["toy-robot", "-f", str(command_file), "--stats"]):
+            main()
+
+        captured = capsys.readouterr()
+        assert captured.out == "0,0,NORTH\n"
+        assert "not_placed" in captured.err
+        assert "Parse latency" in captured.err
+
+    def test_stats_rejects_mmap(self, tmp_path: Path) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text("PLACE 0,0,NORTH\n")
+
+        argv = ["toy-robot", "-f", str(command_file), "--stats", "--mmap"]
+        with patch("sys.argv", argv), pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 2
+
+    def test_binary_file_is_detected(self, tmp_path: Path, capsys: Any) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text("PLACE 0,0,NORTH\nMOVE\nFOO\nREPORT\n")
+        binary_file = tmp_path / "commands.trb"
+
+        with patch(
+            "sys.argv", ["toy-robot", "convert", str(command_file), str(binary_file)]
+        ):
+            main()
+        captured = capsys.readouterr()
+        assert f"{command_file}:3: invalid command 'FOO'" in captured.err
+        assert "Converted 3 commands" in captured.err
+
+        with patch("sys.argv", ["toy-robot", "-f", str(binary_file)]):
+            main()
+        assert capsys.readouterr().out == "0,1,NORTH\n"
+
+    @pytest.mark.parametrize("extra_file", [False, True])
+    def test_corrupt_binary_file_exits_with_error(
+        self, tmp_path: Path, capsys: Any, extra_file: bool
+    ) -> None:
+        binary_file = tmp_path / "commands.trb"
+        binary_file.write_bytes(b"TRB\x00\x01\x00\x00\x00\x05")
+        text_file = tmp_path / "commands.txt"
+        text_file.write_text("PLACE 0,0,NORTH\nREPORT\n")
+        files = [str(text_file), str(binary_file)] if extra_file else [str(binary_file)]
+
+        with (
+            patch("sys.argv", ["toy-robot", "-f", *files]),
+            pytest.raises(SystemExit) as exc_info,
+        ):
+            main()
+
+        assert exc_info.value.code == 1
+        error = capsys.readouterr().err
+        assert f"File {binary_file} is not a valid command file" in error
+
+    def test_state_at_line(self, tmp_path: Path, capsys: Any) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text("PLACE 0,0,NORTH\nMOVE\nMOVE\nRIGHT\n")
+
+        argv = ["toy-robot", "state", str(command_file), "3", "--interval", "2"]
+        with patch("sys.argv", argv):
+            main()
+
+        assert capsys.readouterr().out == "0,2,NORTH\n"
+
+    def test_cached_run_replays_output(self, tmp_path: Path, capsys: Any) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text("PLACE 0,0,NORTH\nMOVE\nREPORT\n")
+        cache_dir = tmp_path / "cache"
+
+        argv = ["toy-robot", "-f", str(command_file), "--cache-dir", str(cache_dir)]
+        for _ in range(2):
+            with patch("sys.argv", argv):
+                main()
+            assert capsys.readouterr().out == "0,1,NORTH\n"
+
+        assert len(list(cache_dir.glob("*.result"))) == 1
+
+    def test_malformed_cache_entry_is_rerun(self, tmp_path: Path, capsys: Any) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text("PLACE 0,0,NORTH\nMOVE\nREPORT\n")
+        cache_dir = tmp_path / "cache"
+        argv = ["toy-robot", "-f", str(command_file), "--cache-dir", str(cache_dir)]
+        with patch("sys.argv", argv):
+            main()
+        for entry in cache_dir.glob("*.result"):
+            entry.write_text("garbage")
+
+        with patch("sys.argv", argv):
+            main()
+
+        assert capsys.readouterr().out == "0,1,NORTH\n" * 2
+
+    def test_macros(self, tmp_path: Path, capsys: Any) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text("PLACE 0,0,NORTH\nREPEAT 1000000 { MOVE }\nREPORT\n")
+
+        with patch("sys.argv", ["toy-robot", "-f", str(command_file), "--macros"]):
+            main()
+
+        assert capsys.readouterr().out == "0,4,NORTH\n"
+
+    def test_compressed_input_and_output(self, tmp_path: Path) -> None:
+        command_file = tmp_path / "commands.txt.gz"
+        command_file.write_bytes(gzip.compress(b"PLACE 0,0,NORTH\nMOVE\nREPORT\n"))
+        output_file = tmp_path / "reports.txt.bz2"
+
+        argv = ["toy-robot", "-f", str(command_file), "-o", str(output_file)]
+        with patch("sys.argv", argv):
+            main()
+
+        assert bz2.decompress(output_file.read_bytes()) == b"0,1,NORTH\n"
+
+    def test_pipeline_prints_stage_stats(self, tmp_path: Path, capsys: Any) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text("PLACE 0,0,NORTH\nMOVE\nREPORT\n")
+
+        with patch("sys.argv", ["toy-robot", "-f", str(command_file), "--pipeline"]):
+            main()
+
+        captured = capsys.readouterr()
+        assert captured.out == "0,1,NORTH\n"
+        assert "read     3 lines in 1 batches" in captured.err
+        assert "Bottleneck: " in captured.err
+
+    @pytest.mark.parametrize("flag", ["--line-buffered", "--stats", "--macros"])
+    def test_pipeline_rejects_incompatible_flags(self, flag: str) -> None:
+        with (
+            patch("sys.argv", ["toy-robot", "--pipeline", flag]),
+            pytest.raises(SystemExit) as exc_info,
+        ):
+            main()
+
+        assert exc_info.value.code == 2
+
+    def test_multiplexed_file(self, tmp_path: Path, capsys: Any) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text(
+            "r1 PLACE 0,0,NORTH\nr2 PLACE 0,0,EAST\nr1 MOVE\nr2 MOVE\n"
+            "r2 REPORT\nr1 REPORT\n"
+        )
+        argv = ["toy-robot", "-f", str(command_file), "--multiplexed"]
+
+        with patch("sys.argv", argv + ["--max-resident", "1"]):
+            main()
+
+        assert capsys.readouterr().out == "r2: 1,0,EAST\nr1: 0,1,NORTH\n"
+
+    def test_multiple_files_output_in_order(self, tmp_path: Path, capsys: Any) -> None:
+        first = tmp_path / "first.txt"
+        first.write_text("PLACE 0,0,NORTH\nREPORT\n")
+        second = tmp_path / "second.txt"
+        second.write_text("PLACE 1,1,EAST\nREPORT\n")
+
+        argv = ["toy-robot", "-f", str(second), str(first), "--jobs", "2"]
+        with patch("sys.argv", argv):
+            main()
+
+        captured = capsys.readouterr()
+        assert captured.out == (
+            f"==> {second} <==\n1,1,EAST\n==> {first} <==\n0,0,NORTH\n"
+        )
+        assert "Processed 2 files" in captured.err
+
+    def test_multiple_files_missing_file_error(
+        self, tmp_path: Path, capsys: Any
+    ) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text("PLACE 0,0,NORTH\nREPORT\n")
+
+        argv = ["toy-robot", "-f", str(command_file), str(tmp_path / "missing.txt")]
+        with patch("sys.argv", argv), pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 1
+        assert "not found" in capsys.readouterr().out
+
 
 class TestSubprocess:
     def test_file_mode_end_to_end(self, tmp_path: Path) -> None:
@@ -121,6 +406,25 @@ class TestSubprocess:
         assert result.returncode == 0
         assert "0,1,NORTH" in result.stdout
 
+    def test_line_buffered_responds_before_eof(self) -> None:
+        with subprocess.Popen(
+            [sys.executable, "-m", "toy_robot", "--line-buffered"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        ) as process:
+            assert process.stdin is not None and process.stdout is not None
+            process.stdin.write("PLACE 1,1,EAST\nREPORT\n")
+            process.stdin.flush()
+            assert process.stdout.readline() == "1,1,EAST\n"
+
+            process.stdin.write("MOVE\nREPORT\n")
+            process.stdin.flush()
+            assert process.stdout.readline() == "2,1,EAST\n"
+            process.stdin.close()
+
+        assert process.returncode == 0
+
     def test_non_existent_file_error(self) -> None:
         non_existent_file = "invalid.txt"
         result = subprocess.run(
@@ -0,0 +1,128 @@
+import io
+
+import pytest
+
+from toy_robot.data_classes import Direction, Point
+from toy_robot.macros import MacroRobotSimulator
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+
+@pytest.fixture
+def simulator() -> MacroRobotSimulator:
+    simulator = MacroRobotSimulator(robot=Robot(), table=Table())
+    simulator.process_command("PLACE 0,0,NORTH")
+    return simulator
+
+
+class TestRepeat:
+    def test_repeat_runs_body_count_times(self, simulator: MacroRobotSimulator) -> None:
+        assert simulator.process_command("REPEAT 3 { MOVE REPORT }") == (
+            "0,1,NORTH\n0,2,NORTH\n0,3,NORTH"
+        )
+
+    def test_huge_repeat_is_fast_forwarded(
+        self, simulator: MacroRobotSimulator
+    ) -> None:
+        simulator.process_command("REPEAT 1000000001 {MOVE RIGHT}")
+
+        assert simulator.robot.position == Point(0, 1)
+        assert simulator.robot.direction == Direction.EAST
+
+    @pytest.mark.parametrize("count", [0, 1, 5, 12, 13, 29])
+    @pytest.mark.parametrize(
+        ["body", "expanded_body"],
+        [
+            ["MOVE MOVE RIGHT REPORT", ["MOVE", "MOVE", "RIGHT", "REPORT"]],
+            ["MOVE REPORT", ["MOVE", "REPORT"]],
+            [
+                "LEFT MOVE MOVE REPORT RIGHT",
+                ["LEFT", "MOVE", "MOVE", "REPORT", "RIGHT"],
+            ],
+            ["REPEAT 3 { MOVE REPORT } RIGHT", ["MOVE", "REPORT"] * 3 + ["RIGHT"]],
+            ["PLACE 1, 1, WEST MOVE REPORT", ["PLACE 1, 1, WEST", "MOVE", "REPORT"]],
+        ],
+    )
+    def test_matches_expanded_script(
+        self, count: int, body: str, expanded_body: list[str]
+    ) -> None:
+        table = Table(3, 4)
+        simulator = MacroRobotSimulator(robot=Robot(), table=table)
+        simulator.process_command("PLACE 0,0,NORTH")
+        expanded = RobotSimulator(robot=Robot(), table=table)
+        expanded.process_command("PLACE 0,0,NORTH")
+
+        output = simulator.process_command(f"REPEAT {count} {{ {body} }}")
+
+        script = "".join(f"{line}\n" for line in expanded_body * count)
+        assert output == expanded.process_commands(io.StringIO(script))
+        assert str(simulator.robot) == str(expanded.robot)
+
+    def test_long_unclosed_statement(self, simulator: MacroRobotSimulator) -> None:
+        lines = ["REPEAT 2 {", *["MOVE"] * 50_000, "}"]
+
+        output = [simulator.process_command(line) for line in lines]
+
+        assert output == [None] * len(lines)
+        assert simulator.robot.position == Point(0, 4)
+
+    def test_statement_spans_lines(self, simulator: MacroRobotSimulator) -> None:
+        script = "REPEAT 2 {\n  MOVE\n  REPORT\n}\nREPORT\n"
+        output = simulator.process_commands(io.StringIO(script))
+
+        assert output == "0,1,NORTH\n0,2,NORTH\n0,2,NORTH"
+
+    @pytest.mark.parametrize(
+        "statement",
+        [
+            "REPEAT x { MOVE }",
+            "REPEAT 2 { JUMP }",
+            "REPEAT 2 { PLACE 1,2,UP }",
+            "REPEAT 2 { MOVE } MOVE",
+            "REPEAT 2 { MOVE }}",
+            "REPEATED",
+        ],
+    )
+    def test_invalid_statements_are_ignored(
+        self, simulator: MacroRobotSimulator, statement: str
+    ) -> None:
+        assert simulator.process_command(statement) is None
+        assert simulator.robot.position == Point(0, 0)
+        assert simulator.process_command("REPORT") == "0,0,NORTH"
+
+
+class TestDefine:
+    def test_macro_is_expanded(self, simulator: MacroRobotSimulator) -> None:
+        simulator.process_command("DEFINE STEP { MOVE RIGHT }")
+        simulator.process_command("DEFINE LOOP { REPEAT 4 { STEP } REPORT }")
+
+        assert simulator.process_command("STEP") is None
+        assert simulator.robot.direction == Direction.EAST
+        assert simulator.process_command("LOOP") == "0,1,EAST"
+        assert simulator.process_command("REPEAT 2 { LOOP }") == ("0,1,EAST\n0,1,EAST")
+
+    def test_macros_are_referenced_not_copied(
+        self, simulator: MacroRobotSimulator
+    ) -> None:
+        simulator.process_command("DEFINE M0 { MOVE RIGHT }")
+        for level in range(1, 64):
+            simulator.process_command(
+                f"DEFINE M{level} {{ M{level - 1} M{level - 1} }}"
+            )
+
+        assert len(simulator.macros["M63"]) == 2
+        simulator.process_command("M3")
+        assert simulator.robot.position == Point(0, 0)
+        assert simulator.robot.direction == Direction.NORTH
+
+    @pytest.mark.parametrize("name", ["MOVE", "REPEAT", "1ST"])
+    def test_reserved_and_invalid_names_are_rejected(
+        self, simulator: MacroRobotSimulator, name: str
+    ) -> None:
+        simulator.process_command(f"DEFINE {name} {{ LEFT }}")
+        assert name not in simulator.macros
+
+    def test_undefined_macro_in_body(self, simulator: MacroRobotSimulator) -> None:
+        simulator.process_command("DEFINE A { B }")
+        assert "A" not in simulator.macros
@@ -0,0 +1,81 @@
+import io
+
+import pytest
+
+from toy_robot.data_classes import Direction, Point
+from toy_robot.multi_robot import MultiRobotSimulator
+from toy_robot.table import Table
+
+
+@pytest.fixture
+def simulator() -> MultiRobotSimulator:
+    simulator = MultiRobotSimulator(Table())
+    simulator.process_command("a PLACE 0,0,NORTH")
+    simulator.process_command("b PLACE 0,2,SOUTH")
+    return simulator
+
+
+class TestMultiRobotSimulator:
+    def test_reports_are_prefixed_with_robot_id(
+        self, simulator: MultiRobotSimulator
+    ) -> None:
+        assert simulator.process_command("a REPORT") == "a: 0,0,NORTH"
+        assert simulator.process_command("b REPORT") == "b: 0,2,SOUTH"
+
+    def test_move_onto_occupied_cell_is_ignored(
+        self, simulator: MultiRobotSimulator
+    ) -> None:
+        simulator.process_command("a MOVE")
+        simulator.process_command("b MOVE")
+
+        assert simulator.robots["a"].position == Point(0, 1)
+        assert simulator.robots["b"].position == Point(0, 2)
+
+    def test_place_onto_occupied_cell_is_ignored(
+        self, simulator: MultiRobotSimulator
+    ) -> None:
+        simulator.process_command("c PLACE 0,0,EAST")
+
+        assert "c" not in simulator.robots
+        assert simulator.robot_at(Point(0, 0)) == "a"
+
+    def test_robot_can_be_placed_on_its_own_cell(
+        self, simulator: MultiRobotSimulator
+    ) -> None:
+        simulator.process_command("a PLACE 0,0,EAST")
+
+        assert simulator.robots["a"].direction == Direction.EAST
+        assert simulator.robot_at(Point(0, 0)) == "a"
+
+    def test_occupancy_follows_moves_and_places(
+        self, simulator: MultiRobotSimulator
+    ) -> None:
+        simulator.process_command("a RIGHT")
+        simulator.process_command("a MOVE")
+        simulator.process_command("b PLACE 4,4,WEST")
+
+        assert simulator.occupancy == {Point(1, 0): "a", Point(4, 4): "b"}
+
+    def test_commands_for_unplaced_robots_are_ignored(
+        self, simulator: MultiRobotSimulator
+    ) -> None:
+        assert simulator.process_command("z MOVE") is None
+        assert simulator.process_command("z REPORT") is None
+        assert "z" not in simulator.robots
+
+    @pytest.mark.parametrize("line", ["", "MOVE", " a MOVE", "a FOO", "a  MOVE"])
+    def test_invalid_lines_are_ignored(
+        self, simulator: MultiRobotSimulator, line: str
+    ) -> None:
+        assert simulator.process_command(line) is None
+        assert simulator.occupancy == {Point(0, 0): "a", Point(0, 2): "b"}
+
+    def test_process_commands(self) -> None:
+        simulator = MultiRobotSimulator(Table())
+        script = (
+            "a PLACE 1,1,EAST\nb PLACE 3,1,WEST\na MOVE\nb MOVE\na REPORT\nb REPORT\n"
+        )
+
+        output = simulator.process_commands(io.StringIO(script))
+
+        assert output == "a: 2,1,EAST\nb: 3,1,WEST"
@@ -0,0 +1,138 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from toy_robot.data_classes import Direction, Point
+from toy_robot.multiplex import MultiplexedRobotSimulator
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+
+@pytest.fixture
+def simulator() -> MultiplexedRobotSimulator:
+    simulator = MultiplexedRobotSimulator(Table(), max_resident=2)
+    simulator.process_command("a PLACE 0,0,NORTH")
+    simulator.process_command("b PLACE 0,2,SOUTH")
+    return simulator
+
+
+class TestMultiplexedRobotSimulator:
+    def test_reports_are_tagged_in_input_order(
+        self, simulator: MultiplexedRobotSimulator
+    ) -> None:
+        script = "b REPORT\na MOVE\na REPORT\nb MOVE\nb REPORT\n"
+
+        assert simulator.process_commands(io.StringIO(script)) == (
+            "b: 0,2,SOUTH\na: 0,1,NORTH\nb: 0,1,SOUTH"
+        )
+
+    def test_robots_do_not_block_each_other(
+        self, simulator: MultiplexedRobotSimulator
+    ) -> None:
+        simulator.process_command("a MOVE")
+        simulator.process_command("b MOVE")
+
+        assert simulator.process_command("a REPORT") == "a: 0,1,NORTH"
+        assert simulator.process_command("b REPORT") == "b: 0,1,SOUTH"
+
+    def test_unplaced_robot_is_not_stored(
+        self, simulator: MultiplexedRobotSimulator
+    ) -> None:
+        assert simulator.process_command("c MOVE") is None
+        assert simulator.process_command("c REPORT") is None
+        assert "c" not in simulator.resident
+
+    def test_invalid_lines_are_ignored(
+        self, simulator: MultiplexedRobotSimulator
+    ) -> None:
+        assert simulator.process_command("a JUMP") is None
+        assert simulator.process_command("REPORT") is None
+        assert simulator.process_command("") is None
+        assert simulator.process_command("a REPORT") == "a: 0,0,NORTH"
+
+    def test_states_are_encoded_ints(
+        self, simulator: MultiplexedRobotSimulator
+    ) -> None:
+        assert simulator.resident == {"a": 0, "b": 2 * 5 * 4 + 2}
+
+    def test_max_resident_must_be_positive(self) -> None:
+        with pytest.raises(ValueError):
+            MultiplexedRobotSimulator(Table(), max_resident=0)
+
+
+class TestSpillStore:
+    def test_least_recently_used_robot_is_spilled(
+        self, simulator: MultiplexedRobotSimulator
+    ) -> None:
+        simulator.process_command("a RIGHT")
+        simulator.process_command("c PLACE 4,4,WEST")
+
+        assert list(simulator.resident) == ["a", "c"]
+        assert simulator.evictions == 1
+        simulator.close()
+
+    def test_spilled_robot_is_restored(
+        self, simulator: MultiplexedRobotSimulator
+    ) -> None:
+        simulator.process_command("c PLACE 4,4,WEST")
+        simulator.process_command("d PLACE 3,3,EAST")
+
+        assert simulator.process_command("a MOVE") is None
+        assert simulator.process_command("a REPORT") == "a: 0,1,NORTH"
+        assert simulator.process_command("b REPORT") == "b: 0,2,SOUTH"
+        assert simulator.restores == 2
+        assert simulator.robot.position == Point(0, 2)
+        assert simulator.robot.direction == Direction.SOUTH
+        simulator.close()
+
+    def test_restored_state_supersedes_spilled_copy(
+        self, simulator: MultiplexedRobotSimulator
+    ) -> None:
+        for line in ["c PLACE 4,4,WEST", "a MOVE", "d PLACE 3,3,EAST", "c MOVE"]:
+            simulator.process_command(line)
+        # a was spilled at 0,0, restored and moved, then spilled again.
+        assert "a" not in simulator.resident
+
+        assert simulator.process_command("a REPORT") == "a: 0,1,NORTH"
+        simulator.close()
+
+    def test_matches_separate_runs(self) -> None:
+        simulator = MultiplexedRobotSimulator(Table(), max_resident=1)
+        lines = [f"r{i % 7} PLACE {i % 5},{i % 3},NORTH" for i in range(7)]
+        lines += [f"r{i % 7} {'MOVE' if i % 3 else 'RIGHT'}" for i in range(50)]
+        lines += [f"r{i} REPORT" for i in range(7)]
+
+        output = simulator.process_commands(io.StringIO("\n".join(lines)))
+
+        scripts: dict[str, list[str]] = {}
+        for line in lines:
+            robot_id, _, command = line.partition(" ")
+            scripts.setdefault(robot_id, []).append(command)
+        expected = []
+        for robot_id, script in scripts.items():
+            separate = RobotSimulator(Robot(), Table())
+            report = separate.process_commands(io.StringIO("\n".join(script)))
+            expected.append(f"{robot_id}: {report}")
+        assert output == "\n".join(expected)
+        simulator.close()
+
+    def test_close_removes_spill_directory(self, tmp_path: Path) -> None:
+        simulator = MultiplexedRobotSimulator(
+            Table(), max_resident=1, spill_directory=tmp_path
+        )
+        simulator.process_command("a PLACE 0,0,NORTH")
+        simulator.process_command("b PLACE 1,1,NORTH")
+        assert len(list(tmp_path.iterdir())) == 1
+
+        simulator.close()
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_no_spill_store_below_the_cap(self, tmp_path: Path) -> None:
+        simulator = MultiplexedRobotSimulator(Table(), spill_directory=tmp_path)
+        simulator.process_command("a PLACE 0,0,NORTH")
+
+        assert list(tmp_path.iterdir()) == []
+        simulator.close()
@@ -0,0 +1,90 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from toy_robot.compiler import compile_script, execute_program
+from toy_robot.data_classes import Point
+from toy_robot.obstacles import ObstacleTable
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.state_machine import execute_state_machine
+
+
+class TestObstacleTable:
+    def test_obstacles_are_not_valid_positions(self) -> None:
+        table = ObstacleTable(5, 5, obstacles=[(1, 1), (4, 4)])
+
+        assert not table.is_valid_position(Point(1, 1))
+        assert not table.is_valid_position(Point(4, 4))
+        assert table.is_valid_position(Point(1, 2))
+        assert not table.is_valid_position(Point(5, 0))
+        assert not table.is_valid_position(Point(-1, 0))
+
+    def test_bitmap_uses_one_bit_per_cell(self) -> None:
+        assert ObstacleTable.bitmap_size(1000, 1000) == 125_000
+        assert ObstacleTable.bitmap_size(3, 3) == 2
+
+    def test_obstacle_outside_table_is_rejected(self) -> None:
+        with pytest.raises(ValueError):
+            ObstacleTable(5, 5, obstacles=[(5, 0)])
+
+    def test_wrong_bitmap_size_is_rejected(self) -> None:
+        with pytest.raises(ValueError):
+            ObstacleTable(5, 5, bitmap=bytearray(3))
+
+    def test_table_has_no_instance_dict(self) -> None:
+        assert not hasattr(ObstacleTable(), "__dict__")
+
+
+class TestLoading:
+    def test_from_obstacle_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "obstacles.txt"
+        path.write_text("# shelving\n0,1\n\n2, 3  # pillar\n")
+
+        table = ObstacleTable.from_obstacle_file(path, 5, 5)
+
+        assert table.is_blocked(0, 1)
+        assert table.is_blocked(2, 3)
+        assert not table.is_blocked(1, 0)
+
+    def test_from_obstacle_file_reports_bad_line(self, tmp_path: Path) -> None:
+        path = tmp_path / "obstacles.txt"
+        path.write_text("0,1\n9,9\n")
+
+        with pytest.raises(ValueError, match=":2: invalid obstacle '9,9'"):
+            ObstacleTable.from_obstacle_file(path, 5, 5)
+
+    def test_bitmap_file_round_trip(self, tmp_path: Path) -> None:
+        path = tmp_path / "floor.bitmap"
+        ObstacleTable(300, 200, obstacles=[(0, 0), (299, 199)]).save_bitmap(path)
+
+        table = ObstacleTable.from_bitmap_file(path, 300, 200)
+        table.add_obstacle(5, 5)
+
+        assert table.is_blocked(0, 0)
+        assert table.is_blocked(299, 199)
+        assert table.is_blocked(5, 5)
+        assert not table.is_blocked(1, 0)
+        # Changes to a mapped table are not written back to the file.
+        assert not ObstacleTable.from_bitmap_file(path, 300, 200).is_blocked(5, 5)
+
+
+class TestWithSimulator:
+    def test_place_and_move_respect_obstacles(self) -> None:
+        table = ObstacleTable(5, 5, obstacles=[(0, 2), (2, 2)])
+        simulator = RobotSimulator(robot=Robot(), table=table)
+
+        output = simulator.process_commands(
+            io.StringIO("PLACE 2,2,NORTH\nPLACE 0,0,NORTH\nMOVE\nMOVE\nREPORT\n")
+        )
+
+        assert output == "0,1,NORTH"
+
+    def test_compiled_executors_reject_obstacle_tables(self) -> None:
+        program = compile_script(io.StringIO("PLACE 0,0,NORTH\nMOVE\n"))
+
+        with pytest.raises(ValueError):
+            execute_program(program, Robot(), ObstacleTable())
+        with pytest.raises(ValueError):
+            execute_state_machine(program, Robot(), ObstacleTable())
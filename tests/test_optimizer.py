@@ -0,0 +1,108 @@
+import io
+import random
+from pathlib import Path
+
+import pytest
+
+from toy_robot.compiler import (
+    OP_MOVE_N,
+    OP_REPORT,
+    OP_TURN,
+    OPCODE_BITS,
+    compile_buffer,
+    compile_file,
+    compile_script,
+    execute_program,
+)
+from toy_robot.optimizer import RunFolder, fold_runs
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+
+def _run_heavy_script(seed: int, runs: int) -> str:
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(runs):
+        choice = rng.random()
+        if choice < 0.1:
+            lines.append(f"PLACE {rng.randrange(7)},{rng.randrange(7)},NORTH")
+        elif choice < 0.2:
+            lines.append("REPORT")
+        else:
+            command = rng.choice(["MOVE", "MOVE", "LEFT", "RIGHT"])
+            lines.extend([command] * rng.randrange(1, 12))
+    return "\n".join(lines)
+
+
+class TestFoldRuns:
+    def test_consecutive_moves_fold_into_one_instruction(self) -> None:
+        program = compile_script(io.StringIO("MOVE\n" * 1000 + "REPORT\n"))
+        assert list(fold_runs(program)) == [OP_MOVE_N | 1000 << OPCODE_BITS, OP_REPORT]
+
+    def test_turns_fold_mod_four(self) -> None:
+        program = compile_script(io.StringIO("RIGHT\n" * 7))
+        assert list(fold_runs(program)) == [OP_TURN | 3 << OPCODE_BITS]
+
+    def test_left_right_pairs_cancel(self) -> None:
+        program = compile_script(io.StringIO("MOVE\nLEFT\nRIGHT\nMOVE\nRIGHT\nLEFT\n"))
+        assert list(fold_runs(program)) == [OP_MOVE_N | 2 << OPCODE_BITS]
+
+    def test_folded_move_run_clamps_at_edge(self) -> None:
+        program = fold_runs(
+            compile_script(io.StringIO("PLACE 1,1,EAST\n" + "MOVE\n" * 50 + "REPORT"))
+        )
+        assert execute_program(program, Robot(), Table()) == "4,1,EAST"
+
+    def test_folding_is_idempotent(self) -> None:
+        program = fold_runs(compile_script(io.StringIO(_run_heavy_script(0, 200))))
+        assert fold_runs(program) == program
+
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize(["width", "height"], [(5, 5), (1, 1), (6, 2)])
+    def test_folded_program_matches_process_commands(
+        self, seed: int, width: int, height: int
+    ) -> None:
+        script = _run_heavy_script(seed, 300)
+        simulator = RobotSimulator(robot=Robot(), table=Table(width, height))
+        expected = simulator.process_commands(io.StringIO(script))
+
+        robot = Robot()
+        program = fold_runs(compile_script(io.StringIO(script)))
+        assert execute_program(program, robot, Table(width, height)) == expected
+        assert str(robot) == str(simulator.robot)
+
+
+class TestRunFolder:
+    def test_compiling_with_folder_matches_fold_runs_on_long_runs(self) -> None:
+        script = "PLACE 0,0,NORTH\n" + "MOVE\n" * 100 + "RIGHT\n" * 6 + "REPORT\n"
+        expected = fold_runs(compile_script(io.StringIO(script)))
+        assert compile_buffer(script.encode(), RunFolder()) == expected
+
+    def test_short_runs_are_left_unfolded(self) -> None:
+        script = "MOVE\nLEFT\nMOVE\nRIGHT\nREPORT\n" * 10
+        program = compile_buffer(script.encode(), RunFolder())
+        assert program == compile_script(io.StringIO(script))
+
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize(["width", "height"], [(5, 5), (1, 1), (6, 2)])
+    def test_compiled_with_folder_matches_process_commands(
+        self, tmp_path: Path, seed: int, width: int, height: int
+    ) -> None:
+        script = _run_heavy_script(seed, 300)
+        simulator = RobotSimulator(robot=Robot(), table=Table(width, height))
+        expected = simulator.process_commands(io.StringIO(script))
+
+        command_file = tmp_path / "commands.txt"
+        command_file.write_text(script)
+        robot = Robot()
+        program = compile_file(command_file, RunFolder())
+        assert execute_program(program, robot, Table(width, height)) == expected
+        assert str(robot) == str(simulator.robot)
+
+    def test_text_fallback_is_folded(self, tmp_path: Path) -> None:
+        command_file = tmp_path / "commands.txt"
+        command_file.write_bytes(b"PLACE 0,0,NORTH\r" + b"MOVE\r" * 10 + b"REPORT")
+        program = compile_file(command_file, RunFolder())
+        assert execute_program(program, Robot(), Table()) == "0,4,NORTH"
+        assert len(program) == 5
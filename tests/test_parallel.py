@@ -0,0 +1,120 @@
+import io
+import itertools
+import random
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from toy_robot.compiler import UNPLACED, decode_state, encode_state
+from toy_robot.data_classes import Direction, Point
+from toy_robot.parallel import (
+    compute_transition,
+    iter_reports_parallel,
+    split_file,
+)
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+COMMANDS = [
+    "PLACE 1,2,EAST",
+    "PLACE 0,0,NORTH",
+    "PLACE 6,6,SOUTH",
+    "MOVE",
+    "MOVE",
+    "LEFT",
+    "RIGHT",
+    "REPORT",
+    "FOO",
+]
+
+
+def _write_script(path: Path, seed: int, length: int) -> str:
+    rng = random.Random(seed)
+    script = "\n".join(rng.choice(COMMANDS) for _ in range(length)) + "\n"
+    path.write_text(script)
+    return script
+
+
+class TestSplitFile:
+    def test_chunks_cover_file_and_end_on_line_breaks(self, tmp_path: Path) -> None:
+        path = tmp_path / "commands.txt"
+        script = _write_script(path, 0, 500)
+        bounds = split_file(path, 100)
+        data = script.encode()
+
+        assert bounds[0][0] == 0
+        assert bounds[-1][1] == len(data)
+        for (_, end), (start, _) in itertools.pairwise(bounds):
+            assert end == start
+            assert data[end - 1 : end] == b"\n"
+
+
+class TestComputeTransition:
+    def test_prefix_depends_on_entry_state(self) -> None:
+        table = Table()
+        transition = compute_transition(b"MOVE\nREPORT\n", table)
+        robot = Robot()
+        robot.place(Point(1, 1), Direction.NORTH)
+        state = encode_state(robot, table)
+
+        assert transition.reports(state) == ["1,2,NORTH"]
+        assert transition.reports(UNPLACED) == []
+        assert transition.exit_state(UNPLACED) == UNPLACED
+
+    def test_suffix_is_independent_of_entry_state(self) -> None:
+        transition = compute_transition(b"REPORT\nPLACE 0,0,EAST\nREPORT\n", Table())
+        assert transition.reports(UNPLACED) == ["0,0,EAST"]
+        assert transition.exit_state(UNPLACED) == transition.exit_state(5)
+
+    @pytest.mark.parametrize("table", [Table(), Table(3, 7), Table(1, 1)])
+    def test_prefix_matches_every_entry_state(self, table: Table) -> None:
+        rng = random.Random(0)
+        commands = ["MOVE", "MOVE", "LEFT", "RIGHT", "REPORT", "PLACE 9,9,NORTH"]
+        script = "\n".join(rng.choice(commands) for _ in range(2000)) + "\n"
+
+        transition = compute_transition(script.encode(), table)
+
+        for state in range(table.width * table.height * 4):
+            simulator = RobotSimulator(robot=decode_state(state, table), table=table)
+            expected = list(simulator.iter_reports(io.StringIO(script)))
+            assert transition.reports(state) == expected
+            assert transition.exit_state(state) == encode_state(simulator.robot, table)
+
+
+class TestIterReportsParallel:
+    @pytest.mark.parametrize("seed", range(3))
+    @pytest.mark.parametrize("chunk_size", [64, 1000])
+    def test_matches_sequential_execution(
+        self, tmp_path: Path, seed: int, chunk_size: int
+    ) -> None:
+        path = tmp_path / "commands.txt"
+        script = _write_script(path, seed, 1000)
+        simulator = RobotSimulator(robot=Robot(), table=Table())
+        expected = list(simulator.iter_reports(io.StringIO(script)))
+
+        robot = Robot()
+        reports = iter_reports_parallel(
+            path, robot, Table(), jobs=2, chunk_size=chunk_size
+        )
+        assert list(reports) == expected
+        assert str(robot) == str(simulator.robot)
+
+    def test_single_worker_runs_sequentially(self, tmp_path: Path) -> None:
+        path = tmp_path / "commands.txt"
+        script = _write_script(path, 0, 1000)
+        simulator = RobotSimulator(robot=Robot(), table=Table())
+        expected = list(simulator.iter_reports(io.StringIO(script)))
+
+        with patch("toy_robot.parallel.ProcessPoolExecutor") as executor:
+            reports = list(iter_reports_parallel(path, Robot(), Table(), jobs=1))
+
+        assert reports == expected
+        executor.assert_not_called()
+
+    def test_large_table_is_rejected(self, tmp_path: Path) -> None:
+        path = tmp_path / "commands.txt"
+        path.write_text("PLACE 0,0,NORTH\n")
+        with pytest.raises(ValueError):
+            list(iter_reports_parallel(path, Robot(), Table(1000, 1000)))
@@ -0,0 +1,96 @@
+import gzip
+import io
+import threading
+from collections.abc import Buffer, Generator
+
+import pytest
+
+from toy_robot.data_classes import Direction, Point
+from toy_robot.pipeline import PipelinedRobotSimulator, PipelineStats, StageStats
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+SCRIPT = (
+    "REPORT\nPLACE 0,0,NORTH\nMOVE\nREPORT\nJUMP\nRIGHT\nMOVE\nREPORT\n"
+    "PLACE 9,9,SOUTH\nLEFT\nMOVE\nMOVE\nREPORT\n"
+) * 50
+
+
+def _pipelined(stats: PipelineStats | None = None) -> PipelinedRobotSimulator:
+    return PipelinedRobotSimulator(
+        robot=Robot(), table=Table(), stats=stats, batch_size=7, queue_depth=1
+    )
+
+
+class _FailingStream(io.BytesIO):
+    def readinto(self, buffer: Buffer, /) -> int:
+        raise OSError("read failed")
+
+
+class TestPipelinedRobotSimulator:
+    def test_output_matches_plain_simulator(self) -> None:
+        expected = RobotSimulator(robot=Robot(), table=Table()).process_commands(
+            io.StringIO(SCRIPT)
+        )
+
+        assert _pipelined().process_commands(io.StringIO(SCRIPT)) == expected
+
+    def test_final_state(self) -> None:
+        simulator = _pipelined()
+
+        simulator.process_commands(io.StringIO(SCRIPT))
+
+        assert simulator.robot.position == Point(1, 3)
+        assert simulator.robot.direction == Direction.NORTH
+
+    def test_compressed_input(self) -> None:
+        data = gzip.compress(SCRIPT.encode())
+        expected = RobotSimulator(robot=Robot(), table=Table()).process_commands(
+            io.StringIO(SCRIPT)
+        )
+
+        assert _pipelined().process_commands(io.BytesIO(data)) == expected
+
+    def test_empty_input(self) -> None:
+        assert _pipelined().process_commands(io.StringIO("")) is None
+
+    def test_stage_stats(self) -> None:
+        stats = PipelineStats()
+
+        _pipelined(stats).process_commands(io.StringIO(SCRIPT))
+
+        lines = SCRIPT.count("\n")
+        assert stats.read.items == stats.parse.items == lines
+        assert stats.read.batches == stats.parse.batches == -(-lines // 7)
+        # The invalid JUMP lines never reach the executor.
+        assert stats.execute.items == lines - SCRIPT.count("JUMP")
+        assert stats.bottleneck in stats.stages
+        assert "Bottleneck: " in stats.format()
+
+    def test_read_errors_reach_the_consumer(self) -> None:
+        with pytest.raises(OSError, match="read failed"):
+            _pipelined().process_commands(_FailingStream())
+
+    def test_abandoned_pipeline_stops_its_threads(self) -> None:
+        reports = _pipelined().iter_reports(io.StringIO(SCRIPT))
+        assert isinstance(reports, Generator)
+        assert next(reports) == "0,1,NORTH"
+
+        reports.close()
+
+        for thread in threading.enumerate():
+            if thread.name.startswith("toy-robot-"):
+                thread.join(timeout=5)
+                assert not thread.is_alive()
+
+
+class TestStageStats:
+    def test_rate_uses_busy_time(self) -> None:
+        stage = StageStats("parse", items=500, busy_ns=1_000_000, wait_ns=9_000_000)
+
+        assert stage.items_per_second == 500_000
+        assert str(stage).endswith("500,000 lines/s")
+
+    def test_idle_stage_has_no_rate(self) -> None:
+        assert StageStats("read").items_per_second == 0.0
@@ -0,0 +1,114 @@
+import io
+from collections import deque
+
+import pytest
+
+from toy_robot.data_classes import Direction, Point
+from toy_robot.obstacles import ObstacleTable
+from toy_robot.planner import PathPlanner, UnreachableTargetError
+from toy_robot.robot import Robot, RobotNotPlacedError
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+
+def _robot(x: int, y: int, facing: Direction) -> Robot:
+    robot = Robot()
+    robot.place(Point(x, y), facing)
+    return robot
+
+
+def _drive(robot: Robot, table: Table, commands: list[str]) -> Robot:
+    simulator = RobotSimulator(robot=robot, table=table)
+    simulator.process_commands(io.StringIO("\n".join(commands)))
+    return simulator.robot
+
+
+def _shortest_length(start: Robot, table: Table, target: Point) -> int:
+    # Forward breadth-first search through the simulator itself.
+    seen = {str(start)}
+    queue = deque([(str(start), 0)])
+    while queue:
+        state, distance = queue.popleft()
+        x, y, facing = state.split(",")
+        if Point(int(x), int(y)) == target:
+            return distance
+        for command in ("MOVE", "LEFT", "RIGHT"):
+            robot = _robot(int(x), int(y), Direction[facing])
+            following = str(_drive(robot, table, [command]))
+            if following not in seen:
+                seen.add(following)
+                queue.append((following, distance + 1))
+    return -1
+
+
+class TestPathPlanner:
+    @pytest.mark.parametrize(
+        ["start", "target"],
+        [
+            [(0, 0, Direction.NORTH), Point(0, 4)],
+            [(0, 0, Direction.SOUTH), Point(4, 4)],
+            [(2, 2, Direction.EAST), Point(2, 2)],
+            [(4, 1, Direction.WEST), Point(0, 3)],
+        ],
+    )
+    def test_plan_is_shortest_and_reaches_target(
+        self, start: tuple[int, int, Direction], target: Point
+    ) -> None:
+        table = ObstacleTable(5, 5, obstacles=[(1, 1), (1, 2), (1, 3), (3, 3)])
+        commands = PathPlanner(table).plan(_robot(*start), target)
+
+        assert _drive(_robot(*start), table, commands).position == target
+        assert len(commands) == _shortest_length(_robot(*start), table, target)
+
+    def test_plan_with_facing(self) -> None:
+        table = Table()
+        commands = PathPlanner(table).plan(
+            _robot(0, 0, Direction.NORTH), Point(0, 1), Direction.SOUTH
+        )
+
+        assert commands in (["MOVE", "LEFT", "LEFT"], ["MOVE", "RIGHT", "RIGHT"])
+        assert str(_drive(_robot(0, 0, Direction.NORTH), table, commands)) == (
+            "0,1,SOUTH"
+        )
+
+    def test_already_at_target(self) -> None:
+        planner = PathPlanner(Table())
+        assert planner.plan(_robot(3, 3, Direction.EAST), Point(3, 3)) == []
+
+    def test_unreachable_target(self) -> None:
+        table = ObstacleTable(5, 5, obstacles=[(3, 4), (4, 3)])
+        planner = PathPlanner(table)
+
+        with pytest.raises(UnreachableTargetError):
+            planner.plan(_robot(0, 0, Direction.NORTH), Point(4, 4))
+        with pytest.raises(UnreachableTargetError):
+            planner.plan(_robot(0, 0, Direction.NORTH), Point(3, 4))
+
+    def test_unplaced_robot(self) -> None:
+        with pytest.raises(RobotNotPlacedError):
+            PathPlanner(Table()).plan(Robot(), Point(0, 0))
+
+    def test_distance_fields_are_cached_per_target(self) -> None:
+        planner = PathPlanner(Table(), cache_size=2)
+        dock = Point(4, 0)
+        for x in range(5):
+            planner.plan(_robot(x, 4, Direction.NORTH), dock)
+
+        info = planner.cache_info()
+        assert (info.hits, info.misses, info.currsize) == (4, 1, 1)
+
+        planner.plan(_robot(0, 0, Direction.NORTH), Point(1, 1))
+        planner.plan(_robot(0, 0, Direction.NORTH), Point(2, 2))
+        planner.plan(_robot(0, 0, Direction.NORTH), dock)
+        assert planner.cache_info().misses == 4
+
+    def test_new_obstacles_invalidate_cached_fields(self) -> None:
+        table = ObstacleTable(5, 1)
+        planner = PathPlanner(table)
+        robot = _robot(0, 0, Direction.EAST)
+        assert planner.plan(robot, Point(4, 0)) == ["MOVE"] * 4
+
+        table.add_obstacle(2, 0)
+        with pytest.raises(UnreachableTargetError):
+            planner.plan(robot, Point(4, 0))
+        assert planner.cache_info().misses == 2
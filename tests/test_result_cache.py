@@ -0,0 +1,134 @@
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from toy_robot import cli
+from toy_robot.data_classes import Direction, Point
+from toy_robot.obstacles import ObstacleTable
+from toy_robot.result_cache import CACHE_DIR_ENV, CachedResult, ResultCache
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+SCRIPT = b"PLACE 1,2,EAST\nMOVE\nREPORT\nLEFT\n"
+
+
+class TestResultCache:
+    def test_key_depends_on_script_table_and_robot(self) -> None:
+        cache = ResultCache(Path("unused"))
+        placed = Robot()
+        placed.place(Point(0, 0), Direction.NORTH)
+
+        key = cache.key_for_bytes(SCRIPT, Table(), Robot())
+        assert key == cache.key_for_bytes(SCRIPT, Table(), Robot())
+        assert key != cache.key_for_bytes(SCRIPT + b"\n", Table(), Robot())
+        assert key != cache.key_for_bytes(SCRIPT, Table(6, 5), Robot())
+        assert key != cache.key_for_bytes(SCRIPT, Table(), placed)
+
+    def test_key_for_file_matches_key_for_bytes(self, tmp_path: Path) -> None:
+        cache = ResultCache(tmp_path / "cache")
+        path = tmp_path / "commands.txt"
+        path.write_bytes(SCRIPT)
+
+        assert cache.key_for_file(path, Table(), Robot()) == cache.key_for_bytes(
+            SCRIPT, Table(), Robot()
+        )
+
+    def test_put_then_get(self, tmp_path: Path) -> None:
+        cache = ResultCache(tmp_path / "cache")
+
+        assert cache.get("a" * 64) is None
+        cache.put("a" * 64, CachedResult("1,1,NORTH\n2,2,EAST", 17))
+        cache.put("b" * 64, CachedResult(None, -1))
+
+        assert cache.get("a" * 64) == CachedResult("1,1,NORTH\n2,2,EAST", 17)
+        assert cache.get("b" * 64) == CachedResult(None, -1)
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path: Path) -> None:
+        # Entries are 42 bytes, so the fourth evicts down to 135 bytes.
+        cache = ResultCache(tmp_path / "cache", max_bytes=150)
+        for index, key in enumerate("abc"):
+            cache.put(key * 64, CachedResult("x" * 40, 0))
+            entry = tmp_path / "cache" / f"{key * 64}.result"
+            os.utime(entry, ns=(index * 10**9, index * 10**9))
+        # A hit makes "a" the most recently used entry.
+        assert cache.get("a" * 64) is not None
+
+        cache.put("d" * 64, CachedResult("x" * 40, 0))
+
+        assert cache.get("b" * 64) is None
+        assert cache.get("a" * 64) is not None
+        assert cache.get("c" * 64) is not None
+        assert cache.get("d" * 64) is not None
+
+    @pytest.mark.parametrize(
+        "contents", [b"garbage\n1,1,NORTH", b"", b"-7\n", b"\xff\n"]
+    )
+    def test_malformed_entry_is_a_miss_and_deleted(
+        self, tmp_path: Path, contents: bytes
+    ) -> None:
+        cache = ResultCache(tmp_path)
+        entry = tmp_path / f"{'a' * 64}.result"
+        entry.write_bytes(contents)
+
+        assert cache.get("a" * 64) is None
+        assert not entry.exists()
+
+    def test_discarded_entry_is_taken_off_the_total(self, tmp_path: Path) -> None:
+        cache = ResultCache(tmp_path)
+        cache.put("a" * 64, CachedResult("x" * 40, 0))
+        cache.put("b" * 64, CachedResult("x" * 40, 0))
+        (tmp_path / f"{'a' * 64}.result").write_text("g" * 42)
+
+        assert cache.get("a" * 64) is None
+        assert (tmp_path / "size").read_text() == "42"
+
+    def test_directory_is_only_scanned_over_the_limit(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        cache = ResultCache(tmp_path / "cache", max_bytes=130)
+        cache.put("a" * 64, CachedResult("x" * 40, 0))
+        scans: list[str] = []
+        scandir = os.scandir
+
+        def counting_scandir(path: str) -> Iterator[os.DirEntry[str]]:
+            scans.append(path)
+            return scandir(path)
+
+        monkeypatch.setattr("toy_robot.result_cache.os.scandir", counting_scandir)
+
+        # Entries are 42 bytes, so the fourth goes over the limit.
+        cache.put("b" * 64, CachedResult("x" * 40, 0))
+        cache.put("b" * 64, CachedResult("x" * 40, 0))
+        cache.put("c" * 64, CachedResult("x" * 40, 0))
+        assert scans == []
+        cache.put("d" * 64, CachedResult("x" * 40, 0))
+        assert len(scans) == 1
+        assert cache.get("a" * 64) is None
+        assert cache.get("d" * 64) is not None
+
+    def test_cli_cache_dir_env_matches(self) -> None:
+        assert cli._CACHE_DIR_ENV == CACHE_DIR_ENV
+
+    def test_obstacle_tables_are_not_cached(self) -> None:
+        with pytest.raises(ValueError):
+            ResultCache(Path("unused")).key_for_bytes(SCRIPT, ObstacleTable(), Robot())
+
+
+class TestProcessScript:
+    def test_hit_returns_output_and_final_state(self, tmp_path: Path) -> None:
+        cache = ResultCache(tmp_path / "cache")
+        first = RobotSimulator(robot=Robot(), table=Table())
+        assert first.process_script(SCRIPT, cache) == "2,2,EAST"
+
+        second = RobotSimulator(robot=Robot(), table=Table())
+        assert second.process_script(SCRIPT, cache) == "2,2,EAST"
+        assert second.robot.position == Point(2, 2)
+        assert second.robot.direction == Direction.NORTH
+        assert len(list((tmp_path / "cache").glob("*.result"))) == 1
+
+    def test_without_cache(self) -> None:
+        simulator = RobotSimulator(robot=Robot(), table=Table())
+        assert simulator.process_script(SCRIPT) == "2,2,EAST"
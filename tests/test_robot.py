@@ -102,3 +102,22 @@ class TestRobot:
         assert str(robot) == "Unplaced Robot"
         robot.place(Point(0, 0), Direction.NORTH)
         assert str(robot) == "0,0,NORTH"
+
+    def test_next_position_uses_point_factory(
+        self, placed_robot_north_facing: Robot
+    ) -> None:
+        shared = Point(2, 3)
+        assert placed_robot_north_facing.next_position(lambda x, y: shared) is shared
+
+    def test_move_to_precomputed_position(
+        self, placed_robot_north_facing: Robot
+    ) -> None:
+        next_position = placed_robot_north_facing.next_position()
+        placed_robot_north_facing.move(next_position)
+        assert placed_robot_north_facing.position is next_position
+
+    def test_robot_and_point_have_no_instance_dict(
+        self, placed_robot_north_facing: Robot
+    ) -> None:
+        assert not hasattr(placed_robot_north_facing, "__dict__")
+        assert not hasattr(Point(0, 0), "__dict__")
@@ -0,0 +1,82 @@
+import asyncio
+from pathlib import Path
+
+from toy_robot.server import MAX_LINE_LENGTH, start_server
+
+
+async def _open_tcp_session(
+    server: asyncio.Server,
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    host, port = server.sockets[0].getsockname()[:2]
+    return await asyncio.open_connection(host, port)
+
+
+class TestServer:
+    def test_pipelined_commands_are_answered_in_order(self) -> None:
+        async def scenario() -> list[bytes]:
+            server = await start_server("127.0.0.1", 0)
+            async with server:
+                reader, writer = await _open_tcp_session(server)
+                writer.write(b"PLACE 0,0,NORTH\nREPORT\nMOVE\nFOO\nREPORT\n")
+                await writer.drain()
+                replies = [await reader.readline(), await reader.readline()]
+                writer.close()
+                await writer.wait_closed()
+                return replies
+
+        assert asyncio.run(scenario()) == [b"0,0,NORTH\n", b"0,1,NORTH\n"]
+
+    def test_sessions_have_independent_robots(self) -> None:
+        async def scenario() -> list[bytes]:
+            server = await start_server("127.0.0.1", 0)
+            async with server:
+                sessions = [await _open_tcp_session(server) for _ in range(50)]
+                for index, (_, writer) in enumerate(sessions):
+                    writer.write(f"PLACE {index % 5},{index // 10},EAST\n".encode())
+                for _, writer in sessions:
+                    writer.write(b"REPORT\n")
+                replies = [await reader.readline() for reader, _ in sessions]
+                for _, writer in sessions:
+                    writer.close()
+                return replies
+
+        assert asyncio.run(scenario()) == [
+            f"{index % 5},{index // 10},EAST\n".encode() for index in range(50)
+        ]
+
+    def test_final_line_without_newline_is_processed(self) -> None:
+        async def scenario() -> bytes:
+            server = await start_server("127.0.0.1", 0)
+            async with server:
+                reader, writer = await _open_tcp_session(server)
+                writer.write(b"PLACE 1,1,WEST\r\nREPORT")
+                writer.write_eof()
+                return await reader.read()
+
+        assert asyncio.run(scenario()) == b"1,1,WEST\n"
+
+    def test_overlong_line_closes_session(self) -> None:
+        async def scenario() -> bytes:
+            server = await start_server("127.0.0.1", 0)
+            async with server:
+                reader, writer = await _open_tcp_session(server)
+                writer.write(
+                    b"PLACE 0,0,NORTH\nREPORT\n" + b"X" * (MAX_LINE_LENGTH * 2)
+                )
+                return await reader.read()
+
+        assert asyncio.run(scenario()) == b"0,0,NORTH\n"
+
+    def test_unix_socket(self, tmp_path: Path) -> None:
+        socket_path = tmp_path / "robot.sock"
+
+        async def scenario() -> bytes:
+            server = await start_server(unix_path=socket_path)
+            async with server:
+                reader, writer = await asyncio.open_unix_connection(socket_path)
+                writer.write(b"PLACE 4,4,SOUTH\nREPORT\n")
+                reply = await reader.readline()
+                writer.close()
+                return reply
+
+        assert asyncio.run(scenario()) == b"4,4,SOUTH\n"
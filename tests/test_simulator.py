@@ -1,4 +1,6 @@
 import io
+from collections.abc import Iterator
+from typing import TextIO, cast
 
 import pytest
 
@@ -152,3 +154,35 @@ class TestCommandFileParser:
         simulator = robot_simulator_unplaced_robot
         result = simulator.process_commands(file_like_input)
         assert result == "3,3,NORTH"
+
+    def test_iter_reports_yields_before_input_is_exhausted(
+        self, robot_simulator_unplaced_robot: RobotSimulator
+    ) -> None:
+        def lines() -> Iterator[str]:
+            yield "PLACE 0,0,NORTH"
+            yield "REPORT"
+            raise AssertionError("input read past the first report")
+
+        reports = robot_simulator_unplaced_robot.iter_reports(cast(TextIO, lines()))
+        assert next(reports) == "0,0,NORTH"
+
+    def test_process_commands_no_reports_returns_none(
+        self, robot_simulator_unplaced_robot: RobotSimulator
+    ) -> None:
+        simulator = robot_simulator_unplaced_robot
+        assert (
+            simulator.process_commands(io.StringIO("PLACE 0,0,NORTH\nMOVE\n")) is None
+        )
+
+    def test_moves_reuse_interned_points(
+        self, robot_simulator_unplaced_robot: RobotSimulator
+    ) -> None:
+        simulator = robot_simulator_unplaced_robot
+        simulator.process_command("PLACE 0,0,NORTH")
+        positions = []
+        for command in ["MOVE", "MOVE", "MOVE", "MOVE", "RIGHT"] * 400:
+            simulator.process_command(command)
+            positions.append(simulator.robot.position)
+
+        assert len({id(position) for position in positions}) <= 25
+        assert simulator.robot.position is simulator.table.point(0, 0)
@@ -0,0 +1,84 @@
+import io
+import random
+
+import pytest
+
+from toy_robot.compiler import OP_RIGHT, compile_script
+from toy_robot.optimizer import fold_runs
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.state_machine import (
+    LEFT_ROW,
+    MOVE_ROW,
+    RIGHT_ROW,
+    TransitionTable,
+    execute_state_machine,
+    get_transition_table,
+)
+from toy_robot.table import Table
+
+COMMANDS = [
+    "PLACE 0,0,NORTH",
+    "PLACE 3,1,WEST",
+    "PLACE 9,0,EAST",
+    "MOVE",
+    "MOVE",
+    "MOVE",
+    "LEFT",
+    "RIGHT",
+    "REPORT",
+    "BAD",
+]
+
+
+class TestTransitionTable:
+    def test_move_at_edge_is_clamped(self) -> None:
+        machine = TransitionTable(2, 1)
+        stride = machine.state_count + 1
+        # (1, 0) facing EAST is state (0 * 2 + 1) * 4 + 1 = 5, slot 6.
+        assert machine.transitions[MOVE_ROW * stride + 6] == 6
+        # (0, 0) facing EAST moves to (1, 0) facing EAST.
+        assert machine.transitions[MOVE_ROW * stride + 2] == 6
+
+    def test_unplaced_slot_is_absorbing(self) -> None:
+        machine = TransitionTable(3, 3)
+        stride = machine.state_count + 1
+        for row in (MOVE_ROW, LEFT_ROW, RIGHT_ROW):
+            assert machine.transitions[row * stride] == 0
+
+    def test_move_runs_are_clamped_in_closed_form(self) -> None:
+        machine = TransitionTable(5, 5)
+        # (1, 2) facing NORTH is state (2 * 5 + 1) * 4, slot 45.
+        assert machine.move(45, 1 << 28) == (4 * 5 + 1) * 4 + 1
+        assert machine.move(45, 1) == (3 * 5 + 1) * 4 + 1
+        assert machine.move(0, 3) == 0
+
+    def test_turns_keep_the_cell(self) -> None:
+        machine = TransitionTable(5, 5)
+        assert machine.turn(45, 1) == 46
+        assert machine.turn(45, 3) == 48
+        assert machine.step(48, OP_RIGHT) == 45
+
+    def test_tables_are_cached_by_dimensions(self) -> None:
+        assert get_transition_table(4, 6) is get_transition_table(4, 6)
+        assert get_transition_table(4, 6) is not get_transition_table(6, 4)
+
+
+class TestExecuteStateMachine:
+    @pytest.mark.parametrize("seed", range(3))
+    @pytest.mark.parametrize(["width", "height"], [(5, 5), (1, 1), (2, 7)])
+    @pytest.mark.parametrize("fold", [False, True])
+    def test_matches_process_commands(
+        self, seed: int, width: int, height: int, fold: bool
+    ) -> None:
+        rng = random.Random(seed)
+        script = "\n".join(rng.choice(COMMANDS) for _ in range(1000))
+        simulator = RobotSimulator(robot=Robot(), table=Table(width, height))
+        expected = simulator.process_commands(io.StringIO(script))
+
+        program = compile_script(io.StringIO(script))
+        if fold:
+            program = fold_runs(program)
+        robot = Robot()
+        assert execute_state_machine(program, robot, Table(width, height)) == expected
+        assert str(robot) == str(simulator.robot)
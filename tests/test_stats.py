@@ -0,0 +1,81 @@
+import io
+
+import pytest
+
+from toy_robot.commands import Command
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.stats import (
+    InstrumentedRobotSimulator,
+    LatencyHistogram,
+    RejectReason,
+)
+from toy_robot.table import Table
+
+
+@pytest.fixture
+def instrumented_simulator() -> InstrumentedRobotSimulator:
+    return InstrumentedRobotSimulator(robot=Robot(), table=Table())
+
+
+class TestLatencyHistogram:
+    def test_record_buckets_by_power_of_two(self) -> None:
+        histogram = LatencyHistogram()
+        for nanoseconds in [0, 1, 3, 100, 100]:
+            histogram.record(nanoseconds)
+        assert histogram.count == 5
+        assert histogram.buckets[0] == 1
+        assert histogram.buckets[7] == 2  # 64 <= 100 < 128
+        assert histogram.mean_ns == pytest.approx(40.8)
+        assert histogram.percentile_ns(50) == 3
+        assert histogram.percentile_ns(100) == 127
+
+    def test_empty_histogram(self) -> None:
+        histogram = LatencyHistogram()
+        assert histogram.mean_ns == 0.0
+        assert histogram.percentile_ns(99) == 0
+
+
+class TestInstrumentedRobotSimulator:
+    @pytest.mark.parametrize(
+        ["lines", "reason"],
+        [
+            [["FOO"], RejectReason.UNKNOWN_COMMAND],
+            [["PLACE X,Y,NORTH"], RejectReason.INVALID_PLACE],
+            [["PLACE 5,5,NORTH"], RejectReason.OFF_TABLE_PLACE],
+            [["PLACE 0,4,NORTH", "MOVE"], RejectReason.BLOCKED_MOVE],
+            [["LEFT"], RejectReason.NOT_PLACED],
+        ],
+    )
+    def test_rejections_are_counted_by_reason(
+        self,
+        instrumented_simulator: InstrumentedRobotSimulator,
+        lines: list[str],
+        reason: RejectReason,
+    ) -> None:
+        for line in lines:
+            instrumented_simulator.process_command(line)
+        assert instrumented_simulator.stats.rejections == {reason: 1}
+
+    def test_commands_and_latencies_are_recorded(
+        self, instrumented_simulator: InstrumentedRobotSimulator
+    ) -> None:
+        script = "PLACE 0,0,NORTH\nMOVE\nMOVE\nREPORT\nFOO\n"
+        instrumented_simulator.process_commands(io.StringIO(script))
+        stats = instrumented_simulator.stats
+        assert stats.commands[Command.MOVE] == 2
+        assert stats.commands[Command.PLACE] == 1
+        assert stats.parse_latency.count == 5
+        assert stats.execute_latency.count == 4
+        assert "MOVE" in stats.format()
+
+    def test_output_matches_plain_simulator(
+        self, instrumented_simulator: InstrumentedRobotSimulator
+    ) -> None:
+        script = (
+            "MOVE\nPLACE 1,2,EAST\nMOVE\nMOVE\nLEFT\nMOVE\nREPORT\nPLACE 9,9,WEST\n"
+        )
+        plain = RobotSimulator(robot=Robot(), table=Table())
+        assert instrumented_simulator.process_commands(
+            io.StringIO(script)
+        ) == plain.process_commands(io.StringIO(script))
@@ -1,7 +1,9 @@
+import tracemalloc
+
 import pytest
 
 from toy_robot.data_classes import Point
-from toy_robot.table import Table
+from toy_robot.table import MAX_INTERNED_POINTS, Table
 
 
 class TestTable:
@@ -34,3 +36,34 @@ class TestTable:
         self, five_unit_square_table: Table, coordinate: Point, is_valid: bool
     ) -> None:
         assert five_unit_square_table.is_valid_position(coordinate) == is_valid
+
+    def test_point_on_table_is_interned(self, five_unit_square_table: Table) -> None:
+        point = five_unit_square_table.point(1, 2)
+        assert point == Point(1, 2)
+        assert five_unit_square_table.point(1, 2) is point
+
+    def test_point_off_table_is_not_interned(
+        self, five_unit_square_table: Table
+    ) -> None:
+        point = five_unit_square_table.point(5, 0)
+        assert point == Point(5, 0)
+        assert five_unit_square_table.point(5, 0) is not point
+
+    def test_interning_is_bounded_on_large_tables(self) -> None:
+        table = Table(10_000, 10_000)
+        cells = [(x, y) for y in range(100) for x in range(100)]
+        tracemalloc.start()
+        try:
+            for x, y in cells:
+                table.point(x, y)
+            retained, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # Slotted Points are about 48 bytes, plus a dict slot for each.
+        assert retained < MAX_INTERNED_POINTS * 150
+        assert table.point(0, 0) is table.point(0, 0)
+        assert table.point(99, 99) is not table.point(99, 99)
+
+    def test_table_has_no_instance_dict(self, five_unit_square_table: Table) -> None:
+        assert not hasattr(five_unit_square_table, "__dict__")
@@ -0,0 +1,110 @@
+import dataclasses
+import glob
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from toy_robot.binary_format import is_binary_file, iter_binary_reports
+from toy_robot.compiler import compile_file, execute_program
+from toy_robot.compression import is_compressed_file
+from toy_robot.optimizer import RunFolder
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+
+@dataclasses.dataclass
+class BatchResult:
+    path: Path
+    output: str | None
+    size: int
+    seconds: float
+
+
+@dataclasses.dataclass
+class BatchSummary:
+    files: int = 0
+    size: int = 0
+    seconds: float = 0.0
+
+    def add(self, result: BatchResult) -> None:
+        self.files += 1
+        self.size += result.size
+
+    def __str__(self) -> str:
+        seconds = max(self.seconds, 1e-9)
+        megabytes = self.size / 1_000_000
+        return (
+            f"Processed {self.files} files ({megabytes:.1f} MB) in {self.seconds:.2f}s: "
+            f"{self.files / seconds:.1f} files/s, {megabytes / seconds:.1f} MB/s"
+        )
+
+
+def expand_paths(paths: Iterable[Path]) -> list[Path]:
+    """Expand directories and glob patterns into a sorted list of command files.
+
+    Paths that exist are kept as given (directories contribute the files directly
+    inside them). Anything else is treated as a glob pattern, and kept as-is if it
+    matches nothing so the caller can report it as missing.
+    """
+    expanded: list[Path] = []
+    for path in paths:
+        if path.is_dir():
+            expanded.extend(
+                sorted(child for child in path.iterdir() if child.is_file())
+            )
+        elif path.exists():
+            expanded.append(path)
+        elif matches := sorted(glob.glob(str(path))):
+            expanded.extend(Path(match) for match in matches if Path(match).is_file())
+        else:
+            expanded.append(path)
+    return expanded
+
+
+def run_file(path: Path, use_mmap: bool = False) -> BatchResult:
+    """Run one command file on a fresh robot and 5x5 table."""
+    start = time.perf_counter()
+    simulator = RobotSimulator(robot=Robot(), table=Table())
+    if is_binary_file(path):
+        with open(path, "rb") as command_file:
+            reports = list(
+                iter_binary_reports(command_file, simulator.robot, simulator.table)
+            )
+        output = "\n".join(reports) if reports else None
+    elif use_mmap and not is_compressed_file(path):
+        program = compile_file(path, RunFolder())
+        output = execute_program(program, simulator.robot, simulator.table)
+    else:
+        with open(path, "rb") as command_file:
+            output = simulator.process_commands(command_file)
+    return BatchResult(
+        path=path,
+        output=output,
+        size=path.stat().st_size,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def run_batch(
+    paths: Iterable[Path], jobs: int = 1, use_mmap: bool = False
+) -> Iterator[BatchResult]:
+    """Run many independent command files, yielding results in input order.
+
+    Args:
+        paths (Iterable[Path]): The command files to run.
+        jobs (int): Number of worker processes. 1 runs everything in this process.
+        use_mmap (bool): Read files through the memory-mapped bytes scanner.
+
+    Yields:
+        BatchResult: The result for each file, in the order given.
+    """
+    worker = partial(run_file, use_mmap=use_mmap)
+    if jobs <= 1:
+        yield from map(worker, paths)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(worker, paths, chunksize=16)
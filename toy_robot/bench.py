@@ -0,0 +1,465 @@
+import argparse
+import dataclasses
+import io
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Sequence
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from toy_robot.commands import CommandParser, CommandParserException
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+BASELINE_FORMAT_VERSION = 1
+# Import time budget for `toy-robot -f FILE`, and modules that path must not load.
+STARTUP_BUDGET_US = 50_000
+DEFERRED_MODULES = frozenset(
+    {
+        "argparse",
+        "asyncio",
+        "concurrent.futures",
+        "importlib.metadata",
+        "mmap",
+        "multiprocessing",
+        "textwrap",
+    }
+)
+DIRECTION_NAMES = ("NORTH", "EAST", "SOUTH", "WEST")
+# Sample sizes for the per-object memory figures.
+MEMORY_SIMULATORS = 10_000
+MEMORY_MOVES = 10_000
+# Growth in a memory figure beyond the threshold that is still not reported,
+# to absorb tracemalloc's own noise.
+_MEMORY_SLACK = {"bytes_per_simulator": 8.0, "allocations_per_move": 0.05}
+
+
+@dataclasses.dataclass
+class Workload:
+    name: str
+    lines: list[str]
+    width: int = 5
+    height: int = 5
+
+    @property
+    def script(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _place(rng: random.Random, width: int, height: int, spread: int = 1) -> str:
+    x = rng.randrange(width * spread)
+    y = rng.randrange(height * spread)
+    return f"PLACE {x},{y},{rng.choice(DIRECTION_NAMES)}"
+
+
+def _move_heavy(rng: random.Random, size: int) -> Workload:
+    lines = [_place(rng, 5, 5)]
+    lines += rng.choices(["MOVE", "LEFT", "REPORT"], weights=[90, 8, 2], k=size - 1)
+    return Workload("move", lines)
+
+
+def _turn_heavy(rng: random.Random, size: int) -> Workload:
+    lines = [_place(rng, 5, 5)]
+    lines += rng.choices(["LEFT", "RIGHT", "MOVE"], weights=[45, 45, 10], k=size - 1)
+    return Workload("turn", lines)
+
+
+def _place_heavy(rng: random.Random, size: int) -> Workload:
+    # Coordinates span 3x the table so roughly 9 in 10 placements are invalid.
+    return Workload("place", [_place(rng, 5, 5, spread=3) for _ in range(size)])
+
+
+def _report_heavy(rng: random.Random, size: int) -> Workload:
+    lines = [_place(rng, 5, 5)]
+    lines += rng.choices(["REPORT", "MOVE", "RIGHT"], weights=[80, 15, 5], k=size - 1)
+    return Workload("report", lines)
+
+
+def _garbage(rng: random.Random, size: int) -> Workload:
+    junk = ["", "FOO", "move", " MOVE", "PLACE", "PLACE X,Y,NORTH", "MOVER", "REPORT!"]
+    lines = [_place(rng, 5, 5)]
+    lines += [
+        rng.choice(junk) if rng.random() < 0.8 else rng.choice(["MOVE", "REPORT"])
+        for _ in range(size - 1)
+    ]
+    return Workload("garbage", lines)
+
+
+def _large_table(rng: random.Random, size: int) -> Workload:
+    width = height = 10_000
+    lines = [_place(rng, width, height)]
+    lines += rng.choices(
+        ["MOVE", "LEFT", "RIGHT", "REPORT"], weights=[85, 6, 6, 3], k=size - 1
+    )
+    return Workload("large_table", lines, width, height)
+
+
+WORKLOADS: dict[str, Callable[[random.Random, int], Workload]] = {
+    "move": _move_heavy,
+    "turn": _turn_heavy,
+    "place": _place_heavy,
+    "report": _report_heavy,
+    "garbage": _garbage,
+    "large_table": _large_table,
+}
+
+
+def generate_workload(name: str, size: int, seed: int = 0) -> Workload:
+    """Generate a reproducible synthetic workload of `size` command lines."""
+    return WORKLOADS[name](random.Random(f"{name}:{seed}"), max(size, 1))
+
+
+def _simulator(workload: Workload) -> RobotSimulator:
+    return RobotSimulator(robot=Robot(), table=Table(workload.width, workload.height))
+
+
+def _phase_parse(workload: Workload) -> None:
+    parse = CommandParser.parse_command
+    for line in workload.lines:
+        try:
+            parse(line)
+        except CommandParserException:
+            pass
+
+
+def _phase_process_command(workload: Workload) -> None:
+    process = _simulator(workload).process_command
+    for line in workload.lines:
+        process(line)
+
+
+def _phase_process_commands(workload: Workload) -> None:
+    _simulator(workload).process_commands(io.StringIO(workload.script))
+
+
+def _phase_cli(workload: Workload) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        command_file = Path(directory) / "commands.txt"
+        command_file.write_text(workload.script)
+        subprocess.run(
+            [sys.executable, "-m", "toy_robot", "-f", str(command_file)],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+
+PHASES: dict[str, Callable[[Workload], None]] = {
+    "parse": _phase_parse,
+    "process_command": _phase_process_command,
+    "process_commands": _phase_process_commands,
+    "cli": _phase_cli,
+}
+
+
+@dataclasses.dataclass
+class StartupProfile:
+    # Cumulative import time of the toy_robot modules, in microseconds.
+    toy_robot_us: int
+    modules: set[str]
+
+    @property
+    def deferred_modules_loaded(self) -> set[str]:
+        return self.modules & DEFERRED_MODULES
+
+
+def measure_startup(argv: Sequence[str], stdin: str = "") -> StartupProfile:
+    """Profile the imports of one CLI invocation with `python -X importtime`.
+
+    The invocation reads stdin from a pipe holding the given text.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "toy_robot", *argv],
+        input=stdin,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    toy_robot_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        module = name.strip()
+        modules.add(module)
+        # Only top-level entries, so nested toy_robot imports are not double counted.
+        if module.startswith("toy_robot") and not name.startswith("  "):
+            toy_robot_us += int(cumulative)
+    return StartupProfile(toy_robot_us, modules)
+
+
+def _best_time(function: Callable[[], None], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(workload: Workload) -> int:
+    """Peak traced memory in bytes while processing a workload end to end."""
+    tracemalloc.start()
+    try:
+        _phase_process_commands(workload)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bytes_per_simulator(count: int = MEMORY_SIMULATORS) -> float:
+    """Traced bytes held by a fresh RobotSimulator with its Robot and Table."""
+    tracemalloc.start()
+    try:
+        simulators = [
+            RobotSimulator(robot=Robot(), table=Table()) for _ in range(count)
+        ]
+        held = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del simulators
+    return held / count
+
+
+def allocations_per_move(count: int = MEMORY_MOVES) -> float:
+    """Memory blocks allocated per MOVE by a placed robot driving around a table.
+
+    Every position the robot reaches is kept alive until the count is taken,
+    so a Point allocated per move is counted even though the robot drops it.
+    """
+    simulator = RobotSimulator(robot=Robot(), table=Table())
+    simulator.process_command("PLACE 0,0,NORTH")
+    commands = ["MOVE", "MOVE", "MOVE", "MOVE", "RIGHT"] * (count // 4 + 1)
+    positions: list[object] = [None] * len(commands)
+    process = simulator.process_command
+    tracemalloc.start()
+    try:
+        moves = 0
+        for index, command in enumerate(commands):
+            process(command)
+            positions[index] = simulator.robot.position
+            moves += command == "MOVE"
+            if moves == count:
+                break
+        blocks = sum(
+            stat.count for stat in tracemalloc.take_snapshot().statistics("filename")
+        )
+    finally:
+        tracemalloc.stop()
+    return blocks / count
+
+
+def measure_memory() -> dict[str, float]:
+    return {
+        "bytes_per_simulator": bytes_per_simulator(),
+        "allocations_per_move": allocations_per_move(),
+    }
+
+
+def run_benchmarks(
+    workloads: Sequence[str],
+    phases: Sequence[str],
+    size: int,
+    seed: int = 0,
+    repeat: int = 3,
+) -> dict[str, Any]:
+    """Run every phase against every workload.
+
+    Returns:
+        dict[str, Any]: JSON-serialisable results, in the baseline file format.
+    """
+    results: dict[str, Any] = {}
+    for name in workloads:
+        workload = generate_workload(name, size, seed)
+        # The CLI always simulates the default table, so it can only run
+        # workloads generated for it.
+        workload_phases = [
+            phase
+            for phase in phases
+            if phase != "cli" or (workload.width, workload.height) == (5, 5)
+        ]
+        entry: dict[str, Any] = {"peak_memory_bytes": peak_memory(workload)}
+        for phase in workload_phases:
+            seconds = _best_time(partial(PHASES[phase], workload), repeat)
+            entry[phase] = {
+                "seconds": seconds,
+                "commands_per_sec": len(workload.lines) / max(seconds, 1e-9),
+            }
+        results[name] = entry
+
+    return {
+        "version": BASELINE_FORMAT_VERSION,
+        "size": size,
+        "seed": seed,
+        "memory": measure_memory(),
+        "results": results,
+    }
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """List the workload/phase pairs whose throughput fell more than `threshold` below baseline.
+
+    Memory figures are checked too when both reports carry them, and are
+    reported when they grow by more than `threshold`.
+    """
+    regressions = []
+    baseline_memory = baseline.get("memory", {})
+    for figure, after in current.get("memory", {}).items():
+        if figure not in baseline_memory:
+            continue
+        before = baseline_memory[figure]
+        if after > before * (1 + threshold) + _MEMORY_SLACK.get(figure, 0.0):
+            regressions.append(
+                f"memory/{figure}: {after:,.2f} vs baseline {before:,.2f}"
+            )
+    for name, phases in current["results"].items():
+        baseline_phases = baseline["results"].get(name, {})
+        for phase, metrics in phases.items():
+            if not isinstance(metrics, dict) or phase not in baseline_phases:
+                continue
+            before = baseline_phases[phase]["commands_per_sec"]
+            after = metrics["commands_per_sec"]
+            if after < before * (1 - threshold):
+                regressions.append(
+                    f"{name}/{phase}: {after:,.0f} cmd/s vs baseline {before:,.0f} cmd/s "
+                    f"({after / before - 1:+.1%})"
+                )
+    return regressions
+
+
+def format_results(report: dict[str, Any]) -> str:
+    lines = []
+    if report["results"]:
+        lines.append(f"{'workload':<12} {'phase':<17} {'cmd/s':>14} {'seconds':>9}")
+    for name, phases in report["results"].items():
+        for phase, metrics in phases.items():
+            if isinstance(metrics, dict):
+                lines.append(
+                    f"{name:<12} {phase:<17} {metrics['commands_per_sec']:>14,.0f} "
+                    f"{metrics['seconds']:>9.4f}"
+                )
+        lines.append(
+            f"{name:<12} {'peak memory':<17} {phases['peak_memory_bytes']:>12,} B"
+        )
+    memory = report.get("memory")
+    if memory:
+        lines.append(
+            f"{'bytes per simulator':<30} {memory['bytes_per_simulator']:>12,.1f}"
+        )
+        lines.append(
+            f"{'allocations per MOVE':<30} {memory['allocations_per_move']:>12,.3f}"
+        )
+    return "\n".join(lines)
+
+
+def _check_startup() -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        command_file = Path(directory) / "commands.txt"
+        command_file.write_text("PLACE 0,0,NORTH\nREPORT\n")
+        profile = measure_startup(["-f", str(command_file)])
+
+    print(
+        f"toy_robot imports: {profile.toy_robot_us:,} us (budget {STARTUP_BUDGET_US:,} us)"
+    )
+    if loaded := profile.deferred_modules_loaded:
+        print(f"Deferred modules imported: {', '.join(sorted(loaded))}")
+    return 0 if profile.toy_robot_us <= STARTUP_BUDGET_US and not loaded else 1
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m toy_robot.bench",
+        description="Benchmark the toy robot simulator on synthetic workloads.",
+    )
+    arg_parser.add_argument(
+        "-n", "--size", type=int, default=100_000, help="commands per workload"
+    )
+    arg_parser.add_argument(
+        "--seed", type=int, default=0, help="workload generator seed"
+    )
+    arg_parser.add_argument(
+        "--repeat", type=int, default=3, help="timing repeats, best is kept"
+    )
+    arg_parser.add_argument(
+        "--workloads",
+        default=",".join(WORKLOADS),
+        help=f"comma separated subset of: {', '.join(WORKLOADS)}",
+    )
+    arg_parser.add_argument(
+        "--phases",
+        default=",".join(PHASES),
+        help=f"comma separated subset of: {', '.join(PHASES)}",
+    )
+    arg_parser.add_argument(
+        "--startup",
+        action="store_true",
+        help="only check `toy-robot -f` import time against the startup budget",
+    )
+    arg_parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="only measure bytes per simulator and allocations per MOVE",
+    )
+    arg_parser.add_argument(
+        "--save", type=Path, help="write results to a JSON baseline file"
+    )
+    arg_parser.add_argument(
+        "--compare", type=Path, help="compare against a JSON baseline file"
+    )
+    arg_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="fractional throughput drop reported as a regression (default: 0.2)",
+    )
+    args = arg_parser.parse_args(argv)
+
+    workloads = args.workloads.split(",")
+    phases = args.phases.split(",")
+    for name in workloads:
+        if name not in WORKLOADS:
+            arg_parser.error(f"unknown workload {name!r}")
+    for phase in phases:
+        if phase not in PHASES:
+            arg_parser.error(f"unknown phase {phase!r}")
+
+    if args.startup:
+        return _check_startup()
+
+    if args.memory:
+        report = {
+            "version": BASELINE_FORMAT_VERSION,
+            "size": args.size,
+            "seed": args.seed,
+            "memory": measure_memory(),
+            "results": {},
+        }
+    else:
+        report = run_benchmarks(workloads, phases, args.size, args.seed, args.repeat)
+    print(format_results(report))
+
+    if args.save:
+        args.save.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if regressions := compare(report, baseline, args.threshold):
+            print("\nRegressions:")
+            print("\n".join(regressions))
+            return 1
+        print("\nNo regressions against baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+import dataclasses
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Generator, Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, TextIO
+
+from toy_robot.compiler import (
+    DIRECTIONS,
+    OP_PLACE,
+    OP_TURN,
+    OPCODE_BITS,
+    OPCODE_MASK,
+    compile_line,
+    iter_program_reports,
+)
+from toy_robot.robot import Robot
+from toy_robot.table import Table
+
+# A .trb file is a 16-byte header followed by the compiled program as
+# little-endian 32-bit words, exactly as produced by compiler.compile_line.
+# The header holds the magic, the format version, a reserved field and the
+# number of commands (not words: PLACE takes three).
+MAGIC = b"TRB\x00"
+FORMAT_VERSION = 1
+SUFFIX = ".trb"
+HEADER = struct.Struct("<4sHHQ")
+WORD_SIZE = 4
+
+
+class BinaryFormatError(ValueError):
+    pass
+
+
+@dataclasses.dataclass
+class ConversionResult:
+    commands: int = 0
+    # (line number, line) for every non-blank line that was not a valid command.
+    invalid_lines: list[tuple[int, str]] = dataclasses.field(default_factory=list)
+
+
+def is_binary_header(data: bytes) -> bool:
+    return data[: len(MAGIC)] == MAGIC
+
+
+def is_binary_file(path: str | Path) -> bool:
+    with open(path, "rb") as command_file:
+        return is_binary_header(command_file.read(len(MAGIC)))
+
+
+def _program_bytes(program: array[int]) -> bytes:
+    if sys.byteorder == "little":
+        return program.tobytes()
+    swapped = array("i", program)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+
+def write_program(destination: BinaryIO, program: array[int], commands: int) -> None:
+    """Write a compiled program, holding `commands` commands, in .trb format."""
+    destination.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, commands))
+    destination.write(_program_bytes(program))
+
+
+def convert_script(source: TextIO, destination: BinaryIO) -> ConversionResult:
+    """Compile a text command script into a .trb file.
+
+    Invalid lines are dropped, as they would have no effect when processed, and
+    listed in the result so they can be reported.
+    """
+    result = ConversionResult()
+    program: array[int] = array("i")
+    for line_number, line in enumerate(source, start=1):
+        if compile_line(program, line):
+            result.commands += 1
+        elif line.strip():
+            result.invalid_lines.append((line_number, line.rstrip("\r\n")))
+    write_program(destination, program, result.commands)
+    return result
+
+
+def _read_header(data: bytes | mmap.mmap) -> int:
+    if len(data) < HEADER.size or not is_binary_header(data[: len(MAGIC)]):
+        raise BinaryFormatError("not a .trb command file")
+    _, version, _, commands = HEADER.unpack_from(data)
+    if version != FORMAT_VERSION:
+        raise BinaryFormatError(f"unsupported .trb format version {version}")
+    words, remainder = divmod(len(data) - HEADER.size, WORD_SIZE)
+    # Every command takes one word, except PLACE which takes three.
+    if remainder or not commands <= words <= 3 * commands:
+        raise BinaryFormatError(
+            f".trb program of {words} words cannot hold {commands} commands"
+        )
+    return int(commands)
+
+
+def _check_program(program: Sequence[int], commands: int) -> None:
+    """Raise BinaryFormatError unless every instruction can be executed.
+
+    Instruction words are never negative and hold a known opcode; PLACE has a
+    valid facing and both of its operands, and the header's count matches.
+    """
+    directions = len(DIRECTIONS)
+    count = 0
+    pc = 0
+    end = len(program)
+    while pc < end:
+        instruction = program[pc]
+        opcode = instruction & OPCODE_MASK
+        if instruction < 0 or opcode > OP_TURN:
+            raise BinaryFormatError(f"invalid instruction {instruction} at word {pc}")
+        if opcode == OP_PLACE:
+            if instruction >> OPCODE_BITS >= directions:
+                raise BinaryFormatError(f"invalid PLACE facing at word {pc}")
+            if pc + 3 > end:
+                raise BinaryFormatError(".trb program is truncated")
+            pc += 3
+        else:
+            pc += 1
+        count += 1
+    if count != commands:
+        raise BinaryFormatError(
+            f".trb program holds {count} commands, its header says {commands}"
+        )
+
+
+def load_program(path: Path) -> array[int]:
+    """Read a .trb file into a program array."""
+    data = path.read_bytes()
+    commands = _read_header(data)
+    program: array[int] = array("i", data[HEADER.size :])
+    if sys.byteorder != "little":
+        program.byteswap()
+    _check_program(program, commands)
+    return program
+
+
+@contextmanager
+def map_program(command_file: BinaryIO) -> Iterator[memoryview | array[int]]:
+    """Memory-map an open .trb file and expose its program without copying it.
+
+    The program is a view of 32-bit words directly over the mapped file, so
+    running it costs no parsing and only the pages actually read are loaded.
+    On big-endian hosts the words are copied and byte-swapped instead. The
+    program is checked before it is exposed, so that a corrupt file raises
+    BinaryFormatError rather than failing part way through a run.
+    """
+    with mmap.mmap(command_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        commands = _read_header(buffer)
+        if sys.byteorder != "little":
+            program: array[int] = array("i", buffer[HEADER.size :])
+            program.byteswap()
+            _check_program(program, commands)
+            yield program
+            return
+
+        with memoryview(buffer) as view, view[HEADER.size :].cast("i") as words:
+            _check_program(words, commands)
+            yield words
+
+
+def iter_binary_reports(
+    command_file: BinaryIO, robot: Robot, table: Table
+) -> Generator[str]:
+    """Run an open .trb file against a robot on a table, yielding each REPORT.
+
+    Produces the same reports and final robot state as RobotSimulator.iter_reports
+    on the script the file was converted from.
+    """
+    with map_program(command_file) as program:
+        yield from iter_program_reports(program, robot, table)
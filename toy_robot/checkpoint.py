@@ -0,0 +1,206 @@
+import dataclasses
+import struct
+import zlib
+from array import array
+from collections import deque
+from collections.abc import Sequence
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO
+
+from toy_robot.compiler import (
+    UNPLACED,
+    check_rectangular,
+    compile_bytes,
+    decode_state,
+    encode_state,
+    iter_program_reports,
+)
+from toy_robot.robot import Robot
+from toy_robot.table import Table
+
+# A sidecar index is a header followed by one (byte offset, state) entry for
+# every `interval` lines of the command file, starting with (0, UNPLACED) for
+# line 0. States are encoded as by compiler.encode_state. The header also holds
+# checksums of the file's first bytes and of the bytes before the last
+# checkpoint, so an index for a file that has since been rewritten is rebuilt
+# while one for a file that has only grown is extended.
+INDEX_MAGIC = b"TRI\x00"
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx"
+INDEX_HEADER = struct.Struct("<4sHHIIIII4x")
+INDEX_ENTRY = struct.Struct("<qq")
+DEFAULT_INTERVAL = 10_000
+FINGERPRINT_SIZE = 4096
+
+
+@dataclasses.dataclass
+class CheckpointIndex:
+    interval: int
+    width: int
+    height: int
+    offsets: array[int] = dataclasses.field(default_factory=lambda: array("q", [0]))
+    states: array[int] = dataclasses.field(
+        default_factory=lambda: array("q", [UNPLACED])
+    )
+    head_crc: int = 0
+    tail_crc: int = 0
+
+    @property
+    def indexed_lines(self) -> int:
+        return (len(self.offsets) - 1) * self.interval
+
+    def to_bytes(self) -> bytes:
+        header = INDEX_HEADER.pack(
+            INDEX_MAGIC,
+            INDEX_VERSION,
+            0,
+            self.interval,
+            self.width,
+            self.height,
+            self.head_crc,
+            self.tail_crc,
+        )
+        entries = b"".join(
+            INDEX_ENTRY.pack(offset, state)
+            for offset, state in zip(self.offsets, self.states, strict=True)
+        )
+        return header + entries
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CheckpointIndex | None":
+        """Load an index, or return None if data is not a valid index."""
+        if len(data) < INDEX_HEADER.size + INDEX_ENTRY.size:
+            return None
+        magic, version, _, interval, width, height, head_crc, tail_crc = (
+            INDEX_HEADER.unpack_from(data)
+        )
+        entries = data[INDEX_HEADER.size :]
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            return None
+        if not interval or len(entries) % INDEX_ENTRY.size:
+            return None
+
+        index = cls(interval, width, height, array("q"), array("q"))
+        index.head_crc = head_crc
+        index.tail_crc = tail_crc
+        for offset, state in INDEX_ENTRY.iter_unpack(entries):
+            index.offsets.append(offset)
+            index.states.append(state)
+        return index
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def _fingerprint(command_file: BinaryIO, end: int) -> tuple[int, int]:
+    command_file.seek(0)
+    head = zlib.crc32(command_file.read(min(end, FINGERPRINT_SIZE)))
+    start = max(end - FINGERPRINT_SIZE, 0)
+    command_file.seek(start)
+    tail = zlib.crc32(command_file.read(end - start))
+    return head, tail
+
+
+def _replay(lines: Sequence[bytes], robot: Robot, table: Table) -> None:
+    # Compiling the lines together gives the same universal newline handling
+    # as RobotSimulator reading the file in text mode.
+    program = compile_bytes(b"".join(lines))
+    deque(iter_program_reports(program, robot, table), maxlen=0)
+
+
+def _extend(index: CheckpointIndex, command_file: BinaryIO, table: Table) -> None:
+    offset = index.offsets[-1]
+    robot = decode_state(index.states[-1], table)
+    command_file.seek(offset)
+    while True:
+        lines = list(islice(command_file, index.interval))
+        # Only complete lines are checkpointed, as a file that is still being
+        # written may later extend its last line.
+        if len(lines) < index.interval or not lines[-1].endswith(b"\n"):
+            break
+        _replay(lines, robot, table)
+        offset += sum(map(len, lines))
+        index.offsets.append(offset)
+        index.states.append(encode_state(robot, table))
+
+
+def update_index(
+    path: Path, interval: int = DEFAULT_INTERVAL, table: Table | None = None
+) -> CheckpointIndex:
+    """Bring the sidecar index of a command file up to date and return it.
+
+    An existing index is extended from its last checkpoint if the file has only
+    been appended to since it was written; otherwise it is rebuilt.
+
+    Args:
+        path (Path): The command file.
+        interval (int): Number of lines between checkpoints.
+        table (Table | None): The table the script runs on. Defaults to 5x5.
+
+    Returns:
+        CheckpointIndex: The index, as saved next to the file.
+
+    Raises:
+        ValueError: If the table is not rectangular.
+    """
+    table = table if table is not None else Table()
+    check_rectangular(table)
+    sidecar = index_path(path)
+    saved = sidecar.read_bytes() if sidecar.exists() else b""
+    index = CheckpointIndex.from_bytes(saved)
+
+    with open(path, "rb") as command_file:
+        size = command_file.seek(0, 2)
+        if (
+            index is None
+            or (index.interval, index.width, index.height)
+            != (interval, table.width, table.height)
+            or index.offsets[-1] > size
+            or _fingerprint(command_file, index.offsets[-1])
+            != (index.head_crc, index.tail_crc)
+        ):
+            index = CheckpointIndex(interval, table.width, table.height)
+
+        _extend(index, command_file, table)
+        index.head_crc, index.tail_crc = _fingerprint(command_file, index.offsets[-1])
+
+    if (data := index.to_bytes()) != saved:
+        sidecar.write_bytes(data)
+    return index
+
+
+def state_at_line(
+    path: Path,
+    line: int,
+    interval: int = DEFAULT_INTERVAL,
+    table: Table | None = None,
+) -> Robot:
+    """Return the robot's state after the first `line` lines of a command file.
+
+    Seeks to the nearest checkpoint at or before the line and replays at most
+    `interval` lines from there. Lines are numbered from 1 and split
+    on newline characters, as by `sed -n`, and line 0 is the initial state.
+
+    Raises:
+        ValueError: If the file has fewer than `line` lines, or the table is not
+            rectangular.
+    """
+    if line < 0:
+        raise ValueError("line must not be negative")
+    table = table if table is not None else Table()
+    index = update_index(path, interval, table)
+
+    checkpoint = min(line // index.interval, len(index.offsets) - 1)
+    robot = decode_state(index.states[checkpoint], table)
+    remaining = line - checkpoint * index.interval
+    with open(path, "rb") as command_file:
+        command_file.seek(index.offsets[checkpoint])
+        lines = list(islice(command_file, remaining))
+    if len(lines) < remaining:
+        raise ValueError(
+            f"{path} has only {checkpoint * index.interval + len(lines)} lines"
+        )
+    _replay(lines, robot, table)
+    return robot
@@ -1,56 +1,518 @@
-import argparse
+import io
+import os
 import sys
-import textwrap
-from importlib.metadata import PackageNotFoundError, version
-from pathlib import Path
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING, BinaryIO, NoReturn, TextIO
 
+from toy_robot.compression import HEADER_SIZE, detect_compression
 from toy_robot.robot import Robot
 from toy_robot.simulator import RobotSimulator
 from toy_robot.table import Table
 
+if TYPE_CHECKING:
+    import argparse
+    import contextlib
+    from pathlib import Path
+
+    from toy_robot.pipeline import PipelineStats
+    from toy_robot.result_cache import ResultCache
+    from toy_robot.stats import SimulatorStats
+
+# Everything beyond the plain `-f FILE` path imports its modules lazily, so the
+# common scripted invocation starts without argparse, importlib.metadata,
+# asyncio or multiprocessing. tests/test_bench.py enforces the startup budget.
+
+# result_cache.CACHE_DIR_ENV, repeated here so plain runs never import that module.
+_CACHE_DIR_ENV = "TOY_ROBOT_CACHE_DIR"
+# binary_format.MAGIC, repeated here so text files never import that module.
+_BINARY_MAGIC = b"TRB\x00"
+
+COMMANDS_HELP = """\
+Available commands:
+  PLACE <x>,<y>,<DIRECTION>  e.g. PLACE 0,0,NORTH : Place the robot at the specified position.
+  LEFT                       : Turn the robot 90 degrees to the left.
+  RIGHT                      : Turn the robot 90 degrees to the right.
+  MOVE                       : Move the robot forward one place in the current direction of the robot.
+  REPORT                     : Display the current state of the robot, i.e. its current x,y position and direction.
+"""
+
 
 def _get_version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
     try:
         return version("toy-robot")
     except PackageNotFoundError:
         return "dev"
 
 
-def main() -> None:
-    app_version = _get_version()
-    arg_parser = argparse.ArgumentParser(
-        description=f"Toy Robot Simulator v{app_version}",
+def _write_reports(reports: Iterable[str]) -> None:
+    # sys.stdout is block-buffered when redirected, so reports are written as
+    # they are produced without a flush per line or holding the whole output.
+    write = sys.stdout.write
+    for report in reports:
+        write(report)
+        write("\n")
+
+
+def _exit_invalid_file(file: str | os.PathLike[str], error: Exception) -> NoReturn:
+    sys.stdout.flush()
+    print(f"File {file} is not a valid command file: {error}", file=sys.stderr)
+    sys.exit(1)
+
+
+def _iter_file_reports(
+    file: str | os.PathLike[str],
+    simulator: RobotSimulator,
+    use_mmap: bool = False,
+    split_jobs: int | None = None,
+) -> Iterator[str]:
+    with open(file, "rb") as command_file:
+        # Binary .trb files are recognised by their magic, whatever their name.
+        if command_file.peek(len(_BINARY_MAGIC)).startswith(_BINARY_MAGIC):
+            from toy_robot.binary_format import BinaryFormatError, iter_binary_reports
+
+            try:
+                yield from iter_binary_reports(
+                    command_file, simulator.robot, simulator.table
+                )
+            except BinaryFormatError as error:
+                _exit_invalid_file(file, error)
+            return
+        # Compressed files are always streamed, as they cannot be mapped or split.
+        header = command_file.peek(HEADER_SIZE)[:HEADER_SIZE]
+        if (split_jobs is None and not use_mmap) or detect_compression(header):
+            yield from simulator.iter_reports(command_file)
+            return
+
+    if split_jobs is not None:
+        from pathlib import Path
+
+        from toy_robot.parallel import iter_reports_parallel
+
+        yield from iter_reports_parallel(
+            Path(file), simulator.robot, simulator.table, jobs=split_jobs
+        )
+    elif use_mmap:
+        from pathlib import Path
+
+        from toy_robot.compiler import compile_file, iter_program_reports
+        from toy_robot.optimizer import RunFolder
+
+        program = compile_file(Path(file), RunFolder())
+        yield from iter_program_reports(program, simulator.robot, simulator.table)
+
+
+def _recording(reports: Iterable[str], output_lines: list[str]) -> Iterator[str]:
+    for report in reports:
+        output_lines.append(report)
+        yield report
+
+
+def _run_file(
+    file: str | os.PathLike[str],
+    simulator: RobotSimulator,
+    use_mmap: bool = False,
+    split_jobs: int | None = None,
+    cache: "ResultCache | None" = None,
+) -> None:
+    reports = _iter_file_reports(file, simulator, use_mmap, split_jobs)
+    if cache is None:
+        _write_reports(reports)
+        return
+
+    from toy_robot.compiler import encode_state
+    from toy_robot.result_cache import CachedResult
+
+    key = cache.key_for_file(file, simulator.table, simulator.robot)
+    if (result := cache.get(key)) is not None:
+        if result.output is not None:
+            _write_reports([result.output])
+        return
+
+    output_lines: list[str] = []
+    _write_reports(_recording(reports, output_lines))
+    output = "\n".join(output_lines) if output_lines else None
+    cache.put(key, CachedResult(output, encode_state(simulator.robot, simulator.table)))
+
+
+def _output_to(path: "Path | None") -> "contextlib.AbstractContextManager[object]":
+    """Redirect stdout to a file, compressed according to its suffix."""
+    import contextlib
+
+    if path is None:
+        return contextlib.nullcontext()
+
+    from toy_robot.compression import open_output
+
+    stack = contextlib.ExitStack()
+    output = stack.enter_context(open_output(path))
+    stack.enter_context(contextlib.redirect_stdout(output))
+    return stack
+
+
+def _stdin_is_interactive() -> bool:
+    return sys.stdin.isatty()
+
+
+def _run_stream(simulator: RobotSimulator, line_buffered: bool = False) -> None:
+    """Run commands piped to stdin, without the prompt and welcome message.
+
+    By default stdin is read and stdout written in blocks, for throughput.
+    In line-buffered mode each REPORT is flushed as soon as it is produced,
+    for drivers that wait for a response before sending the next command.
+    """
+    commands: TextIO | BinaryIO = sys.stdin
+    # In blocks, stdin is read as bytes so that compressed input is detected.
+    if not line_buffered and isinstance(sys.stdin, io.TextIOWrapper):
+        commands = sys.stdin.buffer
+    reports = simulator.iter_reports(commands)
+    try:
+        if line_buffered:
+            for report in reports:
+                print(report, flush=True)
+        else:
+            _write_reports(reports)
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+def _run_batch(paths: "list[Path]", jobs: int, use_mmap: bool) -> None:
+    import time
+
+    from toy_robot.batch import BatchSummary, run_batch
+    from toy_robot.binary_format import BinaryFormatError
+
+    summary = BatchSummary()
+    start = time.perf_counter()
+    try:
+        for result in run_batch(paths, jobs=jobs, use_mmap=use_mmap):
+            print(f"==> {result.path} <==")
+            if result.output:
+                print(result.output)
+            summary.add(result)
+    except BinaryFormatError as error:
+        # Results arrive in order, so the failing file is the first one missing.
+        _exit_invalid_file(paths[summary.files], error)
+    summary.seconds = time.perf_counter() - start
+    print(summary, file=sys.stderr)
+
+
+def _convert(source: "Path", destination: "Path") -> None:
+    from toy_robot.binary_format import convert_script
+
+    with open(source, "r") as source_file, open(destination, "wb") as binary_file:
+        result = convert_script(source_file, binary_file)
+    for line_number, line in result.invalid_lines:
+        print(f"{source}:{line_number}: invalid command {line!r}", file=sys.stderr)
+    print(
+        f"Converted {result.commands} commands to {destination} "
+        f"({len(result.invalid_lines)} invalid lines skipped)",
+        file=sys.stderr,
+    )
+
+
+def _fast_path_file(argv: list[str]) -> str | None:
+    """Return the command file for a plain `-f FILE` invocation, if that is what argv is."""
+    if len(argv) == 2 and argv[0] in ("-f", "--file"):
+        file = argv[1]
+    elif len(argv) == 1 and argv[0].startswith("--file="):
+        file = argv[0].removeprefix("--file=")
+    else:
+        return None
+    return file if not file.startswith("-") and os.path.isfile(file) else None
+
+
+def _build_arg_parser() -> "argparse.ArgumentParser":
+    import argparse
+    from pathlib import Path
+
+    class ArgumentParser(argparse.ArgumentParser):
+        # The version is only looked up when help is actually shown.
+        def format_help(self) -> str:
+            self.description = f"Toy Robot Simulator v{_get_version()}"
+            return super().format_help()
+
+    arg_parser = ArgumentParser(
         formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog=textwrap.dedent(
-            """\
-            Available commands:
-              PLACE <x>,<y>,<DIRECTION>  e.g. PLACE 0,0,NORTH : Place the robot at the specified position.
-              LEFT                       : Turn the robot 90 degrees to the left.
-              RIGHT                      : Turn the robot 90 degrees to the right.
-              MOVE                       : Move the robot forward one place in the current direction of the robot.
-              REPORT                     : Display the current state of the robot, i.e. its current x,y position and direction.
-            """,
-        ),
+        epilog=COMMANDS_HELP,
+    )
+    arg_parser.add_argument(
+        "-f",
+        "--file",
+        dest="files",
+        nargs="+",
+        help="path(s) to files containing commands; directories and glob patterns are expanded",
+        type=Path,
+    )
+    arg_parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="write reports to this file instead of stdout, compressed if it ends in .gz, .bz2 or .xz",
+    )
+    arg_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes when running several files (default: 1)",
+    )
+    arg_parser.add_argument(
+        "--split",
+        action="store_true",
+        help="split a single command file into chunks run in parallel across --jobs workers",
+    )
+    arg_parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="memory-map the command file and scan it as bytes (faster on large files)",
+    )
+    arg_parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=os.environ.get(_CACHE_DIR_ENV),
+        help=f"cache the output of single-file runs by content in this directory (default: ${_CACHE_DIR_ENV})",
+    )
+    arg_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="do not read or write the result cache",
+    )
+    arg_parser.add_argument(
+        "--line-buffered",
+        action="store_true",
+        help="read commands from stdin without prompts, flushing each REPORT immediately",
+    )
+    arg_parser.add_argument(
+        "--macros",
+        action="store_true",
+        help="accept REPEAT n { ... } loops and DEFINE NAME { ... } macros",
+    )
+    arg_parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="read, parse and execute commands in concurrent stages, printing each stage's throughput to stderr",
+    )
+    arg_parser.add_argument(
+        "--multiplexed",
+        action="store_true",
+        help='run interleaved "<robot_id> <command>" lines, one independent robot per id, tagging reports with the id',
+    )
+    arg_parser.add_argument(
+        "--max-resident",
+        type=int,
+        default=100_000,
+        help="with --multiplexed, robots kept in memory before idle ones spill to disk (default: 100000)",
     )
     arg_parser.add_argument(
-        "-f", "--file", help="path to file containing commands", type=Path
+        "--spill-dir",
+        type=Path,
+        help="with --multiplexed, directory for the spill store (default: the system temporary directory)",
+    )
+    arg_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="print command counts, rejected lines and latencies to stderr after a file run",
+    )
+
+    subparsers = arg_parser.add_subparsers(dest="mode", title="modes")
+    serve_parser = subparsers.add_parser(
+        "serve", help="serve robot sessions over TCP or a Unix socket"
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1", help="address to bind")
+    serve_parser.add_argument("--port", type=int, default=7878, help="TCP port to bind")
+    serve_parser.add_argument(
+        "--unix", type=Path, help="listen on a Unix socket at this path instead of TCP"
+    )
+    convert_parser = subparsers.add_parser(
+        "convert", help="compile a text command file into the binary .trb format"
+    )
+    convert_parser.add_argument("source", type=Path, help="text command file")
+    convert_parser.add_argument("destination", type=Path, help=".trb file to write")
+    state_parser = subparsers.add_parser(
+        "state",
+        help="print the robot's state after a given line of a command file",
+    )
+    state_parser.add_argument("file", type=Path, help="text command file")
+    state_parser.add_argument(
+        "line", type=int, help="line number; 0 is the state before the first line"
+    )
+    state_parser.add_argument(
+        "--interval",
+        type=int,
+        default=10_000,
+        help="lines between checkpoints in the FILE.idx sidecar index (default: 10000)",
     )
 
-    simulator = RobotSimulator(robot=Robot(), table=Table())
+    return arg_parser
 
+
+def main() -> None:
+    # Piped input with no arguments, or a plain `-f FILE`, is run before
+    # argparse and the optional modes' modules are imported.
+    if not sys.argv[1:] and not _stdin_is_interactive():
+        _run_stream(RobotSimulator(robot=Robot(), table=Table()))
+        return
+    if (
+        _CACHE_DIR_ENV not in os.environ
+        and (file := _fast_path_file(sys.argv[1:])) is not None
+    ):
+        _run_file(file, RobotSimulator(robot=Robot(), table=Table()))
+        return
+
+    arg_parser = _build_arg_parser()
     args = arg_parser.parse_args()
-    if file := args.file:
-        if not file.exists():
-            print(f"File {file} not found")
-            print("Please verify the file path and try again")
-            sys.exit(1)
-        with open(file, "r") as command_file:
-            if output := simulator.process_commands(command_file):
-                print(output)
+    if args.mode == "serve":
+        from toy_robot.server import serve
+
+        serve(args.host, args.port, args.unix)
+        return
+    if args.mode == "convert":
+        if not args.source.is_file():
+            arg_parser.error(f"File {args.source} not found")
+        _convert(args.source, args.destination)
+        return
+    if args.mode == "state":
+        from toy_robot.checkpoint import state_at_line
+
+        if not args.file.is_file():
+            arg_parser.error(f"File {args.file} not found")
+        if args.line < 0 or args.interval < 1:
+            arg_parser.error(
+                "line must not be negative and --interval must be positive"
+            )
+        try:
+            print(state_at_line(args.file, args.line, args.interval))
+        except ValueError as error:
+            arg_parser.error(str(error))
+        return
+
+    if args.output is not None and not (
+        args.files or args.line_buffered or not _stdin_is_interactive()
+    ):
+        arg_parser.error("--output requires --file or commands piped to stdin")
+    if args.jobs < 1:
+        arg_parser.error("--jobs must be positive")
+
+    stats: SimulatorStats | PipelineStats | None = None
+    if args.pipeline and (args.stats or args.macros or args.line_buffered):
+        arg_parser.error(
+            "--pipeline cannot be combined with --stats, --macros or --line-buffered"
+        )
+    if args.multiplexed and (args.stats or args.macros or args.pipeline):
+        arg_parser.error(
+            "--multiplexed cannot be combined with --stats, --macros or --pipeline"
+        )
+    if args.macros and (
+        args.stats or (args.files and (len(args.files) > 1 or args.mmap or args.split))
+    ):
+        arg_parser.error(
+            "--macros requires a single --file without --mmap, --split or --stats"
+        )
+    if args.stats:
+        from toy_robot.binary_format import is_binary_file
+
+        if not args.files or len(args.files) > 1 or args.mmap or args.split:
+            arg_parser.error(
+                "--stats requires a single --file without --mmap or --split"
+            )
+        if args.files[0].is_file() and is_binary_file(args.files[0]):
+            arg_parser.error("--stats requires a text command file")
+        from toy_robot.stats import InstrumentedRobotSimulator
+
+        instrumented = InstrumentedRobotSimulator(robot=Robot(), table=Table())
+        stats = instrumented.stats
+        simulator: RobotSimulator = instrumented
+    elif args.pipeline:
+        from toy_robot.binary_format import is_binary_file
+
+        if args.files and (len(args.files) > 1 or args.mmap or args.split):
+            arg_parser.error(
+                "--pipeline requires a single --file without --mmap or --split"
+            )
+        if args.files and args.files[0].is_file() and is_binary_file(args.files[0]):
+            arg_parser.error("--pipeline requires a text command file")
+        from toy_robot.pipeline import PipelinedRobotSimulator
+
+        pipelined = PipelinedRobotSimulator(robot=Robot(), table=Table())
+        stats = pipelined.stats
+        simulator = pipelined
+    elif args.multiplexed:
+        from toy_robot.binary_format import is_binary_file
+
+        if args.files and (len(args.files) > 1 or args.mmap or args.split):
+            arg_parser.error(
+                "--multiplexed requires a single --file without --mmap or --split"
+            )
+        if args.files and args.files[0].is_file() and is_binary_file(args.files[0]):
+            arg_parser.error("--multiplexed requires a text command file")
+        if args.max_resident < 1:
+            arg_parser.error("--max-resident must be positive")
+        from toy_robot.multiplex import MultiplexedRobotSimulator
+
+        simulator = MultiplexedRobotSimulator(
+            table=Table(),
+            max_resident=args.max_resident,
+            spill_directory=args.spill_dir,
+        )
+    elif args.macros:
+        from toy_robot.macros import MacroRobotSimulator
+
+        simulator = MacroRobotSimulator(robot=Robot(), table=Table())
+    else:
+        simulator = RobotSimulator(robot=Robot(), table=Table())
+
+    if files := args.files:
+        from toy_robot.batch import expand_paths
+
+        paths = expand_paths(files)
+        single_file = len(files) == 1 and paths == files
+        if args.split and not single_file:
+            arg_parser.error(
+                "--split requires a single --file, not several files, a directory or a glob"
+            )
+        for path in paths:
+            if not path.exists():
+                print(f"File {path} not found")
+                print("Please verify the file path and try again")
+                sys.exit(1)
+
+        if single_file:
+            split_jobs = args.jobs if args.split else None
+            cache = None
+            # Macro and multiplexed scripts mean something else to the plain
+            # simulator, and stats (of either kind) need a real run, so none
+            # of them are cached.
+            if (
+                args.cache_dir is not None
+                and not (args.no_cache or args.macros or args.multiplexed)
+                and stats is None
+            ):
+                from toy_robot.result_cache import ResultCache
+
+                cache = ResultCache(args.cache_dir)
+            with _output_to(args.output):
+                _run_file(paths[0], simulator, args.mmap, split_jobs, cache)
+        else:
+            with _output_to(args.output):
+                _run_batch(paths, args.jobs, args.mmap)
+
+        if stats is not None:
+            sys.stdout.flush()
+            print(stats.format(), file=sys.stderr)
+
+    elif args.line_buffered or not _stdin_is_interactive():
+        with _output_to(args.output):
+            _run_stream(simulator, args.line_buffered)
+
+        if stats is not None:
+            sys.stdout.flush()
+            print(stats.format(), file=sys.stderr)
 
     else:
         print(
-            f"Welcome to the Robot Simulator v{app_version}\n\n"
+            f"Welcome to the Robot Simulator v{_get_version()}\n\n"
             "All commands should be in uppercase\n"
             "Type ctrl+c when you are done\n"
             "Full command list can be seen by exiting and running this tool with the --help flag\n"
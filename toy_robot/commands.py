@@ -1,9 +1,13 @@
 import dataclasses
 import re
 from enum import Enum, auto
+from functools import lru_cache
+from typing import NamedTuple
 
 from toy_robot.data_classes import Direction
 
+PLACE_CACHE_SIZE = 1024
+
 
 class CommandParserException(Exception):
     pass
@@ -25,36 +29,102 @@ class Command(Enum):
     RIGHT = auto()
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, slots=True)
 class PlaceCommandArgs:
     x: int
     y: int
     facing: Direction
 
 
+class PlaceCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+
+_BARE_COMMANDS: dict[str, tuple[Command, None]] = {
+    name: (Command[name], None) for name in ("MOVE", "REPORT", "LEFT", "RIGHT")
+}
+_DIRECTIONS = {direction.name: direction for direction in Direction}
+
+
+def _is_number(text: str) -> bool:
+    return text.isascii() and text.isdigit()
+
+
+@lru_cache(maxsize=PLACE_CACHE_SIZE)
+def _scan_place_command_args(command: str) -> PlaceCommandArgs | None:
+    # Hand-written equivalent of CommandParser.place_command_regex, where
+    # str.isspace() matches exactly what \s does for str patterns.
+    if len(command) < 6 or not command.startswith("PLACE") or not command[5].isspace():
+        return None
+
+    x, separator, rest = command[6:].partition(",")
+    if not separator or not _is_number(x):
+        return None
+
+    if rest[:1].isspace():
+        rest = rest[1:]
+    y, separator, rest = rest.partition(",")
+    if not separator or not _is_number(y):
+        return None
+
+    if rest[:1].isspace():
+        rest = rest[1:]
+    if (facing := _DIRECTIONS.get(rest.rstrip())) is None:
+        return None
+
+    return PlaceCommandArgs(int(x), int(y), facing)
+
+
 class CommandParser:
+    # The PLACE grammar. Parsing uses an equivalent hand-written scanner, which
+    # is faster; the pattern is kept as the reference definition.
     place_command_regex = re.compile(
         r"^PLACE\s([0-9]+),\s?([0-9]+),\s?(NORTH|EAST|SOUTH|WEST)\s*$",
     )
 
     @classmethod
     def _parse_place_command_args(cls, command: str) -> PlaceCommandArgs:
-        if not (match := re.match(cls.place_command_regex, command)):
+        # Scripts repeat the same PLACE lines many times, so parsed arguments
+        # (and rejections) are memoised in a bounded LRU cache.
+        if (args := _scan_place_command_args(command)) is None:
             raise InvalidPlaceException
 
-        x = int(match.group(1))
-        y = int(match.group(2))
-        direction = Direction[match.group(3).upper()]
-        return PlaceCommandArgs(x, y, direction)
+        return args
+
+    @classmethod
+    def place_cache_info(cls) -> PlaceCacheInfo:
+        """Hit, miss and size counters of the PLACE parse cache."""
+        return PlaceCacheInfo(*_scan_place_command_args.cache_info())
 
     @classmethod
     def parse_command(cls, command: str) -> tuple[Command, PlaceCommandArgs | None]:
+        if (parsed := _BARE_COMMANDS.get(command)) is not None:
+            return parsed
+
         command_type = command.split(" ")[0]
 
-        if command_type in ("MOVE", "REPORT", "LEFT", "RIGHT"):
-            return Command[command_type], None
+        if command_type in _BARE_COMMANDS:
+            return _BARE_COMMANDS[command_type]
 
         if not command_type.startswith("PLACE"):
             raise InvalidCommandException
 
         return Command.PLACE, cls._parse_place_command_args(command)
+
+    @classmethod
+    def parse_robot_command(
+        cls, line: str
+    ) -> tuple[str, Command, PlaceCommandArgs | None]:
+        """Parse a "<robot_id> <command>" line addressed to one of several robots.
+
+        Raises:
+            CommandParserException: If the line has no robot id or the command
+                is invalid.
+        """
+        robot_id, _, command = line.rstrip().partition(" ")
+        if not robot_id:
+            raise InvalidCommandException
+        return robot_id, *cls.parse_command(command)
@@ -0,0 +1,383 @@
+import io
+import mmap
+import re
+from array import array
+from collections.abc import Generator, Iterator, Sequence
+from pathlib import Path
+from typing import TextIO, cast
+
+from toy_robot.commands import Command, CommandParser, CommandParserException
+from toy_robot.data_classes import Direction
+from toy_robot.robot import Robot
+from toy_robot.table import Table
+
+# Opcodes occupy the low three bits of an instruction word. PLACE packs its
+# facing into the bits above the opcode and is followed by two operand words
+# holding x and y. MOVE_N and TURN are only produced by the optimizer and pack
+# their move count and clockwise quarter turns above the opcode.
+OP_MOVE = 0
+OP_LEFT = 1
+OP_RIGHT = 2
+OP_REPORT = 3
+OP_PLACE = 4
+OP_MOVE_N = 5
+OP_TURN = 6
+
+OPCODE_BITS = 3
+OPCODE_MASK = (1 << OPCODE_BITS) - 1
+
+# Coordinates that do not fit in a 32-bit operand can never be on a table, so
+# they are compiled to a sentinel that always fails the bounds check.
+OFF_TABLE_OPERAND = -1
+_MAX_OPERAND = 2**31 - 1
+MAX_PACKED_OPERAND = _MAX_OPERAND >> OPCODE_BITS
+
+# Directions are indexed in clockwise order, so turning right is +1 and
+# turning left is +3 (mod 4).
+DIRECTIONS: tuple[Direction, ...] = tuple(Robot.clockwise_rotations)
+DIRECTION_INDEX = {direction: index for index, direction in enumerate(DIRECTIONS)}
+DIRECTION_DELTAS: tuple[tuple[int, int], ...] = tuple(
+    Robot.direction_deltas[direction] for direction in DIRECTIONS
+)
+
+_BARE_OPCODES = {
+    "MOVE": OP_MOVE,
+    "LEFT": OP_LEFT,
+    "RIGHT": OP_RIGHT,
+    "REPORT": OP_REPORT,
+}
+
+# Bytes that str.rstrip() would strip from an ASCII line, and the bytes-level
+# equivalent of the PLACE grammar in CommandParser with the same notion of \s.
+_ASCII_WHITESPACE = frozenset(b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f")
+_S = rb"[ \t\n\r\x0b\x0c\x1c-\x1f]"
+_PLACE_BYTES_REGEX = re.compile(
+    rb"PLACE"
+    + _S
+    + rb"([0-9]+),"
+    + _S
+    + rb"?([0-9]+),"
+    + _S
+    + rb"?(NORTH|EAST|SOUTH|WEST)"
+    + _S
+    + rb"*$"
+)
+_BARE_OPCODE_BYTES = {name.encode(): opcode for name, opcode in _BARE_OPCODES.items()}
+# Lines that are exactly a bare command, with or without a CRLF carriage return.
+_BARE_LINES = {
+    **_BARE_OPCODE_BYTES,
+    **{token + b"\r": opcode for token, opcode in _BARE_OPCODE_BYTES.items()},
+}
+_ASCII_WHITESPACE_BYTES = bytes(sorted(_ASCII_WHITESPACE))
+# Scripts are split into lines a block of about this many bytes at a time.
+_SCAN_BLOCK_SIZE = 1 << 20
+_FACING_BYTES = {
+    direction.name.encode(): index for index, direction in enumerate(DIRECTIONS)
+}
+# Input the bytes scanner cannot treat exactly like text mode: non-ASCII bytes
+# (unicode whitespace, decoding errors) and bare carriage returns, which text
+# mode treats as line breaks.
+_TEXT_ONLY_BYTES_REGEX = re.compile(rb"[\x80-\xff]|\r(?!\n)")
+
+# A robot's full state as a single integer: UNPLACED, or its cell index on the
+# table times four plus its direction index.
+UNPLACED = -1
+
+
+def encode_state(robot: Robot, table: Table) -> int:
+    if robot.position is None or robot.direction is None:
+        return UNPLACED
+    cell = robot.position.y * table.width + robot.position.x
+    return cell * 4 + DIRECTION_INDEX[robot.direction]
+
+
+def decode_state(state: int, table: Table) -> Robot:
+    robot = Robot()
+    if state != UNPLACED:
+        y, x = divmod(state >> 2, table.width)
+        robot.place(table.point(x, y), DIRECTIONS[state & 3])
+    return robot
+
+
+def check_rectangular(table: Table) -> None:
+    """Raise ValueError for tables the bounds-only compiled executors cannot model."""
+    if not table.is_rectangular:
+        raise ValueError(
+            f"{type(table).__name__} has blocked cells, use RobotSimulator instead"
+        )
+
+
+def _operand(value: int) -> int:
+    return value if value <= _MAX_OPERAND else OFF_TABLE_OPERAND
+
+
+def compile_line(program: array[int], line: str) -> bool:
+    """Append the instruction for a single command line to a program.
+
+    Args:
+        program (array[int]): The program to extend.
+        line (str): A raw command line, as accepted by RobotSimulator.process_command.
+
+    Returns:
+        bool: True if the line was a valid command, False if it was skipped.
+    """
+    line = line.rstrip()
+    opcode = _BARE_OPCODES.get(line.split(" ", 1)[0])
+    if opcode is not None:
+        program.append(opcode)
+        return True
+
+    try:
+        command, place_args = CommandParser.parse_command(line)
+    except CommandParserException:
+        return False
+
+    if command is not Command.PLACE or place_args is None:
+        return False
+
+    program.append(OP_PLACE | DIRECTION_INDEX[place_args.facing] << OPCODE_BITS)
+    program.append(_operand(place_args.x))
+    program.append(_operand(place_args.y))
+    return True
+
+
+def compile_script(file_contents: TextIO) -> array[int]:
+    """Compile a command script into a flat opcode array.
+
+    Invalid lines are dropped, as they would have no effect when processed.
+
+    Args:
+        file_contents (TextIO): The script, one command per line.
+
+    Returns:
+        array[int]: The compiled program, to be run with execute_program.
+    """
+    program: array[int] = array("i")
+    for line in file_contents:
+        compile_line(program, line)
+    return program
+
+
+def iter_program_reports(
+    program: Sequence[int], robot: Robot, table: Table
+) -> Generator[str]:
+    """Run a compiled program against a robot on a table, yielding each REPORT.
+
+    Produces the same reports and final robot state as
+    RobotSimulator.iter_reports on the source script. The robot's state is read
+    when iteration starts and written back when the generator finishes or is closed.
+
+    Args:
+        program (Sequence[int]): A program produced by compile_script.
+        robot (Robot): The robot to drive.
+        table (Table): The table the robot moves on.
+
+    Yields:
+        str: The output of each REPORT, in order.
+
+    Raises:
+        ValueError: If the table is not rectangular.
+    """
+    check_rectangular(table)
+    width = table.width
+    height = table.height
+    deltas = DIRECTION_DELTAS
+    names = [direction.name for direction in DIRECTIONS]
+
+    placed = robot.is_placed
+    x = y = facing = 0
+    if robot.position is not None and robot.direction is not None:
+        x, y = robot.position.x, robot.position.y
+        facing = DIRECTION_INDEX[robot.direction]
+
+    try:
+        pc = 0
+        end = len(program)
+        while pc < end:
+            instruction = program[pc]
+            pc += 1
+            opcode = instruction & OPCODE_MASK
+            if opcode == OP_MOVE:
+                if placed:
+                    dx, dy = deltas[facing]
+                    if 0 <= x + dx < width and 0 <= y + dy < height:
+                        x += dx
+                        y += dy
+            elif opcode == OP_LEFT:
+                facing = (facing + 3) & 3
+            elif opcode == OP_RIGHT:
+                facing = (facing + 1) & 3
+            elif opcode == OP_REPORT:
+                if placed:
+                    yield f"{x},{y},{names[facing]}"
+            elif opcode == OP_PLACE:
+                place_x = program[pc]
+                place_y = program[pc + 1]
+                pc += 2
+                if 0 <= place_x < width and 0 <= place_y < height:
+                    x, y = place_x, place_y
+                    facing = instruction >> OPCODE_BITS
+                    placed = True
+            elif opcode == OP_MOVE_N:
+                if placed:
+                    # The robot is always on the table, so a run of moves is a
+                    # clamp against the edge it is heading towards.
+                    dx, dy = deltas[facing]
+                    count = instruction >> OPCODE_BITS
+                    x = min(max(x + dx * count, 0), width - 1)
+                    y = min(max(y + dy * count, 0), height - 1)
+            elif opcode == OP_TURN:
+                facing = (facing + (instruction >> OPCODE_BITS)) & 3
+    finally:
+        if placed:
+            robot.place(table.point(x, y), DIRECTIONS[facing])
+
+
+def execute_program(program: Sequence[int], robot: Robot, table: Table) -> str | None:
+    """Run a compiled program against a robot on a table.
+
+    Produces the same output and final robot state as
+    RobotSimulator.process_commands on the source script.
+
+    Args:
+        program (Sequence[int]): A program produced by compile_script.
+        robot (Robot): The robot to drive. Its state is read on entry and written back on exit.
+        table (Table): The table the robot moves on.
+
+    Returns:
+        str | None: The REPORT output joined by newlines, or None if nothing was reported.
+    """
+    output_lines = list(iter_program_reports(program, robot, table))
+    return "\n".join(output_lines) if output_lines else None
+
+
+class ProgramBuilder:
+    """Accumulates a program from runs of bare commands and PLACEs."""
+
+    __slots__ = ("program",)
+
+    def __init__(self) -> None:
+        self.program: array[int] = array("i")
+
+    def add_bare(self, opcodes: list[int]) -> None:
+        """Append a run of MOVE, LEFT, RIGHT and REPORT opcodes."""
+        self.program.extend(opcodes)
+
+    def add_place(self, instruction: int, x: int, y: int) -> None:
+        self.program.extend((instruction, x, y))
+
+    def add_program(self, program: Sequence[int]) -> None:
+        """Append an already compiled program."""
+        self.program.extend(program)
+
+    def finish(self) -> array[int]:
+        return self.program
+
+
+def _compile_line_bytes(builder: ProgramBuilder, line: bytes) -> None:
+    line = line.rstrip(_ASCII_WHITESPACE_BYTES)
+    token = line.split(b" ", 1)[0]
+    if (opcode := _BARE_OPCODE_BYTES.get(token)) is not None:
+        builder.add_bare([opcode])
+    elif token.startswith(b"PLACE") and (match := _PLACE_BYTES_REGEX.match(line)):
+        builder.add_place(
+            OP_PLACE | _FACING_BYTES[match.group(3)] << OPCODE_BITS,
+            _operand(int(match.group(1))),
+            _operand(int(match.group(2))),
+        )
+
+
+def _iter_line_blocks(buffer: bytes | mmap.mmap) -> Iterator[list[bytes]]:
+    size = len(buffer)
+    pos = 0
+    while pos < size:
+        end = buffer.find(b"\n", min(pos + _SCAN_BLOCK_SIZE, size) - 1)
+        end = size if end == -1 else end + 1
+        yield buffer[pos:end].split(b"\n")
+        pos = end
+
+
+def compile_buffer(
+    buffer: bytes | mmap.mmap, builder: ProgramBuilder | None = None
+) -> array[int]:
+    """Compile an ASCII command script held in a bytes-like buffer.
+
+    The buffer is split into lines a block at a time and every line is
+    looked up in a table of bare commands in one pass, so runs of MOVE,
+    LEFT, RIGHT and REPORT are copied into the program in bulk. Only the
+    other lines (PLACE, blank and invalid lines) are handled one by one.
+    The buffer must not contain non-ASCII bytes or bare carriage returns;
+    use compile_file to handle any input.
+
+    Args:
+        buffer (bytes | mmap.mmap): The script, one command per line.
+        builder (ProgramBuilder | None): Receives the commands, defaulting to
+            a plain ProgramBuilder.
+
+    Returns:
+        array[int]: The compiled program. With the default builder it is
+            identical to compile_script's output.
+    """
+    if builder is None:
+        builder = ProgramBuilder()
+    add_bare = builder.add_bare
+    for lines in _iter_line_blocks(buffer):
+        opcodes: list[int | None] = list(map(_BARE_LINES.get, lines))
+        start = 0
+        while True:
+            try:
+                other = opcodes.index(None, start)
+            except ValueError:
+                other = len(opcodes)
+            if other > start:
+                add_bare(cast(list[int], opcodes[start:other]))
+            if other == len(opcodes):
+                break
+            _compile_line_bytes(builder, lines[other])
+            start = other + 1
+    return builder.finish()
+
+
+def _finish_compiled(program: array[int], builder: ProgramBuilder | None) -> array[int]:
+    if builder is None:
+        return program
+    builder.add_program(program)
+    return builder.finish()
+
+
+def compile_bytes(data: bytes, builder: ProgramBuilder | None = None) -> array[int]:
+    """Compile a command script held in memory as UTF-8 bytes.
+
+    Uses the bytes scanner where it is exact, and otherwise decodes with the
+    same universal newline handling as a file opened in text mode. A builder
+    is used as by compile_buffer.
+    """
+    if _TEXT_ONLY_BYTES_REGEX.search(data) is None:
+        return compile_buffer(data, builder)
+    program = compile_script(io.StringIO(data.decode(), newline=None))
+    return _finish_compiled(program, builder)
+
+
+def compile_file(path: Path, builder: ProgramBuilder | None = None) -> array[int]:
+    """Compile a command file by memory-mapping it and scanning it as bytes.
+
+    Files the bytes scanner cannot handle exactly are compiled through the
+    text path instead, so the result always matches compile_script.
+
+    Args:
+        path (Path): The command file.
+        builder (ProgramBuilder | None): Receives the commands, as for
+            compile_buffer; an optimizer.RunFolder folds runs as it goes.
+
+    Returns:
+        array[int]: The compiled program.
+    """
+    with open(path, "rb") as command_file:
+        if not command_file.seek(0, 2):
+            return _finish_compiled(array("i"), builder)
+        with mmap.mmap(command_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if _TEXT_ONLY_BYTES_REGEX.search(buffer) is None:
+                return compile_buffer(buffer, builder)
+
+    with open(path, "r") as command_file:
+        return _finish_compiled(compile_script(command_file), builder)
@@ -0,0 +1,121 @@
+import io
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import BinaryIO, TextIO, cast
+
+# The compression modules are only imported when a compressed stream is met.
+MAGIC_NUMBERS = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+}
+SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+HEADER_SIZE = max(map(len, MAGIC_NUMBERS))
+# Decompressed data is read in blocks of this size rather than per line.
+BLOCK_SIZE = 1 << 20
+
+
+def detect_compression(header: bytes) -> str | None:
+    """Name of the compression format a stream starts with, or None if plain."""
+    for magic, name in MAGIC_NUMBERS.items():
+        if header.startswith(magic):
+            return name
+    return None
+
+
+def is_compressed_file(path: str | os.PathLike[str]) -> bool:
+    with open(path, "rb") as stream:
+        return detect_compression(stream.read(HEADER_SIZE)) is not None
+
+
+def _peekable(stream: BinaryIO) -> io.BufferedReader:
+    if isinstance(stream, io.BufferedReader):
+        return stream
+    return io.BufferedReader(cast(io.RawIOBase, stream), BLOCK_SIZE)
+
+
+def _is_bz2_stream(reader: io.BufferedReader) -> bool:
+    # Unlike the other magic numbers, "BZh" is plain text, so a script that
+    # happens to start with it is only taken for bz2 if its first buffered
+    # block decompresses. Peeking leaves the block in place for either path.
+    import bz2
+
+    try:
+        bz2.BZ2Decompressor().decompress(reader.peek(BLOCK_SIZE), max_length=1)
+    except OSError:
+        return False
+    return True
+
+
+def _decompress(reader: io.BufferedReader) -> io.BufferedReader:
+    decompressed: io.BufferedIOBase
+    match detect_compression(reader.peek(HEADER_SIZE)[:HEADER_SIZE]):
+        case "gzip":
+            import gzip
+
+            decompressed = gzip.GzipFile(fileobj=reader, mode="rb")
+        case "bz2" if _is_bz2_stream(reader):
+            import bz2
+
+            decompressed = bz2.BZ2File(reader, mode="rb")
+        case "xz":
+            import lzma
+
+            decompressed = lzma.LZMAFile(reader, mode="rb")  # noqa: SIM115
+        case _:
+            return reader
+    return io.BufferedReader(cast(io.RawIOBase, decompressed), BLOCK_SIZE)
+
+
+def open_decompressed(stream: BinaryIO) -> io.BufferedReader:
+    """Wrap a binary stream so that reads return decompressed bytes.
+
+    The format is detected from the stream's magic number, and plain streams
+    are returned readable as they are.
+    """
+    return _decompress(_peekable(stream))
+
+
+@contextmanager
+def open_text(stream: TextIO | BinaryIO) -> Iterator[TextIO]:
+    """Open a text stream of commands, decoding and decompressing binary streams.
+
+    Text streams are used as they are. The wrappers put around a binary
+    stream are closed on exit, but the stream itself is left open.
+    """
+    if not isinstance(stream, io.RawIOBase | io.BufferedIOBase):
+        yield cast(TextIO, stream)
+        return
+
+    binary = cast(BinaryIO, stream)
+    reader = _peekable(binary)
+    decompressed = _decompress(reader)
+    text = io.TextIOWrapper(decompressed)
+    try:
+        yield text
+    finally:
+        text.detach()
+        if decompressed is not reader:
+            decompressed.close()
+        if reader is not binary:
+            reader.detach()
+
+
+def open_output(path: str | os.PathLike[str]) -> TextIO:
+    """Open a text file for writing, compressed according to its suffix."""
+    match SUFFIXES.get(os.path.splitext(path)[1]):
+        case "gzip":
+            import gzip
+
+            return gzip.open(path, "wt", compresslevel=6)
+        case "bz2":
+            import bz2
+
+            return bz2.open(path, "wt")
+        case "xz":
+            import lzma
+
+            return lzma.open(path, "wt")
+        case _:
+            return open(path, "w")
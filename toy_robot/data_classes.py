@@ -9,7 +9,7 @@ class Direction(Enum):
     WEST = auto()
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class Point:
     x: int
     y: int
@@ -0,0 +1,158 @@
+# Vectorised simulation of many robots sharing one table. NumPy is an optional
+# dependency, installed with the "fleet" extra.
+from array import array
+from collections.abc import Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from toy_robot.compiler import (
+    DIRECTION_DELTAS,
+    DIRECTIONS,
+    OP_LEFT,
+    OP_MOVE,
+    OP_MOVE_N,
+    OP_PLACE,
+    OP_REPORT,
+    OP_RIGHT,
+    OP_TURN,
+    OPCODE_BITS,
+    OPCODE_MASK,
+    check_rectangular,
+    compile_line,
+)
+from toy_robot.table import Table
+
+# Opcode for a robot that sits out a tick, e.g. because its command was invalid.
+OP_NOOP = OPCODE_MASK
+
+_DX = np.array([dx for dx, _ in DIRECTION_DELTAS], dtype=np.int64)
+_DY = np.array([dy for _, dy in DIRECTION_DELTAS], dtype=np.int64)
+_NAMES = [direction.name for direction in DIRECTIONS]
+
+
+class TickProgram:
+    """One command per robot, encoded as compiler opcodes.
+
+    PLACE operands live in separate arrays so every robot has a fixed-width slot.
+    """
+
+    def __init__(
+        self,
+        instructions: NDArray[np.int32],
+        place_x: NDArray[np.int64],
+        place_y: NDArray[np.int64],
+    ):
+        self.instructions = instructions
+        self.place_x = place_x
+        self.place_y = place_y
+
+    @classmethod
+    def from_commands(cls, commands: Sequence[str]) -> "TickProgram":
+        # A tick usually repeats a handful of distinct commands across all
+        # robots, so each is compiled once and the arrays are filled by index.
+        distinct: dict[str, int] = {}
+        indices = np.fromiter(
+            (distinct.setdefault(command, len(distinct)) for command in commands),
+            dtype=np.intp,
+            count=len(commands),
+        )
+        instructions = np.full(len(distinct), OP_NOOP, dtype=np.int32)
+        place_x = np.zeros(len(distinct), dtype=np.int64)
+        place_y = np.zeros(len(distinct), dtype=np.int64)
+        program: array[int] = array("i")
+        for index, command in enumerate(distinct):
+            del program[:]
+            if compile_line(program, command):
+                instructions[index] = program[0]
+                if len(program) == 3:
+                    place_x[index] = program[1]
+                    place_y[index] = program[2]
+        return cls(instructions[indices], place_x[indices], place_y[indices])
+
+
+class Fleet:
+    """Positions and headings of N robots held in contiguous arrays.
+
+    Each robot follows the same rules as a Robot driven by a RobotSimulator on
+    the given table; a tick applies one command to every robot at once.
+    """
+
+    def __init__(self, size: int, table: Table):
+        check_rectangular(table)
+        self.table = table
+        self.x = np.zeros(size, dtype=np.int64)
+        self.y = np.zeros(size, dtype=np.int64)
+        self.facing = np.zeros(size, dtype=np.int64)
+        self.placed = np.zeros(size, dtype=np.bool_)
+
+    def __len__(self) -> int:
+        return len(self.placed)
+
+    def step(self, program: TickProgram) -> NDArray[np.bool_]:
+        """Apply one instruction to every robot.
+
+        Args:
+            program (TickProgram): One instruction per robot.
+
+        Returns:
+            NDArray[np.bool_]: Mask of robots whose instruction produced a REPORT.
+        """
+        if len(program.instructions) != len(self):
+            raise ValueError("tick must contain exactly one command per robot")
+
+        width = self.table.width
+        height = self.table.height
+        instructions = program.instructions
+        opcodes = instructions & OPCODE_MASK
+        operands = (instructions >> OPCODE_BITS).astype(np.int64)
+
+        # Robots are always on the table once placed, so a single MOVE or a
+        # folded MOVE_N both reduce to a clamp against the table edge.
+        steps = np.where(opcodes == OP_MOVE_N, operands, 0)
+        steps[opcodes == OP_MOVE] = 1
+        steps[~self.placed] = 0
+        self.x = np.clip(self.x + _DX[self.facing] * steps, 0, width - 1)
+        self.y = np.clip(self.y + _DY[self.facing] * steps, 0, height - 1)
+
+        quarter_turns = np.where(opcodes == OP_TURN, operands, 0)
+        quarter_turns[opcodes == OP_RIGHT] = 1
+        quarter_turns[opcodes == OP_LEFT] = 3
+        self.facing = (self.facing + quarter_turns) & 3
+
+        place_x = program.place_x
+        place_y = program.place_y
+        placing = (
+            (opcodes == OP_PLACE)
+            & (place_x >= 0)
+            & (place_x < width)
+            & (place_y >= 0)
+            & (place_y < height)
+        )
+        self.x[placing] = place_x[placing]
+        self.y[placing] = place_y[placing]
+        self.facing[placing] = operands[placing]
+        self.placed |= placing
+
+        reporting: NDArray[np.bool_] = (opcodes == OP_REPORT) & self.placed
+        return reporting
+
+    def report(self, index: int) -> str | None:
+        if not self.placed[index]:
+            return None
+        return f"{self.x[index]},{self.y[index]},{_NAMES[self.facing[index]]}"
+
+    def tick(self, commands: Sequence[str]) -> list[str | None]:
+        """Apply one command line to every robot.
+
+        Args:
+            commands (Sequence[str]): One command line per robot.
+
+        Returns:
+            list[str | None]: The REPORT output of each robot, or None if it did not report.
+        """
+        reporting = self.step(TickProgram.from_commands(commands))
+        reports: list[str | None] = [None] * len(self)
+        for index in np.flatnonzero(reporting).tolist():
+            reports[index] = self.report(index)
+        return reports
@@ -0,0 +1,229 @@
+import dataclasses
+from collections.abc import Iterator
+from typing import BinaryIO, TextIO
+
+from toy_robot.commands import (
+    Command,
+    CommandParser,
+    CommandParserException,
+    PlaceCommandArgs,
+)
+from toy_robot.compression import open_text
+from toy_robot.data_classes import Direction, Point
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+REPEAT = "REPEAT"
+DEFINE = "DEFINE"
+_BARE_COMMANDS = {"MOVE", "LEFT", "RIGHT", "REPORT"}
+_RESERVED = {REPEAT, DEFINE, *Command.__members__}
+
+
+class MacroSyntaxError(CommandParserException):
+    pass
+
+
+@dataclasses.dataclass(frozen=True)
+class Repeat:
+    count: int
+    body: "Block"
+
+
+Block = tuple[tuple[Command, PlaceCommandArgs | None] | Repeat, ...]
+# A robot's state as (position, direction), both None while it is unplaced.
+State = tuple[Point | None, Direction | None]
+
+
+def _tokenize(text: str) -> list[str]:
+    return text.replace("{", " { ").replace("}", " } ").split()
+
+
+def brace_depth(text: str) -> int:
+    return text.count("{") - text.count("}")
+
+
+class _BlockParser:
+    def __init__(self, tokens: list[str], macros: dict[str, Block]):
+        self.tokens = tokens
+        self.macros = macros
+        self.pos = 0
+
+    def next_token(self) -> str:
+        if self.pos >= len(self.tokens):
+            raise MacroSyntaxError("unexpected end of statement")
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def expect(self, expected: str) -> None:
+        if (token := self.next_token()) != expected:
+            raise MacroSyntaxError(f"expected {expected!r}, got {token!r}")
+
+    def _place(self) -> tuple[Command, PlaceCommandArgs | None]:
+        # PLACE arguments may be written "1,2,NORTH" or "1, 2, NORTH".
+        args = self.next_token()
+        while args.count(",") < 2 or args.endswith(","):
+            args += " " + self.next_token()
+        try:
+            return CommandParser.parse_command(f"PLACE {args}")
+        except CommandParserException:
+            raise MacroSyntaxError(f"invalid PLACE {args!r}") from None
+
+    def repeat(self) -> Repeat:
+        count = self.next_token()
+        if not (count.isascii() and count.isdigit()):
+            raise MacroSyntaxError(f"invalid REPEAT count {count!r}")
+        self.expect("{")
+        return Repeat(int(count), self.block())
+
+    def block(self) -> Block:
+        """Parse items up to and including the closing brace."""
+        items: list[tuple[Command, PlaceCommandArgs | None] | Repeat] = []
+        while (token := self.next_token()) != "}":
+            if token == REPEAT:
+                items.append(self.repeat())
+            elif token == "PLACE":
+                items.append(self._place())
+            elif token in self.macros:
+                items.append(Repeat(1, self.macros[token]))
+            elif token in _BARE_COMMANDS:
+                items.append(CommandParser.parse_command(token))
+            else:
+                raise MacroSyntaxError(f"unknown command {token!r}")
+        return tuple(items)
+
+    def end(self) -> None:
+        if self.pos != len(self.tokens):
+            raise MacroSyntaxError(f"unexpected {self.tokens[self.pos]!r}")
+
+
+class MacroRobotSimulator(RobotSimulator):
+    """A RobotSimulator that also understands REPEAT loops and named macros.
+
+        REPEAT 4 { MOVE RIGHT }
+        DEFINE SQUARE { REPEAT 4 { MOVE MOVE RIGHT } }
+        SQUARE
+
+    A statement may span several lines until its braces balance. Macro
+    names are resolved when a macro is defined, so it can only use macros
+    defined before it, and a body refers to the macros it uses rather than
+    copying them. Statements with syntax errors are ignored, like any other
+    invalid command.
+
+    Loops run without expanding their body. Each iteration's output depends
+    only on the robot's state when it starts, so as soon as a state recurs
+    the rest of the loop is known: whole cycles are skipped, replaying their
+    recorded REPORT output, and the robot is left in the state the last
+    iteration would reach. Any count therefore takes at most one iteration
+    per distinct robot state, plus the time to write its output.
+    """
+
+    __slots__ = ("_depth", "_pending", "macros")
+
+    def __init__(self, robot: Robot, table: Table):
+        super().__init__(robot, table)
+        self.macros: dict[str, Block] = {}
+        self._pending: list[str] = []
+        # Brace depth of the pending lines, updated as each line arrives.
+        self._depth = 0
+
+    def _state(self) -> State:
+        return self.robot.position, self.robot.direction
+
+    def _restore(self, state: State) -> None:
+        position, direction = state
+        if position is not None and direction is not None:
+            self.robot.place(position, direction)
+
+    def _run_block(self, block: Block) -> Iterator[str]:
+        execute = self._execute
+        for item in block:
+            if isinstance(item, Repeat):
+                if item.count == 1:
+                    yield from self._run_block(item.body)
+                else:
+                    yield from self._run_repeat(item)
+            elif (result := execute(*item)) is not None:
+                yield result
+
+    def _run_repeat(self, repeat: Repeat) -> Iterator[str]:
+        starts: list[State] = []
+        first_seen: dict[State, int] = {}
+        iteration_reports: list[list[str]] = []
+        for iteration in range(repeat.count):
+            state = self._state()
+            if (cycle_start := first_seen.get(state)) is not None:
+                cycle = iteration_reports[cycle_start:iteration]
+                cycles, rest = divmod(repeat.count - iteration, iteration - cycle_start)
+                if any(cycle):
+                    for _ in range(cycles):
+                        for reports in cycle:
+                            yield from reports
+                for reports in cycle[:rest]:
+                    yield from reports
+                self._restore(starts[cycle_start + rest])
+                return
+
+            first_seen[state] = iteration
+            starts.append(state)
+            reports = list(self._run_block(repeat.body))
+            iteration_reports.append(reports)
+            yield from reports
+
+    def _parse_statement(self, text: str) -> Block:
+        tokens = _tokenize(text)
+        parser = _BlockParser(tokens, self.macros)
+        keyword = parser.next_token()
+        if keyword == DEFINE:
+            name = parser.next_token()
+            if not name.isidentifier() or name in _RESERVED:
+                raise MacroSyntaxError(f"invalid macro name {name!r}")
+            parser.expect("{")
+            body = parser.block()
+            parser.end()
+            self.macros[name] = body
+            return ()
+        if keyword == REPEAT:
+            block: Block = (parser.repeat(),)
+        elif keyword in self.macros:
+            block = self.macros[keyword]
+        else:
+            raise MacroSyntaxError(f"unknown command {keyword!r}")
+        parser.end()
+        return block
+
+    def _is_statement(self, line: str) -> bool:
+        if line.startswith((REPEAT, DEFINE)):
+            return True
+        # Only lines that can start a statement are tokenized.
+        return bool(self.macros) and line.strip() in self.macros
+
+    def iter_line_reports(self, line: str) -> Iterator[str]:
+        """Process one line, yielding every REPORT it produces."""
+        if not self._pending and not self._is_statement(line):
+            if (result := super().process_command(line)) is not None:
+                yield result
+            return
+
+        self._pending.append(line)
+        self._depth += brace_depth(line)
+        if self._depth > 0:
+            return
+        text = " ".join(self._pending)
+        self._pending.clear()
+        self._depth = 0
+        try:
+            block = self._parse_statement(text)
+        except CommandParserException:
+            return
+        yield from self._run_block(block)
+
+    def process_command(self, line: str) -> str | None:
+        output_lines = list(self.iter_line_reports(line))
+        return "\n".join(output_lines) if output_lines else None
+
+    def iter_reports(self, file_contents: TextIO | BinaryIO) -> Iterator[str]:
+        with open_text(file_contents) as text:
+            for line in text:
+                yield from self.iter_line_reports(line)
@@ -0,0 +1,73 @@
+from toy_robot.commands import CommandParser, CommandParserException, PlaceCommandArgs
+from toy_robot.data_classes import Point
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+
+class MultiRobotSimulator(RobotSimulator):
+    """Several named robots sharing one table, each taking up one cell.
+
+    Every line is "<robot_id> <command>", e.g. "r2 MOVE". A robot comes into
+    existence when it is first placed. PLACE onto a cell held by another robot
+    and MOVE into one are ignored, like PLACE and MOVE off the table, and
+    REPORT is prefixed with the robot's id.
+
+    Occupied cells are tracked in a spatial hash from cell to robot id that is
+    updated as robots move, so collision checks cost the same for any number
+    of robots. While a line is handled, self.robot is the robot it addresses.
+    """
+
+    __slots__ = ("_robot_id", "occupancy", "robots")
+
+    def __init__(self, table: Table):
+        super().__init__(Robot(), table)
+        self.robots: dict[str, Robot] = {}
+        self.occupancy: dict[Point, str] = {}
+        self._robot_id = ""
+
+    def robot_at(self, position: Point) -> str | None:
+        """The id of the robot on a cell, if any."""
+        return self.occupancy.get(position)
+
+    def _handle_place(self, args: PlaceCommandArgs | None) -> None:
+        if args is None:
+            return
+        point = self.table.point(args.x, args.y)
+        if not self.table.is_valid_position(point):
+            return
+        if self.occupancy.get(point, self._robot_id) != self._robot_id:
+            return
+
+        robot = self.robot
+        if robot.position is not None:
+            del self.occupancy[robot.position]
+        robot.place(point, args.facing)
+        self.occupancy[point] = self._robot_id
+        self.robots[self._robot_id] = robot
+
+    def _handle_move(self) -> None:
+        robot = self.robot
+        if robot.position is None:
+            return
+
+        candidate_position = robot.next_position(self.table.point)
+        if (
+            self.table.is_valid_position(candidate_position)
+            and candidate_position not in self.occupancy
+        ):
+            del self.occupancy[robot.position]
+            robot.move(candidate_position)
+            self.occupancy[candidate_position] = self._robot_id
+
+    def process_command(self, line: str) -> str | None:
+        try:
+            robot_id, command, place_args = CommandParser.parse_robot_command(line)
+        except CommandParserException:
+            return None
+
+        self._robot_id = robot_id
+        robot = self.robots.get(robot_id)
+        self.robot = robot if robot is not None else Robot()
+        result = self._execute(command, place_args)
+        return f"{robot_id}: {result}" if result is not None else None
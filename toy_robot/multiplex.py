@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from toy_robot.commands import CommandParser, CommandParserException
+from toy_robot.compiler import UNPLACED, decode_state, encode_state
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+if TYPE_CHECKING:
+    import dbm
+
+DEFAULT_MAX_RESIDENT = 100_000
+
+
+def _close_spill_store(store: "dbm._Database", directory: str) -> None:
+    store.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+class MultiplexedRobotSimulator(RobotSimulator):
+    """Independent robots whose commands are interleaved in one stream.
+
+    Every line is "<robot_id> <command>", e.g. "r2 MOVE", and runs against
+    that robot alone as if each robot's lines were a separate script; unlike
+    MultiRobotSimulator, robots do not block each other. REPORT is prefixed
+    with the robot's id, so reports come out tagged and in input order.
+
+    Each placed robot's state is kept as one int, encoded as by
+    compiler.encode_state, in an LRU table of at most max_resident robots.
+    The least recently used robots beyond that are written to a dbm spill
+    store in a temporary directory and read back when they next get a
+    command. The store is created on the first eviction and removed by
+    close(), or when the simulator is garbage collected.
+    """
+
+    __slots__ = (
+        "__weakref__",
+        "_close_spill",
+        "_spill",
+        "evictions",
+        "max_resident",
+        "resident",
+        "restores",
+        "spill_directory",
+    )
+
+    def __init__(
+        self,
+        table: Table,
+        max_resident: int = DEFAULT_MAX_RESIDENT,
+        spill_directory: str | os.PathLike[str] | None = None,
+    ):
+        if max_resident < 1:
+            raise ValueError("max_resident must be at least 1")
+        super().__init__(Robot(), table)
+        self.max_resident = max_resident
+        self.spill_directory = spill_directory
+        self.resident: OrderedDict[str, int] = OrderedDict()
+        self.evictions = 0
+        self.restores = 0
+        self._spill: dbm._Database | None = None
+        self._close_spill: weakref.finalize[..., MultiplexedRobotSimulator] | None = (
+            None
+        )
+
+    def _open_spill(self) -> "dbm._Database":
+        import dbm
+
+        directory = tempfile.mkdtemp(
+            prefix="toy-robot-spill-", dir=self.spill_directory
+        )
+        store = dbm.open(os.path.join(directory, "robots"), "n")  # noqa: SIM115
+        self._close_spill = weakref.finalize(self, _close_spill_store, store, directory)
+        self._spill = store
+        return store
+
+    def _state(self, robot_id: str) -> int:
+        resident = self.resident
+        if (state := resident.get(robot_id)) is not None:
+            resident.move_to_end(robot_id)
+            return state
+        if self._spill is None or (spilled := self._spill.get(robot_id)) is None:
+            return UNPLACED
+        # The spilled copy is left in place; the resident state supersedes it
+        # and overwrites it on the next eviction.
+        self.restores += 1
+        return int(spilled)
+
+    def _store(self, robot_id: str, state: int) -> None:
+        resident = self.resident
+        resident[robot_id] = state
+        if len(resident) > self.max_resident:
+            spill = self._spill if self._spill is not None else self._open_spill()
+            evicted_id, evicted_state = resident.popitem(last=False)
+            spill[evicted_id] = str(evicted_state)
+            self.evictions += 1
+
+    def process_command(self, line: str) -> str | None:
+        try:
+            robot_id, command, place_args = CommandParser.parse_robot_command(line)
+        except CommandParserException:
+            return None
+
+        table = self.table
+        self.robot = decode_state(self._state(robot_id), table)
+        result = self._execute(command, place_args)
+        # Robots that were never placed have no state worth keeping.
+        if (state := encode_state(self.robot, table)) != UNPLACED:
+            self._store(robot_id, state)
+        return f"{robot_id}: {result}" if result is not None else None
+
+    def close(self) -> None:
+        """Close and delete the spill store, if one was created."""
+        if self._close_spill is not None:
+            self._close_spill()
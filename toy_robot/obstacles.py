@@ -0,0 +1,98 @@
+import mmap
+from collections.abc import Iterable
+from pathlib import Path
+
+from toy_robot.data_classes import Point
+from toy_robot.table import Table
+
+
+class ObstacleTable(Table):
+    """A table with blocked cells, stored as one bit per cell.
+
+    Cell (x, y) is bit y * width + x of the bitmap, least significant bit first
+    within each byte. The bitmap is a bytearray, or a copy-on-write memory map
+    of a bitmap file for grids too large to load, so a million-cell floor takes
+    125 KB whichever way it is held.
+
+    Drops into RobotSimulator unchanged: blocked cells are simply not valid
+    positions, so PLACE onto them and MOVE into them are ignored.
+    """
+
+    __slots__ = ("_bitmap", "version")
+
+    is_rectangular = False
+
+    def __init__(
+        self,
+        width: int = 5,
+        height: int = 5,
+        obstacles: Iterable[tuple[int, int]] = (),
+        bitmap: bytearray | mmap.mmap | None = None,
+    ):
+        super().__init__(width, height)
+        size = self.bitmap_size(width, height)
+        if bitmap is None:
+            bitmap = bytearray(size)
+        elif len(bitmap) != size:
+            raise ValueError(f"a {width}x{height} bitmap must be {size} bytes")
+        self._bitmap = bitmap
+        self.version = 0
+        for x, y in obstacles:
+            self.add_obstacle(x, y)
+
+    @staticmethod
+    def bitmap_size(width: int, height: int) -> int:
+        return (width * height + 7) >> 3
+
+    @classmethod
+    def from_obstacle_file(cls, path: Path, width: int, height: int) -> "ObstacleTable":
+        """Load obstacles listed one "x,y" per line. Blank lines and # comments are skipped."""
+        table = cls(width, height)
+        with open(path, "r") as obstacle_file:
+            for line_number, line in enumerate(obstacle_file, start=1):
+                line = line.partition("#")[0].strip()
+                if not line:
+                    continue
+                x, _, y = line.partition(",")
+                try:
+                    table.add_obstacle(int(x), int(y))
+                except ValueError:
+                    raise ValueError(
+                        f"{path}:{line_number}: invalid obstacle {line!r}"
+                    ) from None
+        return table
+
+    @classmethod
+    def from_bitmap_file(cls, path: Path, width: int, height: int) -> "ObstacleTable":
+        """Memory-map a bitmap written by save_bitmap.
+
+        Pages are only read when the robot reaches them, and changes made with
+        add_obstacle stay private to this table.
+        """
+        with open(path, "rb") as bitmap_file:
+            bitmap = mmap.mmap(bitmap_file.fileno(), 0, access=mmap.ACCESS_COPY)
+        return cls(width, height, bitmap=bitmap)
+
+    def save_bitmap(self, path: Path) -> None:
+        with open(path, "wb") as bitmap_file:
+            bitmap_file.write(self._bitmap)
+
+    def add_obstacle(self, x: int, y: int) -> None:
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise ValueError(f"obstacle {x},{y} is outside the table")
+        index = y * self.width + x
+        self._bitmap[index >> 3] |= 1 << (index & 7)
+        self.version += 1
+
+    def is_blocked(self, x: int, y: int) -> bool:
+        index = y * self.width + x
+        return bool(self._bitmap[index >> 3] >> (index & 7) & 1)
+
+    def is_valid_position(self, position: Point) -> bool:
+        """Check if a point is on the table and not blocked by an obstacle."""
+        x = position.x
+        y = position.y
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        index = y * self.width + x
+        return not self._bitmap[index >> 3] >> (index & 7) & 1
@@ -0,0 +1,153 @@
+from array import array
+from collections.abc import Sequence
+from itertools import groupby, islice
+from operator import ne
+
+from toy_robot.compiler import (
+    MAX_PACKED_OPERAND,
+    OP_LEFT,
+    OP_MOVE,
+    OP_MOVE_N,
+    OP_PLACE,
+    OP_RIGHT,
+    OP_TURN,
+    OPCODE_BITS,
+    OPCODE_MASK,
+    ProgramBuilder,
+)
+
+# Mean run length below which RunFolder.add_bare leaves commands unfolded.
+_MIN_MEAN_RUN = 4
+
+
+class RunFolder(ProgramBuilder):
+    """A ProgramBuilder that folds runs of moves and turns as it goes.
+
+    Passed to compile_buffer or compile_file, it folds runs of bare commands
+    while the script is compiled rather than in a second pass. Stretches of
+    the script made of short runs are left unfolded, as fold_runs gains
+    nothing on them; the program still runs exactly like the unfolded one.
+    """
+
+    __slots__ = ("_open_move_run", "pending_moves", "pending_turn")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.pending_moves = 0
+        self.pending_turn = 0
+        # Index of the last emitted MOVE_N, while nothing else has been emitted
+        # after it. Moves separated only by cancelled turns are merged into it.
+        self._open_move_run: int | None = None
+
+    def move(self, count: int = 1) -> None:
+        self.flush_turn()
+        self.pending_moves += count
+
+    def turn(self, quarter_turns: int) -> None:
+        self.flush_moves()
+        self.pending_turn = (self.pending_turn + quarter_turns) & 3
+
+    def add_bare(self, opcodes: list[int]) -> None:
+        # Folding costs more per run than it saves when runs are short, so
+        # commands whose runs average fewer than _MIN_MEAN_RUN are kept as is.
+        runs = sum(map(ne, opcodes, islice(opcodes, 1, None))) + 1
+        if len(opcodes) < _MIN_MEAN_RUN * runs:
+            self.flush_moves()
+            self.flush_turn()
+            self.program.extend(opcodes)
+            self._open_move_run = None
+            return
+        for opcode, run in groupby(opcodes):
+            if opcode == OP_MOVE:
+                self.move(len(list(run)))
+            elif opcode == OP_RIGHT:
+                self.turn(len(list(run)))
+            elif opcode == OP_LEFT:
+                self.turn(3 * len(list(run)))
+            else:
+                self.flush_moves()
+                self.flush_turn()
+                self.emit(*run)
+
+    def add_program(self, program: Sequence[int]) -> None:
+        pc = 0
+        end = len(program)
+        while pc < end:
+            instruction = program[pc]
+            opcode = instruction & OPCODE_MASK
+            if opcode == OP_MOVE:
+                self.move()
+            elif opcode == OP_MOVE_N:
+                self.move(instruction >> OPCODE_BITS)
+            elif opcode == OP_RIGHT:
+                self.turn(1)
+            elif opcode == OP_LEFT:
+                self.turn(3)
+            elif opcode == OP_TURN:
+                self.turn(instruction >> OPCODE_BITS)
+            elif opcode == OP_PLACE:
+                self.add_place(instruction, program[pc + 1], program[pc + 2])
+                pc += 2
+            else:
+                self.flush_moves()
+                self.flush_turn()
+                self.emit(instruction)
+            pc += 1
+
+    def add_place(self, instruction: int, x: int, y: int) -> None:
+        self.flush_moves()
+        self.flush_turn()
+        self.emit(instruction, x, y)
+
+    def finish(self) -> array[int]:
+        self.flush_moves()
+        self.flush_turn()
+        return self.program
+
+    def flush_moves(self) -> None:
+        count, self.pending_moves = self.pending_moves, 0
+        if not count:
+            return
+
+        if self._open_move_run is not None:
+            index = self._open_move_run
+            merged = (self.program[index] >> OPCODE_BITS) + count
+            if merged <= MAX_PACKED_OPERAND:
+                self.program[index] = OP_MOVE_N | merged << OPCODE_BITS
+                return
+            self.program[index] = OP_MOVE_N | MAX_PACKED_OPERAND << OPCODE_BITS
+            count = merged - MAX_PACKED_OPERAND
+
+        while count > MAX_PACKED_OPERAND:
+            self.program.append(OP_MOVE_N | MAX_PACKED_OPERAND << OPCODE_BITS)
+            count -= MAX_PACKED_OPERAND
+        self.program.append(OP_MOVE_N | count << OPCODE_BITS)
+        self._open_move_run = len(self.program) - 1
+
+    def flush_turn(self) -> None:
+        quarter_turns, self.pending_turn = self.pending_turn, 0
+        if quarter_turns:
+            self.emit(OP_TURN | quarter_turns << OPCODE_BITS)
+
+    def emit(self, *words: int) -> None:
+        self.program.extend(words)
+        self._open_move_run = None
+
+
+def fold_runs(program: Sequence[int]) -> array[int]:
+    """Coalesce runs of MOVE, LEFT and RIGHT in a compiled program.
+
+    Consecutive moves become a single MOVE_N, which execute_program resolves
+    as a clamp against the table edge. Consecutive turns are summed mod 4, so
+    LEFT/RIGHT pairs cancel out entirely. The folded program produces the same
+    output and final robot state as the original.
+
+    Args:
+        program (Sequence[int]): A program produced by compile_script.
+
+    Returns:
+        array[int]: The folded program.
+    """
+    folder = RunFolder()
+    folder.add_program(program)
+    return folder.finish()
@@ -0,0 +1,264 @@
+import dataclasses
+import os
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from toy_robot.compiler import (
+    OP_PLACE,
+    OP_REPORT,
+    OPCODE_MASK,
+    UNPLACED,
+    check_rectangular,
+    compile_bytes,
+    compile_file,
+    decode_state,
+    encode_state,
+    iter_program_reports,
+)
+from toy_robot.optimizer import RunFolder, fold_runs
+from toy_robot.robot import Robot
+from toy_robot.state_machine import get_transition_table, iter_state_machine_reports
+from toy_robot.table import Table
+
+# Every chunk is evaluated for every possible entry state at once, so the state
+# space has to stay small for this to beat sequential execution.
+MAX_STATES = 1 << 16
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+@dataclasses.dataclass
+class ChunkTransition:
+    """The effect of one chunk of a script as a function of the entry state.
+
+    Commands up to the chunk's first on-table PLACE (the prefix) depend on the
+    state the robot enters with; everything after it (the suffix) does not.
+
+    The prefix's reports are kept in groups: group i starts as the reports of
+    entry state i, and when robots from several groups reach the same state
+    they continue in one new group that each of them links to.
+    """
+
+    # Exit state of the prefix, indexed by entry state + 1 so UNPLACED maps to 0.
+    prefix_exit: list[int]
+    group_reports: list[list[str]]
+    # The group each group continues in, or -1 for groups still live at the end.
+    group_next: list[int]
+    suffix_exit: int | None
+    suffix_reports: list[str]
+
+    def exit_state(self, entry_state: int) -> int:
+        if self.suffix_exit is not None:
+            return self.suffix_exit
+        return self.prefix_exit[entry_state + 1]
+
+    def reports(self, entry_state: int) -> list[str]:
+        reports: list[str] = []
+        # An unplaced robot ignores everything before the first valid PLACE.
+        group = entry_state
+        while group != -1:
+            reports += self.group_reports[group]
+            group = self.group_next[group]
+        return reports + self.suffix_reports
+
+
+def state_count(table: Table) -> int:
+    return table.width * table.height * 4
+
+
+def _first_valid_place(program: Sequence[int], table: Table) -> int:
+    pc = 0
+    end = len(program)
+    while pc < end:
+        if program[pc] & OPCODE_MASK == OP_PLACE:
+            if (
+                0 <= program[pc + 1] < table.width
+                and 0 <= program[pc + 2] < table.height
+            ):
+                return pc
+            pc += 3
+        else:
+            pc += 1
+    return end
+
+
+def _run(program: Sequence[int], state: int, table: Table) -> tuple[int, list[str]]:
+    robot = decode_state(state, table)
+    reports = list(iter_state_machine_reports(program, robot, table))
+    return encode_state(robot, table), reports
+
+
+def _run_prefix(
+    prefix: Sequence[int], table: Table
+) -> tuple[list[int], list[list[str]], list[int]]:
+    """Run a prefix from every placed entry state in lock-step.
+
+    Robots that reach the same state are merged and stepped once from then
+    on. Every command turns all robots alike, so robots facing different ways
+    never merge; once no two robots share a heading, each runs the rest of
+    the prefix sequentially. Moves against the edges soon merge robots with
+    the same heading, so a long prefix costs at most about four sequential
+    runs rather than one per entry state.
+
+    Returns:
+        tuple[list[int], list[list[str]], list[int]]: The exit state of each
+            entry state, and the report groups and links of ChunkTransition.
+    """
+    machine = get_transition_table(table.width, table.height)
+    step = machine.step
+    states = machine.state_count
+    group_reports: list[list[str]] = [[] for _ in range(states)]
+    group_next = [-1] * states
+    # The group of each distinct robot state, keyed by slot (encoded state + 1).
+    live = {state + 1: state for state in range(states)}
+
+    pc = 0
+    end = len(prefix)
+    while pc < end and len({(slot - 1) & 3 for slot in live}) < len(live):
+        instruction = prefix[pc]
+        pc += 1
+        opcode = instruction & OPCODE_MASK
+        if opcode == OP_REPORT:
+            for slot, group in live.items():
+                group_reports[group].append(machine.report(slot))
+            continue
+        if opcode == OP_PLACE:
+            # Only off-table PLACEs come before the split, and they do nothing.
+            pc += 2
+            continue
+
+        first_new_group = len(group_next)
+        next_live: dict[int, int] = {}
+        for slot, group in live.items():
+            next_slot = step(slot, instruction)
+            if (other := next_live.get(next_slot)) is None:
+                next_live[next_slot] = group
+                continue
+            if other < first_new_group:
+                merged = len(group_next)
+                group_reports.append([])
+                group_next.append(-1)
+                group_next[other] = merged
+                next_live[next_slot] = other = merged
+            group_next[group] = other
+        live = next_live
+
+    if pc < end:
+        rest = prefix[pc:]
+        sequential_live = {}
+        for slot, group in live.items():
+            exit_state, reports = _run(rest, slot - 1, table)
+            group_reports[group] += reports
+            sequential_live[exit_state + 1] = group
+        live = sequential_live
+
+    # Links always point to later groups, so each group's last group is known
+    # once all the groups after it have been resolved.
+    exit_slots = [0] * len(group_next)
+    for slot, group in live.items():
+        exit_slots[group] = slot
+    for group in reversed(range(len(group_next))):
+        if (next_group := group_next[group]) != -1:
+            exit_slots[group] = exit_slots[next_group]
+    return [slot - 1 for slot in exit_slots[:states]], group_reports, group_next
+
+
+def compute_transition(data: bytes, table: Table) -> ChunkTransition:
+    """Evaluate a chunk of a script for every possible entry state."""
+    program = compile_bytes(data, RunFolder())
+    split = _first_valid_place(program, table)
+    prefix_exit, group_reports, group_next = _run_prefix(
+        fold_runs(program[:split]), table
+    )
+
+    suffix_exit = None
+    suffix_reports: list[str] = []
+    if split < len(program):
+        suffix_exit, suffix_reports = _run(program[split:], UNPLACED, table)
+
+    return ChunkTransition(
+        [UNPLACED, *prefix_exit],
+        group_reports,
+        group_next,
+        suffix_exit,
+        suffix_reports,
+    )
+
+
+def _compute_chunk_transition(
+    path: Path, table: Table, bounds: tuple[int, int]
+) -> ChunkTransition:
+    start, end = bounds
+    with open(path, "rb") as command_file:
+        command_file.seek(start)
+        data = command_file.read(end - start)
+    return compute_transition(data, table)
+
+
+def split_file(path: Path, chunk_size: int) -> list[tuple[int, int]]:
+    """Split a file into byte ranges of roughly chunk_size, ending on line breaks."""
+    size = path.stat().st_size
+    bounds = []
+    start = 0
+    with open(path, "rb") as command_file:
+        while start < size:
+            command_file.seek(min(start + chunk_size, size))
+            command_file.readline()
+            end = min(command_file.tell(), size)
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+
+def iter_reports_parallel(
+    path: Path,
+    robot: Robot,
+    table: Table,
+    jobs: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """Run one command file using all cores, yielding the same reports as sequential execution.
+
+    The file is split into chunks whose transition functions are computed in
+    worker processes, then composed in order starting from the robot's state.
+    The robot's final state is written back once all reports have been yielded.
+    With a single worker or a single chunk nothing can run in parallel, so the
+    file is compiled and run sequentially instead.
+
+    Args:
+        path (Path): The command file.
+        robot (Robot): The robot to drive.
+        table (Table): The table the robot moves on.
+        jobs (int | None): Number of worker processes, defaulting to the CPU count.
+        chunk_size (int): Approximate size of each chunk in bytes.
+
+    Raises:
+        ValueError: If the table has too many states to enumerate per chunk, or
+            is not rectangular.
+
+    Yields:
+        str: The output of each REPORT, in order.
+    """
+    check_rectangular(table)
+    if state_count(table) > MAX_STATES:
+        raise ValueError(
+            f"table has more than {MAX_STATES} states, run it sequentially instead"
+        )
+
+    workers = jobs or os.cpu_count() or 1
+    bounds = split_file(path, chunk_size)
+    if workers < 2 or len(bounds) < 2:
+        yield from iter_program_reports(compile_file(path, RunFolder()), robot, table)
+        return
+
+    worker = partial(_compute_chunk_transition, path, table)
+    state = encode_state(robot, table)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for transition in executor.map(worker, bounds):
+            yield from transition.reports(state)
+            state = transition.exit_state(state)
+
+    final = decode_state(state, table)
+    if final.position is not None and final.direction is not None:
+        robot.place(final.position, final.direction)
@@ -0,0 +1,260 @@
+import dataclasses
+import queue
+import threading
+from collections.abc import Callable, Iterator
+from functools import partial
+from itertools import islice
+from time import perf_counter_ns
+from typing import BinaryIO, TextIO, cast
+
+from toy_robot.commands import (
+    Command,
+    CommandParser,
+    CommandParserException,
+    PlaceCommandArgs,
+)
+from toy_robot.compression import open_text
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+DEFAULT_BATCH_SIZE = 4096
+DEFAULT_QUEUE_DEPTH = 8
+# How often a stage blocked on a queue checks whether the pipeline was abandoned.
+_POLL_SECONDS = 0.1
+# Marks the end of a queue's batches.
+_DONE = None
+
+ParsedBatch = list[tuple[Command, PlaceCommandArgs | None]]
+
+
+@dataclasses.dataclass
+class StageStats:
+    name: str
+    unit: str = "lines"
+    batches: int = 0
+    items: int = 0
+    busy_ns: int = 0
+    # Time spent blocked on an empty input queue or a full output queue.
+    wait_ns: int = 0
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items * 1e9 / self.busy_ns if self.busy_ns else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:<8} {self.items} {self.unit} in {self.batches} batches, "
+            f"busy {self.busy_ns / 1e6:.1f}ms, waiting {self.wait_ns / 1e6:.1f}ms, "
+            f"{self.items_per_second:,.0f} {self.unit}/s"
+        )
+
+
+@dataclasses.dataclass
+class PipelineStats:
+    read: StageStats = dataclasses.field(default_factory=lambda: StageStats("read"))
+    parse: StageStats = dataclasses.field(default_factory=lambda: StageStats("parse"))
+    execute: StageStats = dataclasses.field(
+        default_factory=lambda: StageStats("execute", unit="commands")
+    )
+
+    @property
+    def stages(self) -> tuple[StageStats, StageStats, StageStats]:
+        return self.read, self.parse, self.execute
+
+    @property
+    def bottleneck(self) -> StageStats:
+        """The stage that spent the most time working rather than waiting."""
+        return max(self.stages, key=lambda stage: stage.busy_ns)
+
+    def format(self) -> str:
+        lines = ["Pipeline stages:"]
+        lines += [f"  {stage}" for stage in self.stages]
+        lines.append(f"Bottleneck: {self.bottleneck.name}")
+        return "\n".join(lines)
+
+
+class _Abandoned(Exception):
+    """Raised in a stage thread once the consumer has stopped reading."""
+
+
+def _put(
+    output: "queue.Queue[object]",
+    item: object,
+    stop: threading.Event,
+    stats: StageStats,
+) -> None:
+    start = perf_counter_ns()
+    while True:
+        try:
+            output.put(item, timeout=_POLL_SECONDS)
+            break
+        except queue.Full:
+            if stop.is_set():
+                raise _Abandoned from None
+    stats.wait_ns += perf_counter_ns() - start
+
+
+def _get(
+    source: "queue.Queue[object]", stop: threading.Event, stats: StageStats
+) -> object:
+    start = perf_counter_ns()
+    while True:
+        try:
+            item = source.get(timeout=_POLL_SECONDS)
+            break
+        except queue.Empty:
+            if stop.is_set():
+                raise _Abandoned from None
+    stats.wait_ns += perf_counter_ns() - start
+    if isinstance(item, BaseException):
+        raise item
+    return item
+
+
+def _run_stage(
+    stage: Callable[[], None],
+    output: "queue.Queue[object]",
+    stop: threading.Event,
+    stats: StageStats,
+) -> None:
+    # Errors travel down the pipeline in place of a batch, and are raised
+    # again by the consumer.
+    try:
+        stage()
+    except _Abandoned:
+        pass
+    except BaseException as error:  # noqa: BLE001
+        try:
+            _put(output, error, stop, stats)
+        except _Abandoned:
+            pass
+
+
+class PipelinedRobotSimulator(RobotSimulator):
+    """A RobotSimulator that reads, parses and executes scripts concurrently.
+
+    iter_reports runs three stages connected by bounded queues of batches:
+    a thread reads (decompressing and decoding) lines, a second parses them
+    with CommandParser, and the calling thread executes the commands. The
+    queues hold at most queue_depth batches, so a slow stage holds back the
+    ones before it instead of buffering the whole script.
+
+    Decompression and reads release the GIL, so they overlap with parsing
+    and execution; parsing and execution share the interpreter. Each stage's
+    busy and waiting time is recorded in PipelineStats, whose bottleneck is
+    the stage that limits throughput.
+
+    Lines are only passed on in full batches, so this is meant for files and
+    bulk input, not for drivers waiting on each command's REPORT.
+    """
+
+    __slots__ = ("batch_size", "queue_depth", "stats")
+
+    def __init__(
+        self,
+        robot: Robot,
+        table: Table,
+        stats: PipelineStats | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        queue_depth: int = DEFAULT_QUEUE_DEPTH,
+    ):
+        super().__init__(robot, table)
+        self.stats = stats if stats is not None else PipelineStats()
+        self.batch_size = batch_size
+        self.queue_depth = queue_depth
+
+    def _read(
+        self,
+        file_contents: TextIO | BinaryIO,
+        output: "queue.Queue[object]",
+        stop: threading.Event,
+    ) -> None:
+        stats = self.stats.read
+        with open_text(file_contents) as text:
+            while True:
+                start = perf_counter_ns()
+                batch = list(islice(text, self.batch_size))
+                stats.busy_ns += perf_counter_ns() - start
+                if not batch:
+                    break
+                stats.batches += 1
+                stats.items += len(batch)
+                _put(output, batch, stop, stats)
+        _put(output, _DONE, stop, stats)
+
+    def _parse(
+        self,
+        source: "queue.Queue[object]",
+        output: "queue.Queue[object]",
+        stop: threading.Event,
+    ) -> None:
+        stats = self.stats.parse
+        parse_command = CommandParser.parse_command
+        while (item := _get(source, stop, stats)) is not _DONE:
+            lines = cast(list[str], item)
+            start = perf_counter_ns()
+            batch: ParsedBatch = []
+            for line in lines:
+                try:
+                    batch.append(parse_command(line.rstrip()))
+                except CommandParserException:
+                    pass
+            stats.busy_ns += perf_counter_ns() - start
+            stats.batches += 1
+            stats.items += len(lines)
+            _put(output, batch, stop, stats)
+        _put(output, _DONE, stop, stats)
+
+    def iter_reports(self, file_contents: TextIO | BinaryIO) -> Iterator[str]:
+        lines: queue.Queue[object] = queue.Queue(self.queue_depth)
+        commands: queue.Queue[object] = queue.Queue(self.queue_depth)
+        stop = threading.Event()
+        threads = [
+            threading.Thread(
+                target=_run_stage,
+                args=(
+                    partial(self._read, file_contents, lines, stop),
+                    lines,
+                    stop,
+                    self.stats.read,
+                ),
+                name="toy-robot-read",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=_run_stage,
+                args=(
+                    partial(self._parse, lines, commands, stop),
+                    commands,
+                    stop,
+                    self.stats.parse,
+                ),
+                name="toy-robot-parse",
+                daemon=True,
+            ),
+        ]
+        for thread in threads:
+            thread.start()
+
+        stats = self.stats.execute
+        execute = self._execute
+        try:
+            while (item := _get(commands, stop, stats)) is not _DONE:
+                batch = cast(ParsedBatch, item)
+                start = perf_counter_ns()
+                reports = [
+                    result
+                    for command, place_args in batch
+                    if (result := execute(command, place_args)) is not None
+                ]
+                stats.busy_ns += perf_counter_ns() - start
+                stats.batches += 1
+                stats.items += len(batch)
+                yield from reports
+        finally:
+            # Threads still blocked on a queue give up once they see this. A
+            # reader blocked on input is a daemon thread, so it is not joined.
+            stop.set()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,169 @@
+from array import array
+from collections import OrderedDict, deque
+from typing import NamedTuple
+
+from toy_robot.compiler import DIRECTION_DELTAS, DIRECTION_INDEX, encode_state
+from toy_robot.data_classes import Direction, Point
+from toy_robot.robot import Robot, RobotNotPlacedError
+from toy_robot.table import Table
+
+UNREACHABLE = -1
+DISTANCE_CACHE_SIZE = 16
+
+
+class UnreachableTargetError(Exception):
+    """Raised when no sequence of commands takes the robot to the target."""
+
+
+class DistanceCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class PathPlanner:
+    """Plans the shortest MOVE/LEFT/RIGHT sequence to a target on a table.
+
+    The search runs over (cell, heading) states, encoded as by
+    compiler.encode_state, where MOVE, LEFT and RIGHT each cost one command.
+    For every target a distance field is built once by a breadth-first search
+    backwards from the target states, holding each state's distance to it.
+    Fields are kept in an LRU cache, so planning many robots to the same
+    target walks the cached field instead of searching again. The cache is
+    dropped when the table's version changes, e.g. when
+    ObstacleTable.add_obstacle blocks another cell.
+
+    Any Table works, including ObstacleTable: a cell can be entered if
+    table.is_valid_position accepts it.
+    """
+
+    def __init__(self, table: Table, cache_size: int = DISTANCE_CACHE_SIZE):
+        self.table = table
+        self.cache_size = cache_size
+        self._fields: OrderedDict[tuple[Point, Direction | None], array[int]] = (
+            OrderedDict()
+        )
+        self._fields_version = table.version
+        self._hits = 0
+        self._misses = 0
+
+    def _is_open(self, x: int, y: int) -> bool:
+        table = self.table
+        return (
+            0 <= x < table.width
+            and 0 <= y < table.height
+            and table.is_valid_position(table.point(x, y))
+        )
+
+    def _build_distance_field(
+        self, target: Point, facing: Direction | None
+    ) -> array[int]:
+        width = self.table.width
+        distances: array[int] = array("i", [UNREACHABLE]) * (
+            width * self.table.height * 4
+        )
+        if not self._is_open(target.x, target.y):
+            return distances
+
+        cell = target.y * width + target.x
+        headings = range(4) if facing is None else [DIRECTION_INDEX[facing]]
+        queue: deque[int] = deque()
+        for heading in headings:
+            distances[cell * 4 + heading] = 0
+            queue.append(cell * 4 + heading)
+
+        is_open = self._is_open
+        while queue:
+            state = queue.popleft()
+            distance = distances[state] + 1
+            cell, heading = divmod(state, 4)
+            # LEFT from heading + 1 and RIGHT from heading + 3 reach this state.
+            predecessors = [
+                cell * 4 + ((heading + 1) & 3),
+                cell * 4 + ((heading + 3) & 3),
+            ]
+            y, x = divmod(cell, width)
+            dx, dy = DIRECTION_DELTAS[heading]
+            if is_open(x - dx, y - dy):
+                predecessors.append(((y - dy) * width + x - dx) * 4 + heading)
+            for predecessor in predecessors:
+                if distances[predecessor] == UNREACHABLE:
+                    distances[predecessor] = distance
+                    queue.append(predecessor)
+        return distances
+
+    def distance_field(
+        self, target: Point, facing: Direction | None = None
+    ) -> array[int]:
+        """Distance in commands from every state to the target, or UNREACHABLE.
+
+        Args:
+            target (Point): The cell to reach.
+            facing (Direction | None): The heading to arrive with, or None for any.
+
+        Returns:
+            array[int]: Distances indexed by encoded state.
+        """
+        if self._fields_version != self.table.version:
+            self._fields.clear()
+            self._fields_version = self.table.version
+        key = (target, facing)
+        if (field := self._fields.get(key)) is not None:
+            self._hits += 1
+            self._fields.move_to_end(key)
+            return field
+
+        self._misses += 1
+        field = self._fields[key] = self._build_distance_field(target, facing)
+        if len(self._fields) > self.cache_size:
+            self._fields.popitem(last=False)
+        return field
+
+    def cache_info(self) -> DistanceCacheInfo:
+        """Hit, miss and size counters of the distance field cache."""
+        return DistanceCacheInfo(
+            self._hits, self._misses, self.cache_size, len(self._fields)
+        )
+
+    def plan(
+        self, robot: Robot, target: Point, facing: Direction | None = None
+    ) -> list[str]:
+        """The shortest command sequence taking a placed robot to the target.
+
+        Args:
+            robot (Robot): The robot to drive. It is not modified.
+            target (Point): The cell to reach.
+            facing (Direction | None): The heading to arrive with, or None for any.
+
+        Returns:
+            list[str]: MOVE, LEFT and RIGHT commands, empty if already there.
+
+        Raises:
+            RobotNotPlacedError: If the robot has not been placed.
+            UnreachableTargetError: If the target cannot be reached from the robot's state.
+        """
+        if not robot.is_placed:
+            raise RobotNotPlacedError
+        field = self.distance_field(target, facing)
+        state = encode_state(robot, self.table)
+        if field[state] == UNREACHABLE:
+            raise UnreachableTargetError(f"{target.x},{target.y} is unreachable")
+
+        width = self.table.width
+        commands = []
+        while (distance := field[state]) > 0:
+            cell, heading = divmod(state, 4)
+            y, x = divmod(cell, width)
+            dx, dy = DIRECTION_DELTAS[heading]
+            moved = ((y + dy) * width + x + dx) * 4 + heading
+            if self._is_open(x + dx, y + dy) and field[moved] == distance - 1:
+                commands.append("MOVE")
+                state = moved
+            elif field[cell * 4 + ((heading + 3) & 3)] == distance - 1:
+                commands.append("LEFT")
+                state = cell * 4 + ((heading + 3) & 3)
+            else:
+                commands.append("RIGHT")
+                state = cell * 4 + ((heading + 1) & 3)
+        return commands
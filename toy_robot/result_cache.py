@@ -0,0 +1,164 @@
+import dataclasses
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from toy_robot.compiler import UNPLACED, check_rectangular, encode_state
+from toy_robot.robot import Robot
+from toy_robot.table import Table
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Fraction of max_bytes that eviction shrinks the cache to.
+EVICTION_TARGET = 0.9
+CACHE_DIR_ENV = "TOY_ROBOT_CACHE_DIR"
+_ENTRY_SUFFIX = ".result"
+# Holds the running total of the entries' sizes, in bytes.
+_SIZE_FILE = "size"
+
+
+@dataclasses.dataclass
+class CachedResult:
+    output: str | None
+    # The robot's state after the script, encoded as by compiler.encode_state.
+    final_state: int
+
+
+class ResultCache:
+    """A persistent cache of script results, keyed by content.
+
+    The key is a SHA-256 of the script bytes, the table size and the robot's
+    state before the script runs, so byte-identical scripts share one entry
+    wherever they live. Each entry is a file in the cache directory, and
+    once the directory grows past max_bytes the least recently used entries
+    (by modification time, which a hit refreshes) are deleted until it is
+    back under EVICTION_TARGET of max_bytes, leaving room for later puts.
+
+    The entries' total size is kept in a small index file and updated by
+    put(), so the directory is only scanned when the total goes over
+    max_bytes. Concurrent writers can make the total drift; every scan
+    replaces it with the exact figure. Entries that cannot be parsed are
+    deleted and treated as misses.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _hasher(self, table: Table, robot: Robot) -> "hashlib._Hash":
+        check_rectangular(table)
+        hasher = hashlib.sha256()
+        state = encode_state(robot, table)
+        hasher.update(
+            f"toy-robot {CACHE_FORMAT_VERSION} {table.width}x{table.height} {state}\0".encode()
+        )
+        return hasher
+
+    def key_for_bytes(self, script: bytes, table: Table, robot: Robot) -> str:
+        hasher = self._hasher(table, robot)
+        hasher.update(script)
+        return hasher.hexdigest()
+
+    def key_for_file(
+        self, path: str | os.PathLike[str], table: Table, robot: Robot
+    ) -> str:
+        hasher = self._hasher(table, robot)
+        with open(path, "rb") as command_file:
+            return hashlib.file_digest(command_file, lambda: hasher).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}{_ENTRY_SUFFIX}"
+
+    def get(self, key: str) -> CachedResult | None:
+        path = self._entry_path(key)
+        try:
+            data = path.read_text()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except UnicodeDecodeError:
+            data = ""
+
+        state, _, output = data.partition("\n")
+        try:
+            final_state = int(state)
+        except ValueError:
+            final_state = None
+        if final_state is None or final_state < UNPLACED:
+            self._discard(path)
+            return None
+        return CachedResult(output or None, final_state)
+
+    def put(self, key: str, result: CachedResult) -> None:
+        """Store a result, unless it alone would exceed the cache size."""
+        data = f"{result.final_state}\n{result.output or ''}"
+        if len(data) > self.max_bytes:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._entry_path(key)
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        self._replace(path, data)
+
+        total = self._read_total()
+        if total is None:
+            self._evict()
+            return
+        total += len(data.encode()) - replaced
+        if total > self.max_bytes:
+            self._evict()
+        else:
+            self._write_total(total)
+
+    def _discard(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        if (total := self._read_total()) is not None:
+            self._write_total(max(total - size, 0))
+
+    def _replace(self, path: Path, data: str) -> None:
+        # Files are written under a temporary name and renamed into place, so
+        # concurrent runs never see a partial entry or total.
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.directory, suffix=".tmp", delete=False
+        ) as temporary_file:
+            temporary_file.write(data)
+        os.replace(temporary_file.name, path)
+
+    def _read_total(self) -> int | None:
+        try:
+            return int((self.directory / _SIZE_FILE).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_total(self, total: int) -> None:
+        self._replace(self.directory / _SIZE_FILE, str(total))
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(_ENTRY_SUFFIX):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                    total += stat.st_size
+
+        entries.sort()
+        target = self.max_bytes * EVICTION_TARGET
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._write_total(total)
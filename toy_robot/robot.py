@@ -1,3 +1,5 @@
+from collections.abc import Callable
+
 from toy_robot.data_classes import Direction, Point
 
 
@@ -10,6 +12,8 @@ class RobotNotPlacedError(RobotError):
 
 
 class Robot:
+    __slots__ = ("_direction", "_position")
+
     clockwise_rotations = {
         Direction.NORTH: Direction.EAST,
         Direction.EAST: Direction.SOUTH,
@@ -67,12 +71,22 @@ class Robot:
 
         self._direction = self.clockwise_rotations[self._direction]
 
-    def next_position(self) -> Point:
+    def next_position(
+        self, point_factory: Callable[[int, int], Point] = Point
+    ) -> Point:
         if self._position is None or self._direction is None:
             raise RobotNotPlacedError
 
         dx, dy = self.direction_deltas[self._direction]
-        return Point(self._position.x + dx, self._position.y + dy)
-
-    def move(self) -> None:
-        self._position = self.next_position()
+        return point_factory(self._position.x + dx, self._position.y + dy)
+
+    def move(self, next_position: Point | None = None) -> None:
+        """Move forward one place.
+
+        Args:
+            next_position (Point | None): The result of next_position(), if the
+                caller has already computed it.
+        """
+        if next_position is None:
+            next_position = self.next_position()
+        self._position = next_position
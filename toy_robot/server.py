@@ -0,0 +1,86 @@
+import asyncio
+import sys
+from pathlib import Path
+
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+READ_SIZE = 64 * 1024
+# A session is dropped if a single line grows past this without a newline.
+MAX_LINE_LENGTH = 4096
+# Reading from a client pauses while this much output is waiting to be sent.
+WRITE_HIGH_WATER = 256 * 1024
+
+
+async def handle_session(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """Serve one connection with its own RobotSimulator.
+
+    Each line received is handled exactly like RobotSimulator.process_command,
+    and any REPORT output is sent back as a line. Every complete line in a read
+    is processed before the responses are written in one go, so clients can
+    pipeline many commands per round trip.
+    """
+    simulator = RobotSimulator(robot=Robot(), table=Table())
+    writer.transport.set_write_buffer_limits(high=WRITE_HIGH_WATER)
+    pending = b""
+    try:
+        while chunk := await reader.read(READ_SIZE):
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            responses = []
+            for line in lines:
+                output = simulator.process_command(line.decode(errors="replace"))
+                if output is not None:
+                    responses.append(output)
+            if responses:
+                responses.append("")
+                writer.write("\n".join(responses).encode())
+                await writer.drain()
+            if len(pending) > MAX_LINE_LENGTH:
+                break
+
+        if pending and len(pending) <= MAX_LINE_LENGTH:
+            output = simulator.process_command(pending.decode(errors="replace"))
+            if output is not None:
+                writer.write(f"{output}\n".encode())
+                await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def start_server(
+    host: str | None = None, port: int = 0, unix_path: Path | None = None
+) -> asyncio.Server:
+    """Start listening on a TCP port, or on a Unix socket if unix_path is given."""
+    if unix_path is not None:
+        return await asyncio.start_unix_server(
+            handle_session, path=unix_path, limit=READ_SIZE
+        )
+    return await asyncio.start_server(handle_session, host, port, limit=READ_SIZE)
+
+
+def serve(
+    host: str | None = None, port: int = 0, unix_path: Path | None = None
+) -> None:
+    """Run the server until interrupted."""
+
+    async def run() -> None:
+        server = await start_server(host, port, unix_path)
+        addresses = ", ".join(str(socket.getsockname()) for socket in server.sockets)
+        print(f"Serving robot sessions on {addresses}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -1,4 +1,6 @@
-from typing import TextIO
+import io
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, BinaryIO, TextIO
 
 from toy_robot.commands import (
     Command,
@@ -6,12 +8,17 @@ from toy_robot.commands import (
     CommandParserException,
     PlaceCommandArgs,
 )
-from toy_robot.data_classes import Point
+from toy_robot.compression import open_text
 from toy_robot.robot import Robot
 from toy_robot.table import Table
 
+if TYPE_CHECKING:
+    from toy_robot.result_cache import ResultCache
+
 
 class RobotSimulator:
+    __slots__ = ("robot", "table")
+
     def __init__(self, robot: Robot, table: Table):
         self.robot = robot
         self.table = table
@@ -35,7 +42,7 @@ class RobotSimulator:
     def _handle_place(self, args: PlaceCommandArgs | None) -> None:
         if args is None:
             return
-        point = Point(args.x, args.y)
+        point = self.table.point(args.x, args.y)
         if self.table.is_valid_position(point):
             self.robot.place(point, args.facing)
 
@@ -43,9 +50,9 @@ class RobotSimulator:
         if not self.robot.is_placed:
             return
 
-        candidate_position = self.robot.next_position()
+        candidate_position = self.robot.next_position(self.table.point)
         if self.table.is_valid_position(candidate_position):
-            self.robot.move()
+            self.robot.move(candidate_position)
         # Would be good to make the user aware somehow if position is invalid.
         # Silently failing is an issue for debugging. Could think about adding logging to
         # a file or adding a --verbose mode to the CLI.
@@ -74,11 +81,44 @@ class RobotSimulator:
         except CommandParserException:
             return None
 
-    def process_commands(self, file_contents: TextIO) -> str | None:
-        output_lines = []
-        for line in file_contents:
-            result = self.process_command(line)
-            if result is not None:
-                output_lines.append(result)
+    def iter_reports(self, file_contents: TextIO | BinaryIO) -> Iterator[str]:
+        with open_text(file_contents) as text:
+            for line in text:
+                result = self.process_command(line)
+                if result is not None:
+                    yield result
+
+    def process_commands(self, file_contents: TextIO | BinaryIO) -> str | None:
+        """Process every line of a script, returning the REPORT output.
 
+        Binary streams are decoded like a file opened in text mode, and
+        decompressed first if they are gzip, bz2 or xz compressed.
+        """
+        output_lines = list(self.iter_reports(file_contents))
         return "\n".join(output_lines) if output_lines else None
+
+    def process_script(
+        self, script: bytes, cache: "ResultCache | None" = None
+    ) -> str | None:
+        """Process a whole script given as bytes, as read from a command file.
+
+        With a cache, a script already run from the same robot state on a table
+        of the same size returns the stored output and final state without
+        being processed again.
+        """
+        if cache is None:
+            return self.process_commands(io.BytesIO(script))
+
+        from toy_robot.compiler import decode_state, encode_state
+        from toy_robot.result_cache import CachedResult
+
+        key = cache.key_for_bytes(script, self.table, self.robot)
+        if (result := cache.get(key)) is None:
+            output = self.process_commands(io.BytesIO(script))
+            cache.put(key, CachedResult(output, encode_state(self.robot, self.table)))
+            return output
+
+        final = decode_state(result.final_state, self.table)
+        if final.position is not None and final.direction is not None:
+            self.robot.place(final.position, final.direction)
+        return result.output
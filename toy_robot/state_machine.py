@@ -0,0 +1,177 @@
+from array import array
+from collections.abc import Generator, Sequence
+from functools import lru_cache
+
+from toy_robot.compiler import (
+    DIRECTION_DELTAS,
+    DIRECTIONS,
+    OP_LEFT,
+    OP_MOVE,
+    OP_MOVE_N,
+    OP_PLACE,
+    OP_REPORT,
+    OP_RIGHT,
+    OP_TURN,
+    OPCODE_BITS,
+    OPCODE_MASK,
+    check_rectangular,
+    decode_state,
+    encode_state,
+)
+from toy_robot.robot import Robot
+from toy_robot.table import Table
+
+# Rows of the transition table, one per state-changing command.
+MOVE_ROW = 0
+LEFT_ROW = 1
+RIGHT_ROW = 2
+
+
+class TransitionTable:
+    """Precomputed state x command -> state transitions for one table size.
+
+    States are encoded as by compiler.encode_state and shifted up by one so
+    that UNPLACED occupies slot 0; every command leaves an unplaced robot
+    unplaced. Edge clamping is baked into the MOVE row.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.state_count = width * height * 4
+        slots = 3 * (self.state_count + 1)
+        self.transitions: array[int] = array("q", bytes(8 * slots))
+        self._build()
+
+    def _build(self) -> None:
+        stride = self.state_count + 1
+        transitions = self.transitions
+        for state in range(self.state_count):
+            cell, facing = divmod(state, 4)
+            y, x = divmod(cell, self.width)
+            dx, dy = DIRECTION_DELTAS[facing]
+            next_x, next_y = x + dx, y + dy
+            if 0 <= next_x < self.width and 0 <= next_y < self.height:
+                moved = (next_y * self.width + next_x) * 4 + facing
+            else:
+                moved = state
+            slot = state + 1
+            transitions[MOVE_ROW * stride + slot] = moved + 1
+            transitions[LEFT_ROW * stride + slot] = cell * 4 + ((facing + 3) & 3) + 1
+            transitions[RIGHT_ROW * stride + slot] = cell * 4 + ((facing + 1) & 3) + 1
+
+    def move(self, slot: int, count: int) -> int:
+        """Slot reached by count MOVEs, clamped against the table edge."""
+        if not slot:
+            return slot
+        cell, facing = divmod(slot - 1, 4)
+        y, x = divmod(cell, self.width)
+        dx, dy = DIRECTION_DELTAS[facing]
+        x = min(max(x + dx * count, 0), self.width - 1)
+        y = min(max(y + dy * count, 0), self.height - 1)
+        return (y * self.width + x) * 4 + facing + 1
+
+    def turn(self, slot: int, quarter_turns: int) -> int:
+        """Slot reached by turning right quarter_turns times."""
+        if not slot:
+            return slot
+        return ((slot - 1) & ~3) + (((slot - 1) + quarter_turns) & 3) + 1
+
+    def step(self, slot: int, instruction: int) -> int:
+        """Slot reached by a MOVE, LEFT, RIGHT, MOVE_N or TURN instruction."""
+        opcode = instruction & OPCODE_MASK
+        stride = self.state_count + 1
+        if opcode == OP_MOVE:
+            return self.transitions[MOVE_ROW * stride + slot]
+        if opcode == OP_LEFT:
+            return self.transitions[LEFT_ROW * stride + slot]
+        if opcode == OP_RIGHT:
+            return self.transitions[RIGHT_ROW * stride + slot]
+        if opcode == OP_MOVE_N:
+            return self.move(slot, instruction >> OPCODE_BITS)
+        if opcode == OP_TURN:
+            return self.turn(slot, instruction >> OPCODE_BITS)
+        raise ValueError(f"opcode {opcode} does not change the state")
+
+    def report(self, slot: int) -> str:
+        y, x = divmod((slot - 1) >> 2, self.width)
+        return f"{x},{y},{DIRECTIONS[(slot - 1) & 3].name}"
+
+
+@lru_cache(maxsize=16)
+def get_transition_table(width: int, height: int) -> TransitionTable:
+    """Return the transition table for a table size, building it on first use."""
+    return TransitionTable(width, height)
+
+
+def iter_state_machine_reports(
+    program: Sequence[int], robot: Robot, table: Table
+) -> Generator[str]:
+    """Run a compiled program as integer state transitions, yielding each REPORT.
+
+    Equivalent to compiler.iter_program_reports, but every MOVE, LEFT and RIGHT
+    is a single lookup in the cached TransitionTable for the table's size.
+
+    Args:
+        program (Sequence[int]): A program produced by compile_script or fold_runs.
+        robot (Robot): The robot to drive.
+        table (Table): The table the robot moves on.
+
+    Yields:
+        str: The output of each REPORT, in order.
+
+    Raises:
+        ValueError: If the table is not rectangular.
+    """
+    check_rectangular(table)
+    machine = get_transition_table(table.width, table.height)
+    transitions = machine.transitions
+    stride = machine.state_count + 1
+    left = LEFT_ROW * stride
+    right = RIGHT_ROW * stride
+    width = table.width
+    height = table.height
+
+    slot = encode_state(robot, table) + 1
+    try:
+        pc = 0
+        end = len(program)
+        while pc < end:
+            instruction = program[pc]
+            pc += 1
+            opcode = instruction & OPCODE_MASK
+            if opcode == OP_MOVE:
+                slot = transitions[slot]
+            elif opcode == OP_LEFT:
+                slot = transitions[left + slot]
+            elif opcode == OP_RIGHT:
+                slot = transitions[right + slot]
+            elif opcode == OP_REPORT:
+                if slot:
+                    yield machine.report(slot)
+            elif opcode == OP_PLACE:
+                place_x = program[pc]
+                place_y = program[pc + 1]
+                pc += 2
+                if 0 <= place_x < width and 0 <= place_y < height:
+                    slot = (
+                        (place_y * width + place_x) * 4
+                        + (instruction >> OPCODE_BITS)
+                        + 1
+                    )
+            elif opcode == OP_MOVE_N:
+                slot = machine.move(slot, instruction >> OPCODE_BITS)
+            elif opcode == OP_TURN:
+                slot = machine.turn(slot, instruction >> OPCODE_BITS)
+    finally:
+        if slot:
+            final = decode_state(slot - 1, table)
+            if final.position is not None and final.direction is not None:
+                robot.place(final.position, final.direction)
+
+
+def execute_state_machine(
+    program: Sequence[int], robot: Robot, table: Table
+) -> str | None:
+    output_lines = list(iter_state_machine_reports(program, robot, table))
+    return "\n".join(output_lines) if output_lines else None
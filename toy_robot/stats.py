@@ -0,0 +1,137 @@
+from collections import Counter
+from enum import Enum, auto
+from time import perf_counter_ns
+
+from toy_robot.commands import (
+    Command,
+    CommandParser,
+    CommandParserException,
+    InvalidPlaceException,
+    PlaceCommandArgs,
+)
+from toy_robot.robot import Robot
+from toy_robot.simulator import RobotSimulator
+from toy_robot.table import Table
+
+
+class RejectReason(Enum):
+    UNKNOWN_COMMAND = auto()
+    INVALID_PLACE = auto()
+    OFF_TABLE_PLACE = auto()
+    BLOCKED_MOVE = auto()
+    NOT_PLACED = auto()
+
+
+class LatencyHistogram:
+    """Latency histogram with power-of-two nanosecond buckets.
+
+    Bucket i counts samples in [2**(i-1), 2**i) ns, with bucket 0 holding 0 ns.
+    """
+
+    def __init__(self) -> None:
+        self.buckets: list[int] = [0] * 64
+        self.count = 0
+        self.total_ns = 0
+
+    def record(self, nanoseconds: int) -> None:
+        self.buckets[min(nanoseconds.bit_length(), 63)] += 1
+        self.count += 1
+        self.total_ns += nanoseconds
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+    def percentile_ns(self, percentile: float) -> int:
+        """Upper bound of the bucket containing the given percentile (0-100)."""
+        threshold = self.count * percentile / 100
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if bucket and seen >= threshold:
+                return (1 << index) - 1
+        return 0
+
+    def __str__(self) -> str:
+        return (
+            f"n={self.count} mean={self.mean_ns:.0f}ns "
+            f"p50<={self.percentile_ns(50)}ns p99<={self.percentile_ns(99)}ns"
+        )
+
+
+class SimulatorStats:
+    def __init__(self) -> None:
+        self.commands: Counter[Command] = Counter()
+        self.rejections: Counter[RejectReason] = Counter()
+        self.parse_latency = LatencyHistogram()
+        self.execute_latency = LatencyHistogram()
+
+    def format(self) -> str:
+        lines = ["Commands:"]
+        lines += [
+            f"  {command.name:<16} {self.commands[command]}" for command in Command
+        ]
+        lines.append("Rejected:")
+        lines += [
+            f"  {reason.name.lower():<16} {self.rejections[reason]}"
+            for reason in RejectReason
+        ]
+        lines.append(f"Parse latency:   {self.parse_latency}")
+        lines.append(f"Execute latency: {self.execute_latency}")
+        return "\n".join(lines)
+
+
+class InstrumentedRobotSimulator(RobotSimulator):
+    """A RobotSimulator that records SimulatorStats for every command it processes.
+
+    Kept as a subclass so the plain simulator pays nothing for instrumentation.
+    """
+
+    __slots__ = ("stats",)
+
+    def __init__(self, robot: Robot, table: Table, stats: SimulatorStats | None = None):
+        super().__init__(robot, table)
+        self.stats = stats if stats is not None else SimulatorStats()
+
+    def _rejection(
+        self, command: Command, place_args: PlaceCommandArgs | None
+    ) -> RejectReason | None:
+        if command is Command.PLACE:
+            if place_args is None or self.table.is_valid_position(
+                self.table.point(place_args.x, place_args.y)
+            ):
+                return None
+            return RejectReason.OFF_TABLE_PLACE
+
+        if not self.robot.is_placed:
+            return RejectReason.NOT_PLACED
+
+        if command is Command.MOVE and not self.table.is_valid_position(
+            self.robot.next_position(self.table.point)
+        ):
+            return RejectReason.BLOCKED_MOVE
+
+        return None
+
+    def process_command(self, line: str) -> str | None:
+        stats = self.stats
+        start = perf_counter_ns()
+        try:
+            command, place_args = CommandParser.parse_command(line.rstrip())
+        except CommandParserException as exception:
+            stats.parse_latency.record(perf_counter_ns() - start)
+            if isinstance(exception, InvalidPlaceException):
+                stats.rejections[RejectReason.INVALID_PLACE] += 1
+            else:
+                stats.rejections[RejectReason.UNKNOWN_COMMAND] += 1
+            return None
+        stats.parse_latency.record(perf_counter_ns() - start)
+
+        stats.commands[command] += 1
+        if (reason := self._rejection(command, place_args)) is not None:
+            stats.rejections[reason] += 1
+
+        start = perf_counter_ns()
+        result = self._execute(command, place_args)
+        stats.execute_latency.record(perf_counter_ns() - start)
+        return result
@@ -1,13 +1,30 @@
 from toy_robot.data_classes import Point
 
+# Most points a table interns; cells visited after that get a fresh Point.
+MAX_INTERNED_POINTS = 4096
+
 
 class Table:
     """A rectangular table surface for a robot to move on.
 
     The table uses a coordinate system where Point(0, 0) is the south-west corner.
     Therefore, both values must be positive integers.
+
+    Points on the table are interned: point() hands out one shared instance per
+    cell, so a robot moving around reuses existing objects instead of allocating.
+    Only the first MAX_INTERNED_POINTS cells visited are interned, so a robot
+    wandering a huge table does not keep a Point alive for every cell it saw.
     """
 
+    __slots__ = ("_points", "height", "width")
+
+    # Whether every cell inside the bounds is a valid position. The compiled
+    # executors only check bounds, so they reject tables where this is False.
+    is_rectangular = True
+    # Changes whenever the set of valid positions does, so callers can tell
+    # when anything derived from it is stale. A plain Table never changes.
+    version = 0
+
     def __init__(
         self,
         width: int = 5,
@@ -18,6 +35,30 @@ class Table:
 
         self.width = width
         self.height = height
+        self._points: dict[int, Point] | None = None
+
+    def point(self, x: int, y: int) -> Point:
+        """Get a Point, reusing the interned instance for cells on the table.
+
+        Args:
+            x (int): The x coordinate.
+            y (int): The y coordinate.
+
+        Returns:
+            Point: The shared instance if (x, y) is an interned cell on the table,
+                otherwise a new Point.
+        """
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return Point(x, y)
+
+        if (points := self._points) is None:
+            points = self._points = {}
+        index = y * self.width + x
+        if (point := points.get(index)) is None:
+            point = Point(x, y)
+            if len(points) < MAX_INTERNED_POINTS:
+                points[index] = point
+        return point
 
     def is_valid_position(self, position: Point) -> bool:
         """Check if a point is valid. I.e. not outside the bounds of the table.